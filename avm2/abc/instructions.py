@@ -1,14 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, fields
-from typing import Any, Callable, ClassVar, Dict, Tuple, Type, TypeVar, NewType, Optional
+from typing import Any, Callable, ClassVar, Dict, List, Tuple, Type, TypeVar, NewType, Optional
 
 import avm2.vm
-from avm2.exceptions import ASReturnException, ASJumpException
 from avm2.runtime import undefined
 from avm2.abc.parser import read_array
 from avm2.io import MemoryViewReader
-from avm2.abc.enums import MultinameKind
 
 
 def read_instruction(reader: MemoryViewReader) -> Instruction:
@@ -16,11 +14,60 @@ def read_instruction(reader: MemoryViewReader) -> Instruction:
     return opcode_to_instruction[reader.read_u8()](reader)
 
 
+@dataclass
+class MethodCode:
+    """
+    Method body code decoded once into a list of instructions.
+    """
+
+    instructions: List[Instruction]
+    offsets: List[int]  # byte offset of each instruction
+    jump_bases: List[int]  # byte offset the instruction's jump offsets are relative to
+    offset_to_index: Dict[int, int]  # byte offset of each instruction and the code end to instruction index
+    back_edge_count: int  # backward jumps taken by the interpreter
+
+    def __init__(self, code: memoryview):
+        reader = MemoryViewReader(code)
+        self.instructions = []
+        self.offsets = []
+        self.jump_bases = []
+        while not reader.is_eof():
+            self.offsets.append(reader.position)
+            instruction_ = read_instruction(reader)
+            self.instructions.append(instruction_)
+            # Jump offsets are relative to the next instruction, except for `lookupswitch`,
+            # whose offsets are relative to the instruction itself.
+            self.jump_bases.append(self.offsets[-1] if isinstance(instruction_, LookupSwitch) else reader.position)
+        self.offset_to_index = {offset: index for index, offset in enumerate(self.offsets)}
+        self.offset_to_index[reader.position] = len(self.instructions)
+        self.back_edge_count = 0
+
+    def jump(self, index: int, offset: int) -> int:
+        """
+        Get index of the instruction to jump to from the instruction at `index` by the byte `offset`.
+        """
+        return self.offset_to_index[self.jump_bases[index] + offset]
+
+    def take_jump(self, index: int, offset: int) -> int:
+        """
+        Get index of the instruction to jump to like `jump` does, counting the jump if it's backward.
+        Used by the interpreter loops.
+        """
+        next_index = self.offset_to_index[self.jump_bases[index] + offset]
+        if next_index <= index:
+            self.back_edge_count += 1
+        return next_index
+
+
 u8 = NewType('u8', int)
 u30 = NewType('u30', int)
 uint = NewType('uint', int)
 s24 = NewType('s24', int)
 
+# Returned by `Instruction.execute` to return from the method, it lies outside of the `s24` jump offsets range.
+# The return value is stored in `MethodEnvironment.return_value`.
+RETURN = 1 << 24
+
 
 @dataclass
 class Instruction:
@@ -36,6 +83,10 @@ class Instruction:
             setattr(self, field.name, self.readers[field.type](reader))
 
     def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment) -> Optional[int]:
+        """
+        Execute the instruction. Get `None` to continue with the next instruction,
+        the byte offset to jump by, or `RETURN` to return from the method.
+        """
         raise NotImplementedError(self)
 
 
@@ -353,16 +404,23 @@ class FindPropStrict(Instruction):
 
     index: u30
 
+    def __init__(self, reader: MemoryViewReader):
+        super().__init__(reader)
+        self.cache = avm2.vm.InlineCache()
+
     def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
-        multiname = machine.multinames[self.index]
-        # TODO: other kinds of multinames.
-        assert multiname.kind in (MultinameKind.Q_NAME, MultinameKind.Q_NAME_A), multiname
+        multiname = machine.resolved_multinames[self.index]
         try:
-            object_, _, _ = machine.resolve_multiname(
-                environment.scope_stack,
-                machine.strings[multiname.name_index],
-                [machine.strings[machine.namespaces[multiname.namespace_index].name_index]],
-            )
+            if multiname.is_runtime:
+                name, namespaces = multiname.pop_runtime(environment.operand_stack, machine.strings)
+                object_, _, _ = machine.resolve_multiname(environment.scope_stack, name, namespaces)
+            else:
+                object_, _, _ = machine.resolve_multiname_cached(
+                    self.cache,
+                    environment.scope_stack,
+                    multiname.name,
+                    multiname.namespaces,
+                )
         except KeyError:
             raise NotImplementedError('ReferenceError')
         else:
@@ -401,14 +459,19 @@ class GetLex(Instruction):
 
     index: u30
 
+    def __init__(self, reader: MemoryViewReader):
+        super().__init__(reader)
+        self.cache = avm2.vm.InlineCache()
+
     def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
-        multiname = machine.multinames[self.index]
-        assert multiname.kind in (MultinameKind.Q_NAME, MultinameKind.Q_NAME_A)
+        multiname = machine.resolved_multinames[self.index]
+        assert not multiname.is_runtime, multiname
         try:
-            object_, name, namespace = machine.resolve_multiname(
+            object_, name, namespace = machine.resolve_multiname_cached(
+                self.cache,
                 environment.scope_stack,
-                machine.strings[multiname.name_index],
-                [machine.strings[machine.namespaces[multiname.namespace_index].name_index]],
+                multiname.name,
+                multiname.namespaces,
             )
         except KeyError:
             raise NotImplementedError('ReferenceError')
@@ -505,8 +568,8 @@ class HasNext(Instruction):
 
 @instruction(50)
 class HasNext2(Instruction):
-    object_reg: uint
-    index_reg: uint
+    object_reg: u30
+    index_reg: u30
 
 
 @instruction(19)
@@ -525,7 +588,7 @@ class IfFalse(Instruction):
 
     def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
         if not environment.operand_stack.pop():
-            raise ASJumpException(self.offset)
+            return self.offset
 
 
 @instruction(24)
@@ -559,13 +622,25 @@ class IfLT(Instruction):
         value_2 = environment.operand_stack.pop()
         value_1 = environment.operand_stack.pop()
         if value_1 < value_2:
-            raise ASJumpException(self.offset)
+            return self.offset
 
 
 @instruction(15)
 class IfNGE(Instruction):
+    """
+    Compute `value1 < value2` using the abstract relational comparison algorithm in ECMA-262
+    section 11.8.5. If the result of the comparison is not `false`, jump the number of bytes
+    indicated by `offset`. Otherwise continue executing code from this point.
+    """
+
     offset: s24
 
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        value_2 = environment.operand_stack.pop()
+        value_1 = environment.operand_stack.pop()
+        if not value_1 >= value_2:
+            return self.offset
+
 
 @instruction(14)
 class IfNGT(Instruction):
@@ -582,7 +657,7 @@ class IfNGT(Instruction):
         value_1 = environment.operand_stack.pop()
         # FIXME: NaN.
         if not value_1 > value_2:
-            raise ASJumpException(self.offset)
+            return self.offset
 
 
 @instruction(13)
@@ -610,7 +685,7 @@ class IfNLT(Instruction):
         value_1 = environment.operand_stack.pop()
         # FIXME: NaN.
         if not value_1 < value_2:
-            raise ASJumpException(self.offset)
+            return self.offset
 
 
 @instruction(20)
@@ -630,8 +705,17 @@ class IfStrictNE(Instruction):
 
 @instruction(17)
 class IfTrue(Instruction):
+    """
+    Pop value off the stack and convert it to a `Boolean`. If the converted value is `true`, jump the
+    number of bytes indicated by `offset`. Otherwise continue executing code from this point.
+    """
+
     offset: s24
 
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        if environment.operand_stack.pop():
+            return self.offset
+
 
 @instruction(180)
 class In(Instruction):
@@ -680,8 +764,15 @@ class IsTypeLate(Instruction):
 
 @instruction(16)
 class Jump(Instruction):
+    """
+    `offset` is an `s24` that is the number of bytes to jump.
+    """
+
     offset: s24
 
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        return self.offset
+
 
 @instruction(8)
 class Kill(Instruction):
@@ -714,6 +805,13 @@ class LookupSwitch(Instruction):
         case_count = reader.read_int()
         self.case_offsets = read_array(reader, MemoryViewReader.read_s24, case_count + 1)
 
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        index = environment.operand_stack.pop()
+        # The offsets are relative to the `lookupswitch` instruction itself.
+        if 0 <= index < len(self.case_offsets):
+            return self.case_offsets[index]
+        return self.default_offset
+
 
 @instruction(165)
 class LeftShift(Instruction):
@@ -925,7 +1023,8 @@ class ReturnValue(Instruction):
 
     def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
         # FIXME: coerce to the expected return type.
-        raise ASReturnException(environment.operand_stack.pop())
+        environment.return_value = environment.operand_stack.pop()
+        return RETURN
 
 
 @instruction(71)
@@ -936,7 +1035,8 @@ class ReturnVoid(Instruction):
     """
 
     def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
-        raise ASReturnException(undefined)
+        environment.return_value = undefined
+        return RETURN
 
 
 @instruction(166)
@@ -1040,3 +1140,57 @@ class TypeOf(Instruction):
 @instruction(167)
 class UnsignedRightShift(Instruction):
     pass
+
+
+# Superinstructions, created by `avm2.optimizer` and never decoded.
+# ----------------------------------------------------------------------------------------------------------------------
+
+@dataclass
+class PushConstant(Instruction):
+    """
+    Push the folded constant.
+    """
+
+    value: Any
+
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        environment.operand_stack.append(self.value)
+
+
+@dataclass
+class GetLocalPair(Instruction):
+    """
+    `getlocal <index_1>; getlocal <index_2>`.
+    """
+
+    index_1: int
+    index_2: int
+
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        environment.operand_stack.append(environment.registers[self.index_1])
+        environment.operand_stack.append(environment.registers[self.index_2])
+
+
+@dataclass
+class PushThisScope(Instruction):
+    """
+    `getlocal0; pushscope`, the typical method prologue.
+    """
+
+    def execute(self, machine: avm2.vm.VirtualMachine, environment: avm2.vm.MethodEnvironment):
+        value = environment.registers[0]
+        assert value is not None and value is not undefined
+        environment.scope_stack.append(value)
+
+
+# Register indices of the instructions with an implicit register.
+local_indices: Dict[Type[Instruction], int] = {
+    GetLocal0: 0,
+    GetLocal1: 1,
+    GetLocal2: 2,
+    GetLocal3: 3,
+    SetLocal0: 0,
+    SetLocal1: 1,
+    SetLocal2: 2,
+    SetLocal3: 3,
+}
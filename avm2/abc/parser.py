@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Callable, List, Optional, TypeVar
+from array import array
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TypeVar, Union, overload
 
 from avm2.io import MemoryViewReader
 
@@ -25,3 +26,85 @@ def read_array_with_default(reader: MemoryViewReader, read: Callable[[MemoryView
     Read variable-length array where 0-th element has a "special meaning".
     """
     return [default, *(read(reader) for _ in range(1, reader.read_int()))]
+
+
+def read_ints_with_default(reader: MemoryViewReader, unsigned=True) -> array:
+    """
+    Read variable-length array of variable-length encoded integers where 0-th element is zero.
+    """
+    values = array('I' if unsigned else 'i', [0])
+    values.extend(reader.read_ints(max(reader.read_int() - 1, 0), unsigned))
+    return values
+
+
+def skip_array(reader: MemoryViewReader, skip: Callable[[MemoryViewReader], Any], size: Optional[int] = None):
+    """
+    Skip variable-length array.
+    """
+    if size is None:
+        size = reader.read_int()
+    for _ in range(size):
+        skip(reader)
+
+
+class LazyArray(Sequence[T]):
+    """
+    Variable-length array which only records offsets of its items while scanning.
+    An item is read from the buffer when it is indexed for the first time.
+    """
+
+    def __init__(
+        self,
+        reader: MemoryViewReader,
+        read: Callable[[MemoryViewReader], T],
+        skip: Callable[[MemoryViewReader], Any],
+        size: Optional[int] = None,
+    ):
+        if size is None:
+            size = reader.read_int()
+        self.buffer = reader.buffer
+        self.read = read
+        self.offsets = array('L')
+        for _ in range(size):
+            self.offsets.append(reader.position)
+            skip(reader)
+        self.items: List[Optional[T]] = [None] * size
+
+    def __repr__(self) -> str:
+        return f'LazyArray(read={self.read!r}, size={len(self)!r})'
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self.items[index]
+        if item is None:
+            item = self.items[index] = self.read(self.reader(index))
+        return item
+
+    def __iter__(self) -> Iterator[T]:
+        return (self[index] for index in range(len(self)))
+
+    def reader(self, index: int) -> MemoryViewReader:
+        """
+        Get a reader positioned at the beginning of the item, without reading it.
+        """
+        reader = MemoryViewReader(self.buffer)
+        reader.position = self.offsets[index]
+        return reader
+
+    def count_materialized(self) -> int:
+        """
+        Get the number of items which have already been read.
+        """
+        return len(self.items) - self.items.count(None)
@@ -0,0 +1,90 @@
+"""
+Columnar (struct-of-arrays) tables of methods and method bodies.
+
+Numeric fields are kept in arrays indexed by method or method body number. Objects are only read when indexed.
+The arrays support the buffer protocol, so they can be wrapped into NumPy arrays without copying.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import List
+
+import avm2.abc.types
+from avm2.abc.enums import MethodFlags
+from avm2.abc.parser import LazyArray, skip_array
+from avm2.io import MemoryViewReader, numpy
+
+
+class MethodTable(LazyArray['avm2.abc.types.ASMethod']):
+    """
+    Methods with their numeric fields in columns.
+    """
+
+    def __init__(self, reader: MemoryViewReader):
+        self.param_counts = array('I')
+        self.return_type_indices = array('I')
+        self.name_indices = array('I')
+        self.flags = array('B')
+        super().__init__(reader, avm2.abc.types.ASMethod, self.scan)
+
+    def scan(self, reader: MemoryViewReader):
+        param_count = reader.read_int()
+        self.param_counts.append(param_count)
+        self.return_type_indices.append(reader.read_int())
+        for _ in range(param_count):
+            reader.skip_int()  # param_type_indices
+        self.name_indices.append(reader.read_int())
+        flags = reader.read_u8()
+        self.flags.append(flags)
+        if flags & MethodFlags.HAS_OPTIONAL:
+            for _ in range(reader.read_int()):
+                reader.skip_int()  # value
+                reader.skip(1)  # kind
+        if flags & MethodFlags.HAS_PARAM_NAMES:
+            for _ in range(param_count):
+                reader.skip_int()  # param_name_indices
+
+    def get_indices_with_flags(self, flags: MethodFlags) -> List[avm2.abc.types.ABCMethodIndex]:
+        """
+        Get indices of the methods which have any of the flags set.
+        """
+        if numpy is not None:
+            return numpy.flatnonzero(numpy.frombuffer(self.flags, dtype=numpy.uint8) & flags).tolist()
+        return [index for index, method_flags in enumerate(self.flags) if method_flags & flags]
+
+
+class MethodBodyTable(LazyArray['avm2.abc.types.ASMethodBody']):
+    """
+    Method bodies with their numeric fields in columns. Code is kept as offset and length in the ABC file buffer.
+    """
+
+    def __init__(self, reader: MemoryViewReader):
+        self.method_indices = array('I')
+        self.max_stacks = array('I')
+        self.local_counts = array('I')
+        self.init_scope_depths = array('I')
+        self.max_scope_depths = array('I')
+        self.code_offsets = array('I')
+        self.code_lengths = array('I')
+        super().__init__(reader, avm2.abc.types.ASMethodBody, self.scan)
+
+    def scan(self, reader: MemoryViewReader):
+        method_index, max_stack, local_count, init_scope_depth, max_scope_depth, code_length = reader.read_ints(6)
+        self.method_indices.append(method_index)
+        self.max_stacks.append(max_stack)
+        self.local_counts.append(local_count)
+        self.init_scope_depths.append(init_scope_depth)
+        self.max_scope_depths.append(max_scope_depth)
+        self.code_offsets.append(reader.position)
+        self.code_lengths.append(code_length)
+        reader.skip(code_length)
+        skip_array(reader, avm2.abc.types.ASException.skip)
+        skip_array(reader, avm2.abc.types.ASTrait.skip)
+
+    def get_code(self, index: avm2.abc.types.ABCMethodBodyIndex) -> memoryview:
+        """
+        Get the method body code without reading the method body.
+        """
+        offset = self.code_offsets[index]
+        return self.buffer[offset:offset + self.code_lengths[index]]
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import math
+import sys
+from array import array
 from dataclasses import dataclass
-from functools import partial
-from typing import Optional, List, Union, NewType
+from typing import Dict, Iterable, Iterator, Optional, List, Sequence, Union, NewType, overload
 
+import avm2.abc.tables
 from avm2.abc.enums import (
     ClassFlags,
     ConstantKind,
@@ -14,7 +16,13 @@ from avm2.abc.enums import (
     TraitAttributes,
     TraitKind,
 )
-from avm2.abc.parser import read_array, read_array_with_default, read_string
+from avm2.abc.parser import (
+    LazyArray,
+    read_array,
+    read_array_with_default,
+    read_ints_with_default,
+    skip_array,
+)
 from avm2.io import MemoryViewReader
 
 ABCStringIndex = NewType('ABCStringIndex', int)
@@ -33,48 +41,177 @@ class ABCFile:
     minor_version: int
     major_version: int
     constant_pool: ASConstantPool
-    methods: List[ASMethod]
+    methods: Sequence[ASMethod]
     metadata: List[ASMetadata]
-    instances: List[ASInstance]
-    classes: List[ASClass]
-    scripts: List[ASScript]
-    method_bodies: List[ASMethodBody]
-
-    def __init__(self, reader: MemoryViewReader):
+    instances: Sequence[ASInstance]
+    classes: Sequence[ASClass]
+    scripts: Sequence[ASScript]
+    method_bodies: Sequence[ASMethodBody]
+
+    def __init__(
+        self,
+        reader: MemoryViewReader,
+        lazy: bool = False,
+        intern_strings: bool = False,
+        columnar: bool = False,
+    ):
+        """
+        Read ABC file. In the lazy mode, instances, classes, scripts and method bodies are only scanned
+        for their offsets and read when they are indexed for the first time.
+        In the columnar mode, methods and method bodies are read into `avm2.abc.tables` instead.
+        See `ASConstantPool` for `intern_strings`.
+        """
         self.minor_version = reader.read_u16()
         self.major_version = reader.read_u16()
-        self.constant_pool = ASConstantPool(reader)
-        self.methods = read_array(reader, ASMethod)
+        self.constant_pool = ASConstantPool(reader, intern_strings)
+        self.methods = avm2.abc.tables.MethodTable(reader) if columnar else read_array(reader, ASMethod)
         self.metadata = read_array(reader, ASMetadata)
         class_count = reader.read_int()
-        self.instances = read_array(reader, ASInstance, class_count)
-        self.classes = read_array(reader, ASClass, class_count)
-        self.scripts = read_array(reader, ASScript)
-        self.method_bodies = read_array(reader, ASMethodBody)
+        if lazy:
+            self.instances = LazyArray(reader, ASInstance, ASInstance.skip, class_count)
+            self.classes = LazyArray(reader, ASClass, ASClass.skip, class_count)
+            self.scripts = LazyArray(reader, ASScript, ASScript.skip)
+        else:
+            self.instances = read_array(reader, ASInstance, class_count)
+            self.classes = read_array(reader, ASClass, class_count)
+            self.scripts = read_array(reader, ASScript)
+        if columnar:
+            self.method_bodies = avm2.abc.tables.MethodBodyTable(reader)
+        elif lazy:
+            self.method_bodies = LazyArray(reader, ASMethodBody, ASMethodBody.skip)
+        else:
+            self.method_bodies = read_array(reader, ASMethodBody)
+
+    def get_instance_name_indices(self) -> Iterable[ABCMultinameIndex]:
+        """
+        Get name indices of the instances without reading lazy instances.
+        """
+        if isinstance(self.instances, LazyArray):
+            # The name index goes first.
+            return (self.instances.reader(index).read_int() for index in range(len(self.instances)))
+        return (instance.name_index for instance in self.instances)
+
+    def get_method_body_method_indices(self) -> Iterable[ABCMethodIndex]:
+        """
+        Get method indices of the method bodies without reading lazy method bodies.
+        """
+        if isinstance(self.method_bodies, avm2.abc.tables.MethodBodyTable):
+            return self.method_bodies.method_indices
+        if isinstance(self.method_bodies, LazyArray):
+            # The method index goes first.
+            return (self.method_bodies.reader(index).read_int() for index in range(len(self.method_bodies)))
+        return (method_body.method_index for method_body in self.method_bodies)
 
 
 @dataclass
 class ASConstantPool:
-    integers: List[int]
-    unsigned_integers: List[int]
-    doubles: List[float]
-    strings: List[str]
+    integers: Sequence[int]
+    unsigned_integers: Sequence[int]
+    doubles: Sequence[float]
+    strings: Sequence[Optional[str]]
     namespaces: List[ASNamespace]
     ns_sets: List[ASNamespaceSet]
     multinames: List[ASMultiname]
 
-    def __init__(self, reader: MemoryViewReader):
-        self.integers = read_array_with_default(reader, partial(MemoryViewReader.read_int, unsigned=False), 0)
-        self.unsigned_integers = read_array_with_default(reader, MemoryViewReader.read_int, 0)
-        self.doubles = read_array_with_default(reader, MemoryViewReader.read_d64, math.nan)
-        self.strings = read_array_with_default(reader, read_string, None)
+    def __init__(self, reader: MemoryViewReader, intern_strings: bool = False):
+        """
+        Read constant pool. Strings are decoded and interned when they are accessed for the first time,
+        unless `intern_strings` is set, in which case all of them are decoded and interned upfront.
+        """
+        self.integers = read_ints_with_default(reader, unsigned=False)
+        self.unsigned_integers = read_ints_with_default(reader)
+        self.doubles = array('d', [math.nan])
+        self.doubles.extend(reader.read_d64s(max(reader.read_int() - 1, 0)))
+        self.strings = StringPool(reader)
+        if intern_strings:
+            self.strings.intern_all()
         self.namespaces = read_array_with_default(reader, ASNamespace, None)
         self.ns_sets = read_array_with_default(reader, ASNamespaceSet, None)
         self.multinames = read_array_with_default(reader, ASMultiname, None)
+        self.qualified_names: Dict[ABCMultinameIndex, str] = {}
+
+    def get_qualified_name(self, index: ABCMultinameIndex) -> str:
+        """
+        Get qualified name of the multiname. The name is only built once.
+        """
+        try:
+            return self.qualified_names[index]
+        except KeyError:
+            name = self.qualified_names[index] = sys.intern(self.multinames[index].qualified_name(self))
+            return name
+
+
+class StringPool(Sequence[Optional[str]]):
+    """
+    Constant pool strings. Only offsets of the strings are recorded while reading,
+    a string is decoded and interned when it is accessed for the first time.
+    The 0-th string is `None`.
+    """
+
+    def __init__(self, reader: MemoryViewReader):
+        count = max(reader.read_int(), 1)
+        self.buffer = buffer = reader.buffer
+        self.offsets = offsets = array('L', [0])
+        self.lengths = lengths = array('L', [0])
+        self.strings: List[Optional[str]] = [None] * count
+        position = reader.position
+        for _ in range(1, count):
+            # Inlined `MemoryViewReader.read_int`, strings are rarely longer than 127 bytes.
+            if buffer[position] & 0x80:
+                reader.position = position
+                length = reader.read_int()
+                position = reader.position
+            else:
+                length = buffer[position]
+                position += 1
+            offsets.append(position)
+            lengths.append(length)
+            position += length
+        reader.position = position
+
+    def __repr__(self) -> str:
+        return f'StringPool(size={len(self)!r})'
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    @overload
+    def __getitem__(self, index: int) -> Optional[str]:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Optional[str]]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Optional[str], List[Optional[str]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        string = self.strings[index]
+        if string is None and index != 0:
+            offset = self.offsets[index]
+            string = self.strings[index] = sys.intern(str(self.buffer[offset:offset + self.lengths[index]], 'utf-8'))
+        return string
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return (self[index] for index in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def intern_all(self):
+        """
+        Decode and intern all the strings.
+        """
+        for index in range(1, len(self)):
+            self[index]
 
 
 @dataclass
 class ASNamespace:
+    __slots__ = ('kind', 'name_index')
+
     kind: NamespaceKind
     name_index: ABCStringIndex
 
@@ -85,22 +222,31 @@ class ASNamespace:
 
 @dataclass
 class ASNamespaceSet:
-    namespaces: List[ABCNamespaceIndex]
+    __slots__ = ('namespaces',)
+
+    namespaces: Sequence[ABCNamespaceIndex]
 
     def __init__(self, reader: MemoryViewReader):
-        self.namespaces = read_array(reader, MemoryViewReader.read_int)
+        self.namespaces = reader.read_ints(reader.read_int())
 
 
 @dataclass
 class ASMultiname:
+    __slots__ = ('kind', 'namespace_index', 'name_index', 'namespace_set_index', 'q_name_index', 'type_indices')
+
     kind: MultinameKind
-    namespace_index: Optional[ABCNamespaceIndex] = None
-    name_index: Optional[ABCStringIndex] = None
-    namespace_set_index: Optional[ABCNamespaceSetIndex] = None
-    q_name_index: Optional[ABCMultinameIndex] = None
-    type_indices: Optional[List[ABCMultinameIndex]] = None
+    namespace_index: Optional[ABCNamespaceIndex]
+    name_index: Optional[ABCStringIndex]
+    namespace_set_index: Optional[ABCNamespaceSetIndex]
+    q_name_index: Optional[ABCMultinameIndex]
+    type_indices: Optional[Sequence[ABCMultinameIndex]]
 
     def __init__(self, reader: MemoryViewReader):
+        self.namespace_index = None
+        self.name_index = None
+        self.namespace_set_index = None
+        self.q_name_index = None
+        self.type_indices = None
         self.kind = MultinameKind(reader.read_u8())
         if self.kind in (MultinameKind.Q_NAME, MultinameKind.Q_NAME_A):
             self.namespace_index = reader.read_int()
@@ -116,7 +262,7 @@ class ASMultiname:
             self.namespace_set_index = reader.read_int()
         elif self.kind == MultinameKind.TYPE_NAME:
             self.q_name_index = reader.read_int()
-            self.type_indices = read_array(reader, MemoryViewReader.read_int)
+            self.type_indices = reader.read_ints(reader.read_int())
         else:
             assert False, 'unreachable code'
 
@@ -131,28 +277,42 @@ class ASMultiname:
 
 @dataclass
 class ASMethod:
+    __slots__ = (
+        'param_count',
+        'return_type_index',
+        'param_type_indices',
+        'name_index',
+        'flags',
+        'options',
+        'param_name_indices',
+    )
+
     param_count: int
     return_type_index: ABCMultinameIndex
-    param_type_indices: List[ABCMultinameIndex]
+    param_type_indices: Sequence[ABCMultinameIndex]
     name_index: ABCStringIndex
     flags: MethodFlags
-    options: Optional[List[ASOptionDetail]] = None
-    param_name_indices: Optional[List[ABCStringIndex]] = None
+    options: Optional[List[ASOptionDetail]]
+    param_name_indices: Optional[Sequence[ABCStringIndex]]
 
     def __init__(self, reader: MemoryViewReader):
+        self.options = None
+        self.param_name_indices = None
         self.param_count = reader.read_int()
         self.return_type_index = reader.read_int()
-        self.param_type_indices = read_array(reader, MemoryViewReader.read_int, self.param_count)
+        self.param_type_indices = reader.read_ints(self.param_count)
         self.name_index = reader.read_int()
         self.flags = MethodFlags(reader.read_u8())
         if MethodFlags.HAS_OPTIONAL in self.flags:
             self.options = read_array(reader, ASOptionDetail)
         if MethodFlags.HAS_PARAM_NAMES in self.flags:
-            self.param_name_indices = read_array(reader, MemoryViewReader.read_int, self.param_count)
+            self.param_name_indices = reader.read_ints(self.param_count)
 
 
 @dataclass
 class ASOptionDetail:
+    __slots__ = ('value', 'kind')
+
     value: int
     kind: ConstantKind
 
@@ -163,6 +323,8 @@ class ASOptionDetail:
 
 @dataclass
 class ASMetadata:
+    __slots__ = ('name_index', 'items')
+
     name_index: ABCStringIndex
     items: List[ASItem]
 
@@ -173,6 +335,8 @@ class ASMetadata:
 
 @dataclass
 class ASItem:
+    __slots__ = ('key_index', 'value_index')
+
     key_index: ABCStringIndex
     value_index: ABCStringIndex
 
@@ -183,34 +347,58 @@ class ASItem:
 
 @dataclass
 class ASInstance:
+    __slots__ = (
+        'name_index',
+        'super_name_index',
+        'flags',
+        'interface_indices',
+        'init_index',
+        'traits',
+        'protected_namespace_index',
+    )
+
     name_index: ABCMultinameIndex
     super_name_index: ABCMultinameIndex
     flags: ClassFlags
-    interface_indices: List[ABCMultinameIndex]
+    interface_indices: Sequence[ABCMultinameIndex]
     init_index: ABCMethodIndex
     traits: List[ASTrait]
-    protected_namespace_index: Optional[ABCNamespaceIndex] = None
+    protected_namespace_index: Optional[ABCNamespaceIndex]
 
     def __init__(self, reader: MemoryViewReader):
+        self.protected_namespace_index = None
         self.name_index = reader.read_int()
         self.super_name_index = reader.read_int()
         self.flags = ClassFlags(reader.read_u8())
         if ClassFlags.PROTECTED_NS in self.flags:
             self.protected_namespace_index = reader.read_int()
-        self.interface_indices = read_array(reader, MemoryViewReader.read_int)
+        self.interface_indices = reader.read_ints(reader.read_int())
         self.init_index = reader.read_int()
         self.traits = read_array(reader, ASTrait)
 
+    @staticmethod
+    def skip(reader: MemoryViewReader):
+        reader.skip_int()  # name_index
+        reader.skip_int()  # super_name_index
+        if ClassFlags.PROTECTED_NS in ClassFlags(reader.read_u8()):
+            reader.skip_int()  # protected_namespace_index
+        skip_array(reader, MemoryViewReader.skip_int)  # interface_indices
+        reader.skip_int()  # init_index
+        skip_array(reader, ASTrait.skip)
+
 
 @dataclass
 class ASTrait:
+    __slots__ = ('name_index', 'kind', 'attributes', 'data', 'metadata')
+
     name_index: ABCMultinameIndex
     kind: TraitKind
     attributes: TraitAttributes
     data: Union[ASTraitSlot, ASTraitClass, ASTraitFunction, ASTraitMethod]
-    metadata: Optional[List[ABCMetadataIndex]] = None
+    metadata: Optional[Sequence[ABCMetadataIndex]]
 
     def __init__(self, reader: MemoryViewReader):
+        self.metadata = None
         self.name_index = reader.read_int()
         kind = reader.read_u8()
         self.kind = TraitKind(kind & 0x0F)
@@ -226,17 +414,34 @@ class ASTrait:
         else:
             assert False, 'unreachable code'
         if TraitAttributes.METADATA in self.attributes:
-            self.metadata = read_array(reader, MemoryViewReader.read_int)
+            self.metadata = reader.read_ints(reader.read_int())
+
+    @staticmethod
+    def skip(reader: MemoryViewReader):
+        reader.skip_int()  # name_index
+        kind = reader.read_u8()
+        reader.skip_int()  # slot_id or disposition_id
+        if (kind & 0x0F) in (TraitKind.SLOT, TraitKind.CONST):
+            reader.skip_int()  # type_name_index
+            if reader.read_int():  # vindex
+                reader.skip(1)  # vkind
+        else:
+            reader.skip_int()  # class_index, function_index or method_index
+        if TraitAttributes.METADATA in TraitAttributes(kind >> 4):
+            skip_array(reader, MemoryViewReader.skip_int)
 
 
 @dataclass
 class ASTraitSlot:
+    __slots__ = ('slot_id', 'type_name_index', 'vindex', 'vkind')
+
     slot_id: int
     type_name_index: ABCMultinameIndex
     vindex: int
-    vkind: Optional[ConstantKind] = None
+    vkind: Optional[ConstantKind]
 
     def __init__(self, reader: MemoryViewReader):
+        self.vkind = None
         self.slot_id = reader.read_int()
         self.type_name_index = reader.read_int()
         self.vindex = reader.read_int()
@@ -246,6 +451,8 @@ class ASTraitSlot:
 
 @dataclass
 class ASTraitClass:
+    __slots__ = ('slot_id', 'class_index')
+
     slot_id: int
     class_index: ABCClassIndex
 
@@ -256,6 +463,8 @@ class ASTraitClass:
 
 @dataclass
 class ASTraitFunction:
+    __slots__ = ('slot_id', 'function_index')
+
     slot_id: int
     function_index: ABCMethodIndex
 
@@ -266,6 +475,8 @@ class ASTraitFunction:
 
 @dataclass
 class ASTraitMethod:
+    __slots__ = ('disposition_id', 'method_index')
+
     disposition_id: int
     method_index: ABCMethodIndex
 
@@ -276,6 +487,8 @@ class ASTraitMethod:
 
 @dataclass
 class ASClass:
+    __slots__ = ('init_index', 'traits')
+
     init_index: ABCMethodIndex
     traits: List[ASTrait]
 
@@ -283,9 +496,16 @@ class ASClass:
         self.init_index = reader.read_int()
         self.traits = read_array(reader, ASTrait)
 
+    @staticmethod
+    def skip(reader: MemoryViewReader):
+        reader.skip_int()  # init_index
+        skip_array(reader, ASTrait.skip)
+
 
 @dataclass
 class ASScript:
+    __slots__ = ('init_index', 'traits')
+
     init_index: ABCMethodIndex
     traits: List[ASTrait]
 
@@ -293,9 +513,25 @@ class ASScript:
         self.init_index = reader.read_int()
         self.traits = read_array(reader, ASTrait)
 
+    @staticmethod
+    def skip(reader: MemoryViewReader):
+        reader.skip_int()  # init_index
+        skip_array(reader, ASTrait.skip)
+
 
 @dataclass
 class ASMethodBody:
+    __slots__ = (
+        'method_index',
+        'max_stack',
+        'local_count',
+        'init_scope_depth',
+        'max_scope_depth',
+        'code',
+        'exceptions',
+        'traits',
+    )
+
     method_index: ABCMethodIndex
     max_stack: int
     local_count: int
@@ -306,18 +542,31 @@ class ASMethodBody:
     traits: List[ASTrait]
 
     def __init__(self, reader: MemoryViewReader):
-        self.method_index = reader.read_int()
-        self.max_stack = reader.read_int()
-        self.local_count = reader.read_int()
-        self.init_scope_depth = reader.read_int()
-        self.max_scope_depth = reader.read_int()
-        self.code = reader.read(reader.read_int())
+        (
+            self.method_index,
+            self.max_stack,
+            self.local_count,
+            self.init_scope_depth,
+            self.max_scope_depth,
+            code_length,
+        ) = reader.read_ints(6)
+        self.code = reader.read(code_length)
         self.exceptions = read_array(reader, ASException)
         self.traits = read_array(reader, ASTrait)
 
+    @staticmethod
+    def skip(reader: MemoryViewReader):
+        for _ in range(5):
+            reader.skip_int()  # method_index, max_stack, local_count, init_scope_depth, max_scope_depth
+        reader.skip(reader.read_int())  # code
+        skip_array(reader, ASException.skip)
+        skip_array(reader, ASTrait.skip)
+
 
 @dataclass
 class ASException:
+    __slots__ = ('from_', 'to', 'target', 'exc_type_index', 'var_name_index')
+
     from_: int
     to: int
     target: int
@@ -325,8 +574,9 @@ class ASException:
     var_name_index: ABCStringIndex
 
     def __init__(self, reader: MemoryViewReader):
-        self.from_ = reader.read_int()
-        self.to = reader.read_int()
-        self.target = reader.read_int()
-        self.exc_type_index = reader.read_int()
-        self.var_name_index = reader.read_int()
+        self.from_, self.to, self.target, self.exc_type_index, self.var_name_index = reader.read_ints(5)
+
+    @staticmethod
+    def skip(reader: MemoryViewReader):
+        for _ in range(5):
+            reader.skip_int()
@@ -0,0 +1,253 @@
+"""
+Batch execution of numeric methods over NumPy arrays.
+
+Every argument is an array, and the method is executed once for all the elements. Lanes (elements) which take
+the same path through the method form a group, a group is split when its lanes disagree on a branch.
+Only methods which use arithmetic, comparisons, constants, registers and branches can be executed this way.
+Division by zero follows AS3 and gives `Infinity` or `NaN`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Tuple, Type, TypeVar
+
+import avm2.vm
+from avm2.abc.instructions import (
+    Add,
+    AddInteger,
+    ConvertToDouble,
+    ConvertToInteger,
+    Divide,
+    Dup,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GreaterEquals,
+    IfFalse,
+    IfLT,
+    IfNGT,
+    IfNLT,
+    Instruction,
+    Jump,
+    MethodCode,
+    Pop,
+    PushByte,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushTrue,
+    ReturnValue,
+    SetLocal0,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    SubtractInteger,
+    local_indices,
+)
+from avm2.io import numpy
+
+# Operates on registers and the operand stack of a lane group. Values are either arrays of the group size or scalars.
+Operation = Callable[[Instruction, 'avm2.vm.VirtualMachine', List[Any], List[Any]], None]
+# Pops the operands of a branch and gets the mask of the lanes which take the jump.
+Condition = Callable[[Instruction, List[Any]], Any]
+
+
+def can_execute_batch(code: MethodCode) -> bool:
+    """
+    Check if every instruction of the method code can be executed over arrays.
+    """
+    supported = {*operations, *conditions, Jump, ReturnValue}
+    return all(type(instruction_) in supported for instruction_ in code.instructions)
+
+
+def execute_batch(machine: avm2.vm.VirtualMachine, code: MethodCode, registers: List[Any], size: int) -> numpy.ndarray:
+    """
+    Execute the method code over arrays of the `size` passed in the registers, and get an array of return values.
+    """
+    returned: List[Tuple[numpy.ndarray, Any]] = []
+    groups: List[Tuple[int, numpy.ndarray, List[Any], List[Any]]] = [(0, numpy.arange(size), registers, [])]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        while groups:
+            index, lanes, registers, stack = groups.pop()
+            while True:
+                instruction_ = code.instructions[index]
+                type_ = type(instruction_)
+                if type_ in operations:
+                    operations[type_](instruction_, machine, registers, stack)
+                    index += 1
+                    continue
+                if isinstance(instruction_, ReturnValue):
+                    returned.append((lanes, stack.pop()))
+                    break
+                target_index = code.jump(index, instruction_.offset)
+                if isinstance(instruction_, Jump):
+                    index = target_index
+                    continue
+                mask = numpy.broadcast_to(conditions[type_](instruction_, stack), lanes.shape)
+                if mask.all():
+                    index = target_index
+                elif not mask.any():
+                    index += 1
+                else:
+                    groups.append((target_index, lanes[mask], select(registers, mask), select(stack, mask)))
+                    mask = ~mask
+                    index, lanes = index + 1, lanes[mask]
+                    registers, stack = select(registers, mask), select(stack, mask)
+    result = numpy.empty(size, dtype=numpy.result_type(*(value for _, value in returned)))
+    for lanes, value in returned:
+        result[lanes] = value
+    return result
+
+
+def select(values: List[Any], mask: numpy.ndarray) -> List[Any]:
+    """
+    Select the lanes from the arrays, scalars are shared by all lanes.
+    """
+    return [value[mask] if isinstance(value, numpy.ndarray) else value for value in values]
+
+
+def to_integer(value: Any) -> Any:
+    return value.astype(numpy.int64) if isinstance(value, numpy.ndarray) else int(value)
+
+
+def to_double(value: Any) -> Any:
+    return value.astype(numpy.float64) if isinstance(value, numpy.ndarray) else float(value)
+
+
+T = TypeVar('T', bound=Callable)
+operations: Dict[Type[Instruction], Operation] = {}
+conditions: Dict[Type[Instruction], Condition] = {}
+
+
+def operation(*classes: Type[Instruction]) -> Callable[[T], T]:
+    def wrapper(operate: T) -> T:
+        for class_ in classes:
+            assert class_ not in operations, operations[class_]
+            operations[class_] = operate
+        return operate
+    return wrapper
+
+
+def condition(*classes: Type[Instruction]) -> Callable[[T], T]:
+    def wrapper(condition_: T) -> T:
+        for class_ in classes:
+            assert class_ not in conditions, conditions[class_]
+            conditions[class_] = condition_
+        return condition_
+    return wrapper
+
+
+# Operations implementation.
+# ----------------------------------------------------------------------------------------------------------------------
+
+@operation(Add)
+def add(instruction_: Add, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    value_2 = stack.pop()
+    stack.append(stack.pop() + value_2)
+
+
+@operation(AddInteger)
+def add_integer(instruction_: AddInteger, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    value_2 = stack.pop()
+    stack.append(to_integer(stack.pop()) + to_integer(value_2))
+
+
+@operation(ConvertToDouble)
+def convert_to_double(
+    instruction_: ConvertToDouble,
+    machine: avm2.vm.VirtualMachine,
+    registers: List[Any],
+    stack: List[Any],
+):
+    stack.append(to_double(stack.pop()))
+
+
+@operation(ConvertToInteger)
+def convert_to_integer(
+    instruction_: ConvertToInteger,
+    machine: avm2.vm.VirtualMachine,
+    registers: List[Any],
+    stack: List[Any],
+):
+    stack.append(to_integer(stack.pop()))
+
+
+@operation(Divide)
+def divide(instruction_: Divide, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    value_2 = stack.pop()
+    stack.append(numpy.true_divide(stack.pop(), value_2))
+
+
+@operation(Dup)
+def dup(instruction_: Dup, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    stack.append(stack[-1])
+
+
+@operation(GetLocal0, GetLocal1, GetLocal2, GetLocal3)
+def get_local(instruction_: Instruction, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    stack.append(registers[local_indices[type(instruction_)]])
+
+
+@operation(GreaterEquals)
+def greater_equals(
+    instruction_: GreaterEquals,
+    machine: avm2.vm.VirtualMachine,
+    registers: List[Any],
+    stack: List[Any],
+):
+    value_2 = stack.pop()
+    stack.append(stack.pop() >= value_2)
+
+
+@operation(Pop)
+def pop(instruction_: Pop, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    stack.pop()
+
+
+@operation(PushByte, PushDouble, PushFalse, PushInteger, PushTrue)
+def push_constant(instruction_: Instruction, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    # The instructions don't depend on the environment.
+    instruction_.execute(machine, avm2.vm.MethodEnvironment(registers, [], stack))
+
+
+@operation(SetLocal0, SetLocal1, SetLocal2, SetLocal3)
+def set_local(instruction_: Instruction, machine: avm2.vm.VirtualMachine, registers: List[Any], stack: List[Any]):
+    registers[local_indices[type(instruction_)]] = stack.pop()
+
+
+@operation(SubtractInteger)
+def subtract_integer(
+    instruction_: SubtractInteger,
+    machine: avm2.vm.VirtualMachine,
+    registers: List[Any],
+    stack: List[Any],
+):
+    value_2 = stack.pop()
+    stack.append(to_integer(stack.pop()) - to_integer(value_2))
+
+
+# Conditions implementation.
+# ----------------------------------------------------------------------------------------------------------------------
+
+@condition(IfFalse)
+def if_false(instruction_: IfFalse, stack: List[Any]) -> Any:
+    return numpy.logical_not(stack.pop())
+
+
+@condition(IfLT)
+def if_lt(instruction_: IfLT, stack: List[Any]) -> Any:
+    value_2 = stack.pop()
+    return stack.pop() < value_2
+
+
+@condition(IfNGT)
+def if_ngt(instruction_: IfNGT, stack: List[Any]) -> Any:
+    value_2 = stack.pop()
+    return numpy.logical_not(stack.pop() > value_2)
+
+
+@condition(IfNLT)
+def if_nlt(instruction_: IfNLT, stack: List[Any]) -> Any:
+    value_2 = stack.pop()
+    return numpy.logical_not(stack.pop() < value_2)
@@ -0,0 +1,165 @@
+"""
+Persistent on-disk cache of parsed ABC files.
+
+Cache entries are pickled, so the cache directory must only be writable by trusted users.
+"""
+
+from __future__ import annotations
+
+import copyreg
+import gc
+import os
+import pickle
+from hashlib import sha256
+from io import BytesIO
+from os import PathLike
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, BinaryIO, Callable, Optional, Tuple, Union
+
+import avm2
+from avm2.abc.parser import LazyArray
+from avm2.abc.tables import MethodBodyTable, MethodTable
+from avm2.abc.types import ABCFile, StringPool
+from avm2.io import MemoryViewReader
+from avm2.vm import LinkTables, VirtualMachine
+
+# Bump on any change of the cached structures.
+FORMAT_VERSION = 4
+
+MAGIC = b'AVM2ABC\x00'
+SUFFIX = '.abc'
+
+Reducer = Callable[[Any], Tuple[Any, ...]]
+
+
+class ABCCache:
+    """
+    Cache of parsed ABC files together with the virtual machine link tables.
+    Entries are keyed by the content hash of ABC file bytes and invalidated when the library version changes.
+    The least recently used entries are evicted when the cache exceeds its maximum size.
+    """
+
+    def __init__(self, directory: Union[str, PathLike], max_size: int = 512 * 1024 * 1024):
+        self.directory = Path(directory).expanduser()
+        self.max_size = max_size
+        self.header = MAGIC + f'{FORMAT_VERSION}:{avm2.__version__}\n'.encode()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get_machine(self, abc_file: Union[memoryview, bytes]) -> VirtualMachine:
+        """
+        Get the virtual machine for the raw ABC file. The file is parsed and cached on a cache miss.
+        """
+        machine = self.load(abc_file)
+        if machine is None:
+            machine = VirtualMachine(ABCFile(MemoryViewReader(abc_file)))
+            self.store(abc_file, machine)
+        return machine
+
+    def load(self, abc_file: Union[memoryview, bytes]) -> Optional[VirtualMachine]:
+        """
+        Load the virtual machine for the raw ABC file, or get `None` if it is not cached.
+        """
+        path = self.get_path(abc_file)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if not data.startswith(self.header):
+            # Written by another version of the library.
+            path.unlink()
+            return None
+        try:
+            parsed_file, link_tables = loads(memoryview(data)[len(self.header):])
+        except (EOFError, pickle.UnpicklingError):
+            # Truncated or corrupt.
+            path.unlink()
+            return None
+        os.utime(path)  # mark as recently used
+        return VirtualMachine(parsed_file, link_tables)
+
+    def store(self, abc_file: Union[memoryview, bytes], machine: VirtualMachine):
+        """
+        Store the virtual machine parsed from the raw ABC file and evict old entries if needed.
+        """
+        path = self.get_path(abc_file)
+        file = NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False)
+        try:
+            with file:
+                file.write(self.header)
+                file.write(dumps(machine.abc_file, machine.link_tables))
+            os.replace(file.name, path)
+        except BaseException:
+            os.unlink(file.name)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits the maximum size.
+        """
+        entries = []
+        for path in self.directory.glob(f'*{SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed concurrently
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def get_path(self, abc_file: Union[memoryview, bytes]) -> Path:
+        return self.directory / f'{sha256(abc_file).hexdigest()}{SUFFIX}'
+
+
+def dumps(abc_file: ABCFile, link_tables: LinkTables) -> bytes:
+    """
+    Serialize the parsed ABC file and the link tables.
+    Lazy arrays, string pools and columnar tables are read completely.
+    """
+    buffer = BytesIO()
+    create_pickler(buffer, reduce_memory_view, reduce_lazy_array).dump((abc_file, link_tables))
+    return buffer.getvalue()
+
+
+def create_pickler(file: BinaryIO, reduce_memory_view: Reducer, reduce_lazy_array: Reducer) -> pickle.Pickler:
+    """
+    Create the pickler of parsed ABC files with the reducers of memory views and lazy arrays.
+    String pools and columnar tables are reduced as lazy arrays.
+    """
+    pickler = pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[memoryview] = reduce_memory_view
+    for class_ in (LazyArray, StringPool, MethodTable, MethodBodyTable):
+        pickler.dispatch_table[class_] = reduce_lazy_array
+    return pickler
+
+
+def loads(data: Union[memoryview, bytes]) -> Tuple[ABCFile, LinkTables]:
+    """
+    Deserialize the parsed ABC file and the link tables.
+    """
+    # Hundreds of thousands of objects get created here, and none of them are garbage.
+    # Garbage collection would take the most of the time otherwise.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def reduce_memory_view(value: memoryview) -> Tuple[Any, ...]:
+    return memoryview, (value.tobytes(),)
+
+
+def reduce_lazy_array(value: Union[LazyArray, StringPool]) -> Tuple[Any, ...]:
+    return list, (list(value),)
@@ -0,0 +1,429 @@
+"""
+Method body compiler: stack byte-code is translated into Python source and executed once.
+
+Operand stack slots and registers become local variables of the generated function, the stack depth
+of every instruction is known at compile time. Control flow becomes a `pc`-switch loop over basic blocks.
+Methods with instructions that can't be compiled are left to the interpreter.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, TypeVar
+
+import avm2.vm
+from avm2.abc.instructions import (
+    Add,
+    AddInteger,
+    ConvertToDouble,
+    ConvertToInteger,
+    Divide,
+    Dup,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GetLocalPair,
+    GetScopeObject,
+    GreaterEquals,
+    IfFalse,
+    IfLT,
+    IfNGT,
+    IfNLT,
+    Instruction,
+    Jump,
+    LookupSwitch,
+    MethodCode,
+    Pop,
+    PushByte,
+    PushConstant,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushTrue,
+    ReturnValue,
+    ReturnVoid,
+    SetLocal0,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    SubtractInteger,
+    local_indices,
+)
+from avm2.runtime import undefined
+
+CompiledFunction = Callable[['avm2.vm.VirtualMachine', 'avm2.vm.MethodEnvironment'], Any]
+Emitter = Callable[[Instruction, 'Compiler'], None]
+
+# Instructions which end a basic block.
+BRANCHES = (IfFalse, IfLT, IfNGT, IfNLT, Jump, LookupSwitch)
+TERMINATORS = (Jump, LookupSwitch, ReturnValue, ReturnVoid)
+
+
+@dataclass
+class CompiledCode:
+    """
+    Method code compiled into a Python function.
+    """
+
+    source: str
+    function: CompiledFunction
+
+
+def compile_code(machine: avm2.vm.VirtualMachine, code: MethodCode, local_count: int) -> Optional[CompiledCode]:
+    """
+    Compile the method code, or get `None` if it contains an instruction that can't be compiled.
+    """
+    try:
+        source, namespace = Compiler(machine, code, local_count).compile()
+    except NotImplementedError:
+        return None
+    exec(compile(source, '<avm2>', 'exec'), namespace)
+    return CompiledCode(source, namespace['compiled'])
+
+
+class Compiler:
+    """
+    Translates method code into the source of `compiled(machine, environment)` function.
+    """
+
+    def __init__(self, machine: avm2.vm.VirtualMachine, code: MethodCode, local_count: int):
+        self.machine = machine
+        self.code = code
+        self.local_count = local_count
+        self.namespace: Dict[str, Any] = {'undefined': undefined}
+        self.leaders = self.find_leaders()
+
+        # Basic block being emitted.
+        self.index = 0  # of the current instruction
+        self.block_index = 0
+        self.depth = 0  # of the operand stack
+        self.lines: List[str] = []
+        self.indent = 0
+
+        # Entry stack depths of the reachable basic blocks.
+        self.block_depths: Dict[int, int] = {}
+        self.pending_blocks: List[int] = []
+
+    def compile(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the function source and the namespace it should be executed in.
+        """
+        blocks: Dict[int, List[str]] = {}
+        self.enter(0)
+        while self.pending_blocks:
+            block_index = self.pending_blocks.pop()
+            blocks[block_index] = self.emit_block(block_index)
+        registers = ', '.join(f'r{index}' for index in range(self.local_count))
+        lines = [
+            'def compiled(machine, environment):',
+            f'    [{registers}] = environment.registers',
+            '    scope_stack = environment.scope_stack',
+            '    pc = 0',
+            '    while True:',
+        ]
+        for block_index in sorted(blocks):
+            lines.append(f'        if pc == {block_index}:')
+            lines.extend(f'            {line}' for line in blocks[block_index])
+        return '\n'.join(lines) + '\n', self.namespace
+
+    def find_leaders(self) -> Set[int]:
+        """
+        Find indices of the instructions which start basic blocks.
+        """
+        leaders = {0}
+        for index, instruction_ in enumerate(self.code.instructions):
+            if isinstance(instruction_, BRANCHES + TERMINATORS):
+                leaders.add(index + 1)
+            for offset in get_jump_offsets(instruction_):
+                try:
+                    leaders.add(self.code.jump(index, offset))
+                except KeyError:
+                    pass  # unreachable code may jump anywhere
+        return leaders
+
+    def emit_block(self, block_index: int) -> List[str]:
+        self.block_index = self.index = block_index
+        self.depth = self.block_depths[block_index]
+        self.lines = []
+        self.indent = 0
+        while True:
+            if self.index == len(self.code.instructions):
+                raise NotImplementedError('execution falls off the end of the code')
+            instruction_ = self.code.instructions[self.index]
+            try:
+                emit = emitters[type(instruction_)]
+            except KeyError:
+                raise NotImplementedError(instruction_)
+            emit(instruction_, self)
+            if isinstance(instruction_, BRANCHES + TERMINATORS):
+                return self.lines
+            self.index += 1
+            if self.index in self.leaders:
+                self.goto(self.index)
+                return self.lines
+
+    # Emitter helpers.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def write(self, line: str):
+        self.lines.append('    ' * self.indent + line)
+
+    def push(self, expression: str):
+        self.write(f's{self.depth} = {expression}')
+        self.depth += 1
+
+    def pop(self) -> str:
+        if self.depth == 0:
+            raise NotImplementedError('stack underflow')
+        self.depth -= 1
+        return f's{self.depth}'
+
+    def constant(self, value: Any) -> str:
+        """
+        Get an expression of the constant value.
+        """
+        if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+            return repr(value)
+        name = f'constant_{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def goto(self, index: int):
+        """
+        Transfer control to the instruction with the current stack depth.
+        """
+        self.enter(index)
+        self.write(f'pc = {index}')
+        if index <= self.block_index:
+            # Blocks are checked in order, a jump backwards needs another iteration of the loop.
+            self.write('continue')
+
+    def jump(self, offset: int):
+        try:
+            index = self.code.jump(self.index, offset)
+        except KeyError:
+            raise NotImplementedError(f'invalid jump offset: {offset}')
+        self.goto(index)
+
+    def branch(self, condition: str, offset: int):
+        """
+        Jump by the offset if the condition holds, and continue with the next instruction otherwise.
+        """
+        self.write(f'if {condition}:')
+        self.indent += 1
+        self.jump(offset)
+        self.indent -= 1
+        self.write('else:')
+        self.indent += 1
+        self.goto(self.index + 1)
+        self.indent -= 1
+
+    def enter(self, index: int):
+        """
+        Record the entry stack depth of the basic block, and schedule the block for emitting.
+        """
+        if index not in self.block_depths:
+            self.block_depths[index] = self.depth
+            self.pending_blocks.append(index)
+        elif self.block_depths[index] != self.depth:
+            raise NotImplementedError(f'stack depth mismatch: {self.block_depths[index]} != {self.depth}')
+
+
+def get_jump_offsets(instruction_: Instruction) -> List[int]:
+    if isinstance(instruction_, LookupSwitch):
+        return [instruction_.default_offset, *instruction_.case_offsets]
+    if isinstance(instruction_, BRANCHES):
+        return [instruction_.offset]
+    return []
+
+
+T = TypeVar('T', bound=Emitter)
+emitters: Dict[Type[Instruction], Emitter] = {}
+
+
+def emitter(*classes: Type[Instruction]) -> Callable[[T], T]:
+    def wrapper(emit: T) -> T:
+        for class_ in classes:
+            assert class_ not in emitters, emitters[class_]
+            emitters[class_] = emit
+        return emit
+    return wrapper
+
+
+# Emitters implementation.
+# ----------------------------------------------------------------------------------------------------------------------
+
+@emitter(Add)
+def emit_add(instruction_: Add, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    compiler.push(f'{value_1} + {value_2}')
+
+
+@emitter(AddInteger)
+def emit_add_integer(instruction_: AddInteger, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    compiler.push(f'int({value_1}) + int({value_2})')
+
+
+@emitter(ConvertToDouble)
+def emit_convert_to_double(instruction_: ConvertToDouble, compiler: Compiler):
+    compiler.push(f'float({compiler.pop()})')
+
+
+@emitter(ConvertToInteger)
+def emit_convert_to_integer(instruction_: ConvertToInteger, compiler: Compiler):
+    compiler.push(f'int({compiler.pop()})')
+
+
+@emitter(Divide)
+def emit_divide(instruction_: Divide, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    compiler.push(f'{value_1} / {value_2}')
+
+
+@emitter(Dup)
+def emit_dup(instruction_: Dup, compiler: Compiler):
+    value = compiler.pop()
+    compiler.depth += 1
+    compiler.push(value)
+
+
+@emitter(GetLocal0, GetLocal1, GetLocal2, GetLocal3)
+def emit_get_local(instruction_: Instruction, compiler: Compiler):
+    register_index = local_indices[type(instruction_)]
+    if register_index >= compiler.local_count:
+        raise NotImplementedError(f'invalid register: {register_index}')
+    compiler.push(f'r{register_index}')
+
+
+@emitter(GetLocalPair)
+def emit_get_local_pair(instruction_: GetLocalPair, compiler: Compiler):
+    for register_index in (instruction_.index_1, instruction_.index_2):
+        if register_index >= compiler.local_count:
+            raise NotImplementedError(f'invalid register: {register_index}')
+        compiler.push(f'r{register_index}')
+
+
+@emitter(GetScopeObject)
+def emit_get_scope_object(instruction_: GetScopeObject, compiler: Compiler):
+    compiler.push(f'scope_stack[{instruction_.index}]')
+
+
+@emitter(GreaterEquals)
+def emit_greater_equals(instruction_: GreaterEquals, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    compiler.push(f'{value_1} >= {value_2}')
+
+
+@emitter(IfFalse)
+def emit_if_false(instruction_: IfFalse, compiler: Compiler):
+    compiler.branch(f'not {compiler.pop()}', instruction_.offset)
+
+
+@emitter(IfLT)
+def emit_if_lt(instruction_: IfLT, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    compiler.branch(f'{value_1} < {value_2}', instruction_.offset)
+
+
+@emitter(IfNGT)
+def emit_if_ngt(instruction_: IfNGT, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    # FIXME: NaN.
+    compiler.branch(f'not {value_1} > {value_2}', instruction_.offset)
+
+
+@emitter(IfNLT)
+def emit_if_nlt(instruction_: IfNLT, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    # FIXME: NaN.
+    compiler.branch(f'not {value_1} < {value_2}', instruction_.offset)
+
+
+@emitter(Jump)
+def emit_jump(instruction_: Jump, compiler: Compiler):
+    compiler.jump(instruction_.offset)
+
+
+@emitter(LookupSwitch)
+def emit_lookup_switch(instruction_: LookupSwitch, compiler: Compiler):
+    index = compiler.pop()
+    for case_index, offset in enumerate(instruction_.case_offsets):
+        compiler.write(f'{"if" if case_index == 0 else "elif"} {index} == {case_index}:')
+        compiler.indent += 1
+        compiler.jump(offset)
+        compiler.indent -= 1
+    compiler.write('else:')
+    compiler.indent += 1
+    compiler.jump(instruction_.default_offset)
+    compiler.indent -= 1
+
+
+@emitter(Pop)
+def emit_pop(instruction_: Pop, compiler: Compiler):
+    compiler.pop()
+
+
+@emitter(PushByte)
+def emit_push_byte(instruction_: PushByte, compiler: Compiler):
+    compiler.push(compiler.constant(instruction_.byte_value))
+
+
+@emitter(PushConstant)
+def emit_push_constant(instruction_: PushConstant, compiler: Compiler):
+    compiler.push(compiler.constant(instruction_.value))
+
+
+@emitter(PushDouble)
+def emit_push_double(instruction_: PushDouble, compiler: Compiler):
+    compiler.push(compiler.constant(compiler.machine.doubles[instruction_.index]))
+
+
+@emitter(PushFalse)
+def emit_push_false(instruction_: PushFalse, compiler: Compiler):
+    compiler.push('False')
+
+
+@emitter(PushInteger)
+def emit_push_integer(instruction_: PushInteger, compiler: Compiler):
+    compiler.push(compiler.constant(compiler.machine.integers[instruction_.index]))
+
+
+@emitter(PushTrue)
+def emit_push_true(instruction_: PushTrue, compiler: Compiler):
+    compiler.push('True')
+
+
+@emitter(ReturnValue)
+def emit_return_value(instruction_: ReturnValue, compiler: Compiler):
+    # FIXME: coerce to the expected return type.
+    compiler.write(f'return {compiler.pop()}')
+
+
+@emitter(ReturnVoid)
+def emit_return_void(instruction_: ReturnVoid, compiler: Compiler):
+    compiler.write('return undefined')
+
+
+@emitter(SetLocal0, SetLocal1, SetLocal2, SetLocal3)
+def emit_set_local(instruction_: Instruction, compiler: Compiler):
+    register_index = local_indices[type(instruction_)]
+    if register_index >= compiler.local_count:
+        raise NotImplementedError(f'invalid register: {register_index}')
+    compiler.write(f'r{register_index} = {compiler.pop()}')
+
+
+@emitter(SubtractInteger)
+def emit_subtract_integer(instruction_: SubtractInteger, compiler: Compiler):
+    value_2 = compiler.pop()
+    value_1 = compiler.pop()
+    compiler.push(f'int({value_1}) - int({value_2})')
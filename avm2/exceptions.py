@@ -1,15 +1,8 @@
-from typing import Any
-
-
 class ASException(Exception):
     pass
 
 
-class ASReturnException(ASException):
-    def __init__(self, return_value: Any):
-        self.return_value = return_value
-
-
-class ASJumpException(ASException):
-    def __init__(self, offset: int):
-        self.offset = offset
+class VerifyError(Exception):
+    """
+    Method body failed verification.
+    """
@@ -0,0 +1,217 @@
+"""
+Hierarchical index of the qualified class and method names: package → class → trait.
+
+The index is filled on demand. Packages are found from the namespaces of the instance names without decoding
+the class names, the class names of a package are decoded when the package is looked into for the first time,
+and the trait names of a class when the class is looked into for the first time. The names are `package.Class`
+and `package.Class.trait`, where `trait` is the qualified name of a method, getter or setter trait of the class.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from avm2.abc.enums import TraitKind
+from avm2.abc.types import ABCClassIndex, ABCFile, ABCMethodIndex, ABCMultinameIndex
+
+METHOD_TRAIT_KINDS = (TraitKind.GETTER, TraitKind.SETTER, TraitKind.METHOD)
+
+
+class NameIndex:
+    def __init__(self, abc_file: ABCFile):
+        self.abc_file = abc_file
+        self.constant_pool = abc_file.constant_pool
+
+        self.package_class_indices: Optional[Dict[str, List[ABCClassIndex]]] = None  # built on the first use
+        self.package_classes: Dict[str, Dict[str, ABCClassIndex]] = {}  # qualified class names by package
+        self.class_methods: Dict[ABCClassIndex, Dict[str, ABCMethodIndex]] = {}  # qualified trait names by class
+        self.method_traits: Optional[Dict[ABCMethodIndex, Tuple[ABCClassIndex, ABCMultinameIndex]]] = None
+        self.method_names: Dict[ABCMethodIndex, Optional[str]] = {}
+
+        # Read-only mappings of all the names.
+        self.classes = ClassNames(self)
+        self.methods = MethodNames(self)
+
+    # Levels.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def get_packages(self) -> List[str]:
+        """
+        Get the package names, sorted.
+        """
+        return sorted(self.get_package_class_indices())
+
+    def get_package_class_indices(self) -> Dict[str, List[ABCClassIndex]]:
+        if self.package_class_indices is None:
+            strings = self.constant_pool.strings
+            namespaces = self.constant_pool.namespaces
+            multinames = self.constant_pool.multinames
+            package_class_indices: DefaultDict[str, List[ABCClassIndex]] = defaultdict(list)
+            for class_index, name_index in enumerate(self.abc_file.get_instance_name_indices()):
+                namespace = namespaces[multinames[name_index].namespace_index]
+                package_class_indices[strings[namespace.name_index]].append(ABCClassIndex(class_index))
+            self.package_class_indices = dict(package_class_indices)
+        return self.package_class_indices
+
+    def get_classes(self, package: str) -> Dict[str, ABCClassIndex]:
+        """
+        Get the class indices of the package by the qualified class names.
+        Raise `KeyError` if there's no such package.
+        """
+        try:
+            return self.package_classes[package]
+        except KeyError:
+            pass
+        classes = self.package_classes[package] = {
+            self.get_class_name(class_index): class_index
+            for class_index in self.get_package_class_indices()[package]
+        }
+        return classes
+
+    def get_methods(self, class_index: ABCClassIndex) -> Dict[str, ABCMethodIndex]:
+        """
+        Get the method indices of the class traits by the qualified trait names.
+        """
+        try:
+            return self.class_methods[class_index]
+        except KeyError:
+            pass
+        methods = self.class_methods[class_index] = {
+            self.constant_pool.get_qualified_name(trait.name_index): trait.data.method_index
+            for trait in self.abc_file.classes[class_index].traits
+            if trait.kind in METHOD_TRAIT_KINDS
+        }
+        return methods
+
+    # Lookup.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def lookup_class(self, qualified_name: str) -> ABCClassIndex:
+        """
+        Get the class index by the qualified class name. Raise `KeyError` if there's no such class.
+        """
+        package, _, _ = qualified_name.rpartition('.')
+        try:
+            return self.get_classes(package)[qualified_name]
+        except KeyError:
+            raise KeyError(qualified_name) from None
+
+    def lookup_method(self, qualified_name: str) -> ABCMethodIndex:
+        """
+        Get the method index by the qualified method name. Raise `KeyError` if there's no such method.
+        """
+        # Trait names may contain dots too, so every split into a class name and a trait name is tried.
+        dot_index = qualified_name.find('.')
+        while dot_index != -1:
+            class_index = self.classes.get(qualified_name[:dot_index])
+            if class_index is not None:
+                method_index = self.get_methods(class_index).get(qualified_name[dot_index + 1:])
+                if method_index is not None:
+                    return method_index
+            dot_index = qualified_name.find('.', dot_index + 1)
+        raise KeyError(qualified_name)
+
+    def get_class_name(self, class_index: ABCClassIndex) -> str:
+        return self.constant_pool.get_qualified_name(self.abc_file.instances[class_index].name_index)
+
+    def get_method_name(self, method_index: ABCMethodIndex) -> Optional[str]:
+        """
+        Get the qualified name of the method, or `None` if the method isn't a class trait.
+        """
+        try:
+            return self.method_names[method_index]
+        except KeyError:
+            pass
+        if self.method_traits is None:
+            self.method_traits = {
+                trait.data.method_index: (ABCClassIndex(class_index), trait.name_index)
+                for class_index, class_ in enumerate(self.abc_file.classes)
+                for trait in class_.traits
+                if trait.kind in METHOD_TRAIT_KINDS
+            }
+        try:
+            class_index, name_index = self.method_traits[method_index]
+        except KeyError:
+            name = None
+        else:
+            name = f'{self.get_class_name(class_index)}.{self.constant_pool.get_qualified_name(name_index)}'
+        self.method_names[method_index] = name
+        return name
+
+    # Enumeration.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def iter_classes(self, prefix: str = '') -> Iterator[Tuple[str, ABCClassIndex]]:
+        """
+        Iterate over the qualified class names starting with the prefix, and the class indices.
+        A trailing `*` is ignored, so `game.battle.*` enumerates the package and its subpackages.
+        Only the packages which may contain such classes get their class names decoded.
+        """
+        prefix = prefix.rstrip('*')
+        for package in self.get_packages():
+            if may_contain(package, prefix):
+                for name, class_index in self.get_classes(package).items():
+                    if name.startswith(prefix):
+                        yield name, class_index
+
+    def iter_methods(self, prefix: str = '') -> Iterator[Tuple[str, ABCMethodIndex]]:
+        """
+        Iterate over the qualified method names starting with the prefix, and the method indices.
+        A trailing `*` is ignored. Only the classes which may contain such methods get their trait names decoded.
+        """
+        prefix = prefix.rstrip('*')
+        for package in self.get_packages():
+            if not may_contain(package, prefix):
+                continue
+            for class_name, class_index in self.get_classes(package).items():
+                if not may_contain(class_name, prefix):
+                    continue
+                for trait_name, method_index in self.get_methods(class_index).items():
+                    name = f'{class_name}.{trait_name}'
+                    if name.startswith(prefix):
+                        yield name, method_index
+
+
+def may_contain(parent: str, prefix: str) -> bool:
+    """
+    Check if the names under the parent name may start with the prefix.
+    """
+    head = f'{parent}.' if parent else ''
+    return head.startswith(prefix) or prefix.startswith(head)
+
+
+class ClassNames(Mapping[str, ABCClassIndex]):
+    """
+    Read-only mapping of the qualified class names to the class indices.
+    """
+
+    def __init__(self, index: NameIndex):
+        self.index = index
+
+    def __getitem__(self, qualified_name: str) -> ABCClassIndex:
+        return self.index.lookup_class(qualified_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self.index.iter_classes())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class MethodNames(Mapping[str, ABCMethodIndex]):
+    """
+    Read-only mapping of the qualified method names to the method indices.
+    """
+
+    def __init__(self, index: NameIndex):
+        self.index = index
+
+    def __getitem__(self, qualified_name: str) -> ABCMethodIndex:
+        return self.index.lookup_method(qualified_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self.index.iter_methods())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
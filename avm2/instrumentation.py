@@ -0,0 +1,118 @@
+"""
+Opt-in execution counters of the virtual machine.
+
+Executed instructions are counted per instruction class, and method calls are counted and timed per method.
+Method times are inclusive: they include the time spent in the callees.
+Instructions are counted in the interpreter and the threaded code, the register-based code and the compiled code
+have no instruction boundaries, their methods are only counted and timed.
+
+The counters are installed when the virtual machine is created with `instrument=True`: method calls by replacing
+`invoke_method` on the instance, and interpreted instructions by the machine instruction hook.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import Any, Callable, DefaultDict, Dict, List, Type
+
+import avm2.vm
+from avm2.abc.instructions import Instruction
+from avm2.abc.types import ABCMethodIndex
+from avm2.index import NameIndex
+
+Step = Callable[[List[Any], List[Any], 'avm2.vm.MethodEnvironment'], int]
+
+
+class Instrumentation:
+    """
+    Executed instruction counters, and method call counters and timers.
+    """
+
+    def __init__(self, name_index: NameIndex):
+        self.name_index = name_index
+        self.instruction_counts: Counter[Type[Instruction]] = Counter()
+        self.call_counts: Counter[ABCMethodIndex] = Counter()
+        self.call_times: DefaultDict[ABCMethodIndex, float] = defaultdict(float)
+
+    def install(self, machine: avm2.vm.VirtualMachine):
+        """
+        Replace the machine `invoke_method` by the counting one, and count the interpreted instructions.
+        """
+        invoke_method = machine.invoke_method
+        call_counts = self.call_counts
+        call_times = self.call_times
+
+        def timed_invoke_method(index: ABCMethodIndex, this: Any, *args) -> Any:
+            call_counts[index] += 1
+            started = perf_counter()
+            try:
+                return invoke_method(index, this, *args)
+            finally:
+                call_times[index] += perf_counter() - started
+
+        machine.invoke_method = timed_invoke_method
+        machine.instruction_hook = self.count_instruction
+
+    def count_instruction(self, instruction_: Instruction):
+        self.instruction_counts[type(instruction_)] += 1
+
+    def count_steps(self, steps: List[Step], instructions: List[Instruction]) -> List[Step]:
+        """
+        Wrap the threaded code steps to count the instructions they execute.
+        """
+        return [self.count_step(step, type(instruction_)) for step, instruction_ in zip(steps, instructions)]
+
+    def count_step(self, step: Step, class_: Type[Instruction]) -> Step:
+        instruction_counts = self.instruction_counts
+
+        def counted_step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+            instruction_counts[class_] += 1
+            return step(stack, registers, environment)
+        return counted_step
+
+    def clear(self):
+        self.instruction_counts.clear()
+        self.call_counts.clear()
+        self.call_times.clear()
+
+    def get_method_name(self, index: ABCMethodIndex) -> str:
+        """
+        Get the qualified name of the method, or `#<index>` for methods without a name.
+        """
+        return self.name_index.get_method_name(index) or f'#{index}'
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the counters: executed instructions by the instruction class name, and calls and inclusive time
+        in seconds by the method name. A getter and a setter share their name, their counters are summed.
+        """
+        methods: Dict[str, Dict[str, Any]] = {}
+        for index, count in self.call_counts.items():
+            stats = methods.setdefault(self.get_method_name(index), {'calls': 0, 'time': 0.0})
+            stats['calls'] += count
+            stats['time'] += self.call_times[index]
+        return {
+            'instructions': {class_.__name__: count for class_, count in self.instruction_counts.most_common()},
+            'methods': methods,
+        }
+
+    def report(self, limit: int = 20) -> str:
+        """
+        Get the text report of the most executed instructions and the most time-consuming methods.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        instructions = snapshot['instructions']
+        total_count = sum(instructions.values())
+        lines.append(f'{total_count} instructions executed')
+        for name, count in list(instructions.items())[:limit]:
+            lines.append(f'{count:12} {count / total_count:7.2%}  {name}')
+
+        methods = sorted(snapshot['methods'].items(), key=lambda item: item[1]['time'], reverse=True)
+        lines.append(f'{sum(stats["calls"] for _, stats in methods)} method calls')
+        for name, stats in methods[:limit]:
+            lines.append(f'{stats["calls"]:12} {stats["time"]:10.6f}s  {name}')
+
+        return '\n'.join(lines)
@@ -1,11 +1,21 @@
+import sys
+from array import array
 from itertools import count
 from struct import Struct
-from typing import Union
+from typing import Iterable, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 D64 = Struct('<d')
 U16 = Struct('<H')
 U32 = Struct('<I')
 
+# Minimal number of integers to decode with NumPy, if it is installed. Below that the overhead isn't worth it.
+NUMPY_MIN_COUNT = 64
+
 
 class MemoryViewReader:
     """
@@ -112,7 +122,92 @@ class MemoryViewReader:
             return value if unsigned else self.extend_sign(value, 0x08000000)
         value = (value & 0x0FFFFFFF) | (self.read_u8() << 28)
         assert not value & 0x800000000, hex(value)
-        return value if unsigned else self.extend_sign(value, 0x400000000)  # FIXME: unsure if that's the correct mask
+        # Five-byte integers are truncated to 32 bits, like AVM2 does.
+        value &= 0xFFFFFFFF
+        return value if unsigned else self.extend_sign(value, 0x80000000)
+
+    def read_ints(self, count_: int, unsigned=True) -> array:
+        """
+        Read the number of variable-length encoded integers at once, see `read_int`.
+        Uses NumPy to find the integer boundaries when it is installed.
+        """
+        if numpy is not None and count_ >= NUMPY_MIN_COUNT:
+            return self.read_ints_numpy(count_, unsigned)
+
+        buffer = self.buffer
+        position = self.position
+        values = array('I' if unsigned else 'i')
+        append = values.append
+        for _ in range(count_):
+            byte = buffer[position]
+            position += 1
+            value = byte & 0x7F
+            shift = 7
+            while byte & 0x80 and shift != 35:
+                byte = buffer[position]
+                position += 1
+                value |= (byte & 0x7F) << shift
+                shift += 7
+            if shift == 35:
+                value &= 0xFFFFFFFF
+                shift = 32
+            if not unsigned:
+                mask = 1 << (shift - 1)
+                value = (value & (mask - 1)) - (value & mask)
+            append(value)
+        self.position = position
+        return values
+
+    def read_ints_numpy(self, count_: int, unsigned=True) -> array:
+        """
+        Read the number of variable-length encoded integers at once by scanning continuation bits with NumPy.
+        """
+        # Each integer takes at most 5 bytes.
+        bytes_ = numpy.frombuffer(self.buffer[self.position:self.position + 5 * count_], dtype=numpy.uint8)
+        is_last = bytes_ < 0x80
+        ends = numpy.flatnonzero(is_last)[:count_]
+        if len(ends) != count_:
+            raise IndexError('not enough bytes to read the integers')
+        starts = numpy.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        lengths = ends - starts + 1
+        if (lengths > 5).any():
+            # Malformed encoding, let the slow path deal with that.
+            return array('I' if unsigned else 'i', (self.read_int(unsigned) for _ in range(count_)))
+
+        values = numpy.zeros(count_, dtype=numpy.int64)
+        for i in range(5):
+            has_byte = lengths > i
+            values[has_byte] |= (bytes_[starts[has_byte] + i].astype(numpy.int64) & 0x7F) << (7 * i)
+        values &= 0xFFFFFFFF
+        if not unsigned:
+            bits = numpy.minimum(lengths * 7, 32)
+            masks = numpy.left_shift(1, bits - 1)
+            values = (values & (masks - 1)) - (values & masks)
+        self.position += int(ends[-1]) + 1 if count_ else 0
+        return array('I' if unsigned else 'i', values.astype(numpy.uint32 if unsigned else numpy.int32).tobytes())
+
+    def read_d64s(self, count_: int) -> array:
+        """
+        Read the number of 8-byte little-endian floating point values at once.
+        """
+        values = array('d', self.read(8 * count_).tobytes())
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    def skip_int(self) -> int:
+        """
+        Skip variable-length encoded integer value without decoding it.
+        """
+        buffer = self.buffer
+        position = self.position
+        end = position + 4  # at most 5 bytes
+        while position < end and buffer[position] & 0x80:
+            position += 1
+        self.position = position + 1
+        return self.position
 
     @staticmethod
     def extend_sign(value: int, mask: int) -> int:
@@ -131,3 +226,58 @@ class MemoryViewReader:
     def read_s24(self) -> int:
         value, = U32.unpack(self.read(3).tobytes() + b'\x00')
         return self.extend_sign(value, 0x00800000)
+
+
+class ChunkedReader(MemoryViewReader):
+    """
+    Reads a stream of byte chunks as a structured stream.
+    Only keeps the unread part of the stream in memory and pulls the next chunks when it runs out of bytes.
+    """
+
+    def __init__(self, chunks: Iterable[Union[memoryview, bytes]]):
+        super().__init__(b'')
+        self.chunks = iter(chunks)
+
+    def __repr__(self) -> str:
+        return f'ChunkedReader(buffer={self.buffer!r}, position={self.position!r})'
+
+    def ensure(self, size: int) -> bool:
+        """
+        Pull chunks until at least the number of bytes is available. Return `False` if the stream is exhausted before.
+        """
+        available = len(self.buffer) - self.position
+        if available >= size:
+            return True
+        buffer = bytearray(self.buffer[self.position:])
+        for chunk in self.chunks:
+            buffer += chunk
+            available += len(chunk)
+            if available >= size:
+                break
+        # The previous buffer remains referenced only by the views that have been already read from it.
+        self.buffer = memoryview(buffer)
+        self.position = 0
+        return available >= size
+
+    def is_eof(self) -> bool:
+        return not self.ensure(1)
+
+    def read(self, size: int) -> memoryview:
+        self.ensure(size)
+        return super().read(size)
+
+    def skip(self, size: int) -> int:
+        self.ensure(size)
+        return super().skip(size)
+
+    def read_u8(self) -> int:
+        self.ensure(1)
+        return super().read_u8()
+
+    def read_u16(self) -> int:
+        self.ensure(2)
+        return super().read_u16()
+
+    def read_u32(self) -> int:
+        self.ensure(4)
+        return super().read_u32()
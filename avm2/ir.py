@@ -0,0 +1,801 @@
+"""
+Register-based intermediate representation: stack byte-code is translated into operations over virtual registers.
+
+The operand stack depth of every instruction is known from the verifier, so the stack slot at depth `d` becomes
+the virtual register `s<d>`, and every operation names the registers it reads and writes. Pushing a register or
+a constant emits nothing, the consumer reads the value in place. Jump targets are operation indices.
+
+A frame is a single list of the method registers `r<n>`, the stack slots and the constants,
+and every operand is an index into the frame. Operations are bound into closures which return the index
+of the next operation, or `RETURN_INDEX` to return from the method. Methods with instructions that can't be
+translated are left to the threaded code.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+import avm2.verifier
+import avm2.vm
+from avm2.abc.instructions import (
+    Add,
+    AddInteger,
+    ConvertToDouble,
+    ConvertToInteger,
+    Debug,
+    DebugFile,
+    DebugLine,
+    Divide,
+    Dup,
+    GetLocal,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GetLocalPair,
+    GetScopeObject,
+    GreaterEquals,
+    IfFalse,
+    IfLT,
+    IfNGE,
+    IfNGT,
+    IfNLT,
+    IfTrue,
+    Instruction,
+    Jump,
+    Label,
+    LookupSwitch,
+    MethodCode,
+    Nop,
+    Pop,
+    PopScope,
+    PushByte,
+    PushConstant,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushScope,
+    PushThisScope,
+    PushTrue,
+    ReturnValue,
+    ReturnVoid,
+    SetLocal,
+    SetLocal0,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    SubtractInteger,
+    local_indices,
+)
+from avm2.abc.types import ASMethodBody
+from avm2.runtime import undefined
+
+Frame = List[Any]
+Step = Callable[[Frame, 'avm2.vm.MethodEnvironment'], int]
+Names = Callable[[int], str]
+Translate = Callable[[Instruction, 'Translator'], None]
+
+RETURN_INDEX = -1
+
+
+@dataclass
+class RegisterCode:
+    """
+    Method code translated into register operations.
+    """
+
+    operations: List[Operation]
+    local_count: int
+    slot_count: int
+    constants: List[Any]
+
+    def __post_init__(self):
+        # Appended to the method registers to make a frame.
+        self.frame_tail = [undefined] * self.slot_count + self.constants
+        self.steps = [operation.bind(index + 1) for index, operation in enumerate(self.operations)]
+
+    def __str__(self) -> str:
+        return '\n'.join(f'{index}: {operation.format(self.name)}' for index, operation in enumerate(self.operations))
+
+    def name(self, operand: int) -> str:
+        """
+        Get the printable name of the frame index: a register, a stack slot or a constant.
+        """
+        if operand < self.local_count:
+            return f'r{operand}'
+        if operand < self.local_count + self.slot_count:
+            return f's{operand - self.local_count}'
+        return repr(self.constants[operand - self.local_count - self.slot_count])
+
+
+def translate_code(
+    machine: avm2.vm.VirtualMachine,
+    method_body: ASMethodBody,
+    code: MethodCode,
+    analysis: avm2.verifier.MethodAnalysis,
+) -> Optional[RegisterCode]:
+    """
+    Translate the verified method code, or get `None` if it contains an instruction that can't be
+    translated. Methods with exception handlers aren't translated either.
+    """
+    if method_body.exceptions:
+        return None
+    try:
+        return Translator(machine, code, analysis, method_body.local_count).translate()
+    except NotImplementedError:
+        return None
+
+
+# Operations.
+# ----------------------------------------------------------------------------------------------------------------------
+
+class Operation:
+    def bind(self, next_index: int) -> Step:
+        """
+        Get the closure executing the operation.
+        """
+        raise NotImplementedError(self)
+
+    def format(self, name: Names) -> str:
+        """
+        Get the printable operation, `name` gets the name of a frame index.
+        """
+        raise NotImplementedError(self)
+
+    def resolve(self, starts: Dict[int, int]):
+        """
+        Replace the instruction indices of the jump targets by the operation indices.
+        """
+
+
+@dataclass
+class Move(Operation):
+    destination: int
+    source: int
+
+    def bind(self, next_index: int) -> Step:
+        destination, source = self.destination, self.source
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = frame[source]
+            return next_index
+        return step
+
+    def format(self, name: Names) -> str:
+        return f'{name(self.destination)} = {name(self.source)}'
+
+
+@dataclass
+class BinaryOperation(Operation):
+    destination: int
+    operand_1: int
+    operand_2: int
+
+    template = ''
+
+    def format(self, name: Names) -> str:
+        operands = (name(self.operand_1), name(self.operand_2))
+        return f'{name(self.destination)} = {self.template.format(*operands)}'
+
+
+@dataclass
+class AddOperation(BinaryOperation):
+    template = '{} + {}'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand_1, operand_2 = self.destination, self.operand_1, self.operand_2
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = frame[operand_1] + frame[operand_2]
+            return next_index
+        return step
+
+
+@dataclass
+class AddIntegerOperation(BinaryOperation):
+    template = 'int({}) + int({})'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand_1, operand_2 = self.destination, self.operand_1, self.operand_2
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = int(frame[operand_1]) + int(frame[operand_2])
+            return next_index
+        return step
+
+
+@dataclass
+class DivideOperation(BinaryOperation):
+    template = '{} / {}'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand_1, operand_2 = self.destination, self.operand_1, self.operand_2
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = frame[operand_1] / frame[operand_2]
+            return next_index
+        return step
+
+
+@dataclass
+class GreaterEqualsOperation(BinaryOperation):
+    template = '{} >= {}'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand_1, operand_2 = self.destination, self.operand_1, self.operand_2
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = frame[operand_1] >= frame[operand_2]
+            return next_index
+        return step
+
+
+@dataclass
+class SubtractIntegerOperation(BinaryOperation):
+    template = 'int({}) - int({})'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand_1, operand_2 = self.destination, self.operand_1, self.operand_2
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = int(frame[operand_1]) - int(frame[operand_2])
+            return next_index
+        return step
+
+
+@dataclass
+class UnaryOperation(Operation):
+    destination: int
+    operand: int
+
+    template = ''
+
+    def format(self, name: Names) -> str:
+        return f'{name(self.destination)} = {self.template.format(name(self.operand))}'
+
+
+@dataclass
+class ConvertToDoubleOperation(UnaryOperation):
+    template = 'float({})'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand = self.destination, self.operand
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = float(frame[operand])
+            return next_index
+        return step
+
+
+@dataclass
+class ConvertToIntegerOperation(UnaryOperation):
+    template = 'int({})'
+
+    def bind(self, next_index: int) -> Step:
+        destination, operand = self.destination, self.operand
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = int(frame[operand])
+            return next_index
+        return step
+
+
+@dataclass
+class GetScopeObjectOperation(Operation):
+    destination: int
+    index: int  # of the scope object
+
+    def bind(self, next_index: int) -> Step:
+        destination, index = self.destination, self.index
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            frame[destination] = environment.scope_stack[index]
+            return next_index
+        return step
+
+    def format(self, name: Names) -> str:
+        return f'{name(self.destination)} = scope_stack[{self.index}]'
+
+
+@dataclass
+class PushScopeOperation(Operation):
+    operand: int
+
+    def bind(self, next_index: int) -> Step:
+        operand = self.operand
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            value = frame[operand]
+            assert value is not None and value is not undefined
+            environment.scope_stack.append(value)
+            return next_index
+        return step
+
+    def format(self, name: Names) -> str:
+        return f'push_scope {name(self.operand)}'
+
+
+@dataclass
+class PopScopeOperation(Operation):
+    def bind(self, next_index: int) -> Step:
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            environment.scope_stack.pop()
+            return next_index
+        return step
+
+    def format(self, name: Names) -> str:
+        return 'pop_scope'
+
+
+@dataclass
+class JumpOperation(Operation):
+    target: int
+
+    def bind(self, next_index: int) -> Step:
+        target = self.target
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return target
+        return step
+
+    def format(self, name: Names) -> str:
+        return f'goto {self.target}'
+
+    def resolve(self, starts: Dict[int, int]):
+        self.target = starts[self.target]
+
+
+@dataclass
+class UnaryBranch(Operation):
+    operand: int
+    target: int
+
+    template = ''
+
+    def format(self, name: Names) -> str:
+        return f'if {self.template.format(name(self.operand))} goto {self.target}'
+
+    def resolve(self, starts: Dict[int, int]):
+        self.target = starts[self.target]
+
+
+@dataclass
+class IfFalseOperation(UnaryBranch):
+    template = 'not {}'
+
+    def bind(self, next_index: int) -> Step:
+        operand, target = self.operand, self.target
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return next_index if frame[operand] else target
+        return step
+
+
+@dataclass
+class IfTrueOperation(UnaryBranch):
+    template = '{}'
+
+    def bind(self, next_index: int) -> Step:
+        operand, target = self.operand, self.target
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return target if frame[operand] else next_index
+        return step
+
+
+@dataclass
+class BinaryBranch(Operation):
+    operand_1: int
+    operand_2: int
+    target: int
+
+    template = ''
+
+    def format(self, name: Names) -> str:
+        return f'if {self.template.format(name(self.operand_1), name(self.operand_2))} goto {self.target}'
+
+    def resolve(self, starts: Dict[int, int]):
+        self.target = starts[self.target]
+
+
+@dataclass
+class IfLTOperation(BinaryBranch):
+    template = '{} < {}'
+
+    def bind(self, next_index: int) -> Step:
+        operand_1, operand_2, target = self.operand_1, self.operand_2, self.target
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return target if frame[operand_1] < frame[operand_2] else next_index
+        return step
+
+
+@dataclass
+class IfNGEOperation(BinaryBranch):
+    template = 'not {} >= {}'
+
+    def bind(self, next_index: int) -> Step:
+        operand_1, operand_2, target = self.operand_1, self.operand_2, self.target
+
+        # FIXME: NaN.
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return next_index if frame[operand_1] >= frame[operand_2] else target
+        return step
+
+
+@dataclass
+class IfNGTOperation(BinaryBranch):
+    template = 'not {} > {}'
+
+    def bind(self, next_index: int) -> Step:
+        operand_1, operand_2, target = self.operand_1, self.operand_2, self.target
+
+        # FIXME: NaN.
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return next_index if frame[operand_1] > frame[operand_2] else target
+        return step
+
+
+@dataclass
+class IfNLTOperation(BinaryBranch):
+    template = 'not {} < {}'
+
+    def bind(self, next_index: int) -> Step:
+        operand_1, operand_2, target = self.operand_1, self.operand_2, self.target
+
+        # FIXME: NaN.
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return next_index if frame[operand_1] < frame[operand_2] else target
+        return step
+
+
+@dataclass
+class LookupSwitchOperation(Operation):
+    operand: int
+    default_target: int
+    case_targets: Tuple[int, ...]
+
+    def bind(self, next_index: int) -> Step:
+        operand, default_target = self.operand, self.default_target
+        case_targets = dict(enumerate(self.case_targets))
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            return case_targets.get(frame[operand], default_target)
+        return step
+
+    def format(self, name: Names) -> str:
+        return f'switch {name(self.operand)} goto {list(self.case_targets)} else {self.default_target}'
+
+    def resolve(self, starts: Dict[int, int]):
+        self.default_target = starts[self.default_target]
+        self.case_targets = tuple(starts[target] for target in self.case_targets)
+
+
+@dataclass
+class ReturnOperation(Operation):
+    operand: int
+
+    def bind(self, next_index: int) -> Step:
+        operand = self.operand
+
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            # FIXME: coerce to the expected return type.
+            environment.return_value = frame[operand]
+            return RETURN_INDEX
+        return step
+
+    def format(self, name: Names) -> str:
+        return f'return {name(self.operand)}'
+
+
+@dataclass
+class ReturnVoidOperation(Operation):
+    def bind(self, next_index: int) -> Step:
+        def step(frame: Frame, environment: avm2.vm.MethodEnvironment) -> int:
+            environment.return_value = undefined
+            return RETURN_INDEX
+        return step
+
+    def format(self, name: Names) -> str:
+        return 'return'
+
+
+# Translation.
+# ----------------------------------------------------------------------------------------------------------------------
+
+class Translator:
+    """
+    Translates verified method code into register operations.
+
+    The translator tracks which frame index holds each operand stack value. Values pushed from a register or
+    a constant stay where they are until the end of the basic block or until the register gets overwritten,
+    and only then are moved into their stack slots. Every basic block starts with the values in their slots.
+    """
+
+    def __init__(
+        self,
+        machine: avm2.vm.VirtualMachine,
+        code: MethodCode,
+        analysis: avm2.verifier.MethodAnalysis,
+        local_count: int,
+    ):
+        self.machine = machine
+        self.code = code
+        self.analysis = analysis
+        self.local_count = local_count
+        self.slot_count = analysis.max_stack
+        self.constants: List[Any] = []
+        self.operations: List[Operation] = []
+
+        # Basic block being translated.
+        self.index = 0  # of the current instruction
+        self.block_start = 0  # index of the first operation
+        self.stack: List[int] = []  # frame indices of the operand stack values
+
+    def translate(self) -> RegisterCode:
+        instructions = self.code.instructions
+        stack_depths = self.analysis.stack_depths
+        leaders = set(self.analysis.blocks)
+        starts: Dict[int, int] = {}  # instruction index to operation index
+        falls_through = False
+
+        for index, instruction_ in enumerate(instructions):
+            stack_depth = stack_depths[index]
+            if stack_depth is None:
+                continue  # unreachable
+            if index in leaders:
+                if falls_through:
+                    self.flush()
+                self.stack = [self.slot(depth) for depth in range(stack_depth)]
+                self.block_start = len(self.operations)
+            starts[index] = len(self.operations)
+            self.index = index
+            try:
+                translate = translators[type(instruction_)]
+            except KeyError:
+                raise NotImplementedError(instruction_)
+            translate(instruction_, self)
+            falls_through = not isinstance(instruction_, avm2.verifier.TERMINATORS)
+
+        for operation in self.operations:
+            operation.resolve(starts)
+        return RegisterCode(self.operations, self.local_count, self.slot_count, self.constants)
+
+    # Translation helpers.
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def slot(self, depth: int) -> int:
+        """
+        Get the frame index of the operand stack slot.
+        """
+        return self.local_count + depth
+
+    def constant(self, value: Any) -> int:
+        """
+        Get the frame index of the constant.
+        """
+        self.constants.append(value)
+        return self.local_count + self.slot_count + len(self.constants) - 1
+
+    def emit(self, operation: Operation):
+        self.operations.append(operation)
+
+    def push(self, operand: int):
+        self.stack.append(operand)
+
+    def pop(self) -> int:
+        return self.stack.pop()
+
+    def push_result(self) -> int:
+        """
+        Get the frame index for the value about to be pushed by an operation, and push it.
+        """
+        destination = self.slot(len(self.stack))
+        self.stack.append(destination)
+        return destination
+
+    def flush(self):
+        """
+        Move the pending values into their stack slots. The moved values are registers, constants or slots
+        below their own, so the order of moves doesn't matter.
+        """
+        for depth, operand in enumerate(self.stack):
+            slot = self.slot(depth)
+            if operand != slot:
+                self.emit(Move(slot, operand))
+                self.stack[depth] = slot
+
+    def store(self, register_index: int):
+        """
+        Pop the value into the register.
+        """
+        operand = self.pop()
+        if operand == register_index:
+            return
+        for depth, pending in enumerate(self.stack):
+            if pending == register_index:
+                # The pending value must be read before it gets overwritten.
+                self.stack[depth] = self.slot(depth)
+                self.emit(Move(self.slot(depth), register_index))
+        last_operation = self.operations[-1] if len(self.operations) > self.block_start else None
+        if (
+            operand == self.slot(len(self.stack))
+            and isinstance(last_operation, (Move, BinaryOperation, UnaryOperation, GetScopeObjectOperation))
+            and last_operation.destination == operand
+        ):
+            # The value was just computed into the slot and is not used otherwise, compute it into the register.
+            last_operation.destination = register_index
+        else:
+            self.emit(Move(register_index, operand))
+
+    def target(self, offset: int) -> int:
+        """
+        Get the instruction index of the jump target, resolved to the operation index later.
+        """
+        return self.code.jump(self.index, offset)
+
+
+T = TypeVar('T', bound=Translate)
+translators: Dict[Type[Instruction], Translate] = {}
+
+
+def translator(*classes: Type[Instruction]) -> Callable[[T], T]:
+    def wrapper(translate: T) -> T:
+        for class_ in classes:
+            assert class_ not in translators, translators[class_]
+            translators[class_] = translate
+        return translate
+    return wrapper
+
+
+# Translators implementation.
+# ----------------------------------------------------------------------------------------------------------------------
+
+binary_operations: Dict[Type[Instruction], Type[BinaryOperation]] = {
+    Add: AddOperation,
+    AddInteger: AddIntegerOperation,
+    Divide: DivideOperation,
+    GreaterEquals: GreaterEqualsOperation,
+    SubtractInteger: SubtractIntegerOperation,
+}
+unary_operations: Dict[Type[Instruction], Type[UnaryOperation]] = {
+    ConvertToDouble: ConvertToDoubleOperation,
+    ConvertToInteger: ConvertToIntegerOperation,
+}
+unary_branches: Dict[Type[Instruction], Type[UnaryBranch]] = {
+    IfFalse: IfFalseOperation,
+    IfTrue: IfTrueOperation,
+}
+binary_branches: Dict[Type[Instruction], Type[BinaryBranch]] = {
+    IfLT: IfLTOperation,
+    IfNGE: IfNGEOperation,
+    IfNGT: IfNGTOperation,
+    IfNLT: IfNLTOperation,
+}
+
+
+@translator(*binary_operations)
+def translate_binary_operation(instruction_: Instruction, translator_: Translator):
+    operand_2 = translator_.pop()
+    operand_1 = translator_.pop()
+    destination = translator_.push_result()
+    translator_.emit(binary_operations[type(instruction_)](destination, operand_1, operand_2))
+
+
+@translator(*unary_operations)
+def translate_unary_operation(instruction_: Instruction, translator_: Translator):
+    operand = translator_.pop()
+    destination = translator_.push_result()
+    translator_.emit(unary_operations[type(instruction_)](destination, operand))
+
+
+@translator(*unary_branches)
+def translate_unary_branch(instruction_: Instruction, translator_: Translator):
+    operand = translator_.pop()
+    translator_.flush()
+    translator_.emit(unary_branches[type(instruction_)](operand, translator_.target(instruction_.offset)))
+
+
+@translator(*binary_branches)
+def translate_binary_branch(instruction_: Instruction, translator_: Translator):
+    operand_2 = translator_.pop()
+    operand_1 = translator_.pop()
+    translator_.flush()
+    target = translator_.target(instruction_.offset)
+    translator_.emit(binary_branches[type(instruction_)](operand_1, operand_2, target))
+
+
+@translator(Debug, DebugFile, DebugLine, Label, Nop)
+def translate_no_op(instruction_: Instruction, translator_: Translator):
+    pass
+
+
+@translator(Dup)
+def translate_dup(instruction_: Dup, translator_: Translator):
+    translator_.push(translator_.stack[-1])
+
+
+@translator(GetLocal)
+def translate_get_local(instruction_: GetLocal, translator_: Translator):
+    translator_.push(instruction_.index)
+
+
+@translator(GetLocal0, GetLocal1, GetLocal2, GetLocal3)
+def translate_get_local_n(instruction_: Instruction, translator_: Translator):
+    translator_.push(local_indices[type(instruction_)])
+
+
+@translator(GetLocalPair)
+def translate_get_local_pair(instruction_: GetLocalPair, translator_: Translator):
+    translator_.push(instruction_.index_1)
+    translator_.push(instruction_.index_2)
+
+
+@translator(GetScopeObject)
+def translate_get_scope_object(instruction_: GetScopeObject, translator_: Translator):
+    translator_.emit(GetScopeObjectOperation(translator_.push_result(), instruction_.index))
+
+
+@translator(Jump)
+def translate_jump(instruction_: Jump, translator_: Translator):
+    translator_.flush()
+    translator_.emit(JumpOperation(translator_.target(instruction_.offset)))
+
+
+@translator(LookupSwitch)
+def translate_lookup_switch(instruction_: LookupSwitch, translator_: Translator):
+    operand = translator_.pop()
+    translator_.flush()
+    translator_.emit(LookupSwitchOperation(
+        operand,
+        translator_.target(instruction_.default_offset),
+        tuple(translator_.target(offset) for offset in instruction_.case_offsets),
+    ))
+
+
+@translator(Pop)
+def translate_pop(instruction_: Pop, translator_: Translator):
+    translator_.pop()
+
+
+@translator(PopScope)
+def translate_pop_scope(instruction_: PopScope, translator_: Translator):
+    translator_.emit(PopScopeOperation())
+
+
+@translator(PushByte, PushConstant, PushDouble, PushFalse, PushInteger, PushTrue)
+def translate_push_constant(instruction_: Instruction, translator_: Translator):
+    environment = avm2.vm.MethodEnvironment([], [])
+    instruction_.execute(translator_.machine, environment)
+    translator_.push(translator_.constant(environment.operand_stack.pop()))
+
+
+@translator(PushScope)
+def translate_push_scope(instruction_: PushScope, translator_: Translator):
+    translator_.emit(PushScopeOperation(translator_.pop()))
+
+
+@translator(PushThisScope)
+def translate_push_this_scope(instruction_: PushThisScope, translator_: Translator):
+    translator_.emit(PushScopeOperation(0))
+
+
+@translator(ReturnValue)
+def translate_return_value(instruction_: ReturnValue, translator_: Translator):
+    translator_.emit(ReturnOperation(translator_.pop()))
+
+
+@translator(ReturnVoid)
+def translate_return_void(instruction_: ReturnVoid, translator_: Translator):
+    translator_.emit(ReturnVoidOperation())
+
+
+@translator(SetLocal)
+def translate_set_local(instruction_: SetLocal, translator_: Translator):
+    translator_.store(instruction_.index)
+
+
+@translator(SetLocal0, SetLocal1, SetLocal2, SetLocal3)
+def translate_set_local_n(instruction_: Instruction, translator_: Translator):
+    translator_.store(local_indices[type(instruction_)])
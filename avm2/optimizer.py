@@ -0,0 +1,332 @@
+"""
+Peephole optimizer of decoded method code.
+
+No-op instructions are removed, constant expressions are folded, and frequent instruction sequences are fused into
+superinstructions. Sequences are never fused across a jump target, and byte offsets of the removed and fused
+instructions are mapped to their replacements, so that the original jump offsets stay valid.
+Fusions are picked with `python -m benchmarks.opcode_pairs`.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+import avm2.vm
+from avm2.abc.instructions import (
+    Add,
+    AddInteger,
+    BitAnd,
+    BitNot,
+    BitOr,
+    BitXor,
+    ConvertToBoolean,
+    ConvertToDouble,
+    ConvertToInteger,
+    ConvertToUnsignedInteger,
+    Debug,
+    DebugFile,
+    DebugLine,
+    Decrement,
+    DecrementInteger,
+    Divide,
+    EqualsOperation,
+    GetLocal,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GetLocalPair,
+    GreaterEquals,
+    GreaterThan,
+    IfEq,
+    IfFalse,
+    IfGE,
+    IfGT,
+    IfLE,
+    IfLT,
+    IfNE,
+    IfNGE,
+    IfNGT,
+    IfNLE,
+    IfNLT,
+    IfStrictEq,
+    IfStrictNE,
+    IfTrue,
+    Increment,
+    IncrementInteger,
+    Instruction,
+    Jump,
+    Label,
+    LeftShift,
+    LessEquals,
+    LessThan,
+    LookupSwitch,
+    MethodCode,
+    Modulo,
+    Multiply,
+    MultiplyInteger,
+    Negate,
+    NegateInteger,
+    Nop,
+    Not,
+    PushByte,
+    PushConstant,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushNaN,
+    PushNull,
+    PushScope,
+    PushShort,
+    PushString,
+    PushThisScope,
+    PushTrue,
+    PushUndefined,
+    PushUnsignedInteger,
+    RightShift,
+    StrictEquals,
+    Subtract,
+    SubtractInteger,
+    UnsignedRightShift,
+    local_indices,
+)
+from avm2.abc.types import ASMethodBody
+
+# Instructions which do nothing.
+NO_OPS = (Label, Nop)
+DEBUG = (Debug, DebugFile, DebugLine)
+
+# Instructions which push a constant.
+CONSTANTS = (
+    PushByte,
+    PushConstant,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushNaN,
+    PushNull,
+    PushShort,
+    PushString,
+    PushTrue,
+    PushUndefined,
+    PushUnsignedInteger,
+)
+# Operators whose result only depends on their operands.
+UNARY_OPERATORS = (
+    BitNot,
+    ConvertToBoolean,
+    ConvertToDouble,
+    ConvertToInteger,
+    ConvertToUnsignedInteger,
+    Decrement,
+    DecrementInteger,
+    Increment,
+    IncrementInteger,
+    Negate,
+    NegateInteger,
+    Not,
+)
+BINARY_OPERATORS = (
+    Add,
+    AddInteger,
+    BitAnd,
+    BitOr,
+    BitXor,
+    Divide,
+    EqualsOperation,
+    GreaterEquals,
+    GreaterThan,
+    LeftShift,
+    LessEquals,
+    LessThan,
+    Modulo,
+    Multiply,
+    MultiplyInteger,
+    RightShift,
+    StrictEquals,
+    Subtract,
+    SubtractInteger,
+    UnsignedRightShift,
+)
+# Instructions which jump by their `offset`.
+BRANCHES = (
+    IfEq, IfFalse, IfGE, IfGT, IfLE, IfLT, IfNE, IfNGE, IfNGT, IfNLE, IfNLT, IfStrictEq, IfStrictNE, IfTrue, Jump,
+)
+# Comparisons followed by `iffalse` or `iftrue`, and the equivalent branch.
+fused_branches: Dict[Tuple[Type[Instruction], Type[Instruction]], Type[Instruction]] = {
+    (EqualsOperation, IfFalse): IfNE,
+    (EqualsOperation, IfTrue): IfEq,
+    (GreaterEquals, IfFalse): IfNGE,
+    (GreaterEquals, IfTrue): IfGE,
+    (GreaterThan, IfFalse): IfNGT,
+    (GreaterThan, IfTrue): IfGT,
+    (LessEquals, IfFalse): IfNLE,
+    (LessEquals, IfTrue): IfLE,
+    (LessThan, IfFalse): IfNLT,
+    (LessThan, IfTrue): IfLT,
+    (Not, IfFalse): IfTrue,
+    (Not, IfTrue): IfFalse,
+    (StrictEquals, IfFalse): IfStrictNE,
+    (StrictEquals, IfTrue): IfStrictEq,
+}
+
+
+# Optimization pass.
+# ----------------------------------------------------------------------------------------------------------------------
+
+def optimize_code(
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    method_body: Optional[ASMethodBody] = None,
+    keep_debug: bool = False,
+) -> MethodCode:
+    """
+    Get the optimized copy of the method code. Exception handler boundaries of the `method_body` are kept intact.
+    Debug instructions are only kept with `keep_debug`.
+    """
+    instructions = code.instructions
+    jump_targets = find_jump_targets(code, method_body)
+    no_ops = NO_OPS if keep_debug else (*NO_OPS, *DEBUG)
+
+    optimized = copy.copy(code)
+    optimized.instructions = []
+    optimized.offsets = []
+    optimized.jump_bases = []
+    optimized.offset_to_index = {}
+    optimized.back_edge_count = 0
+
+    index = 0
+    while index < len(instructions):
+        instruction_ = instructions[index]
+        if isinstance(instruction_, no_ops):
+            # Jumps to the removed instruction land on the next one.
+            optimized.offset_to_index[code.offsets[index]] = len(optimized.instructions)
+            index += 1
+            continue
+        replacement, end_index = fuse(machine, instructions, index, jump_targets)
+        new_index = len(optimized.instructions)
+        optimized.instructions.append(replacement)
+        optimized.offsets.append(code.offsets[index])
+        optimized.jump_bases.append(code.jump_bases[end_index - 1])
+        for fused_index in range(index, end_index):
+            optimized.offset_to_index[code.offsets[fused_index]] = new_index
+        index = end_index
+
+    # The code end.
+    optimized.offset_to_index[max(code.offset_to_index)] = len(optimized.instructions)
+    return optimized
+
+
+def fuse(
+    machine: avm2.vm.VirtualMachine,
+    instructions: List[Instruction],
+    index: int,
+    jump_targets: Set[int],
+) -> Tuple[Instruction, int]:
+    """
+    Get the replacement of the instructions starting at `index`, and the index of the first instruction after them.
+    """
+    instruction_ = instructions[index]
+    if isinstance(instruction_, CONSTANTS):
+        folded = fold_constants(machine, instructions, index, jump_targets)
+        if folded is not None:
+            value, end_index = folded
+            return PushConstant(value), end_index
+
+    if index + 1 >= len(instructions) or index + 1 in jump_targets:
+        return instruction_, index + 1
+    next_instruction = instructions[index + 1]
+    type_, next_type = type(instruction_), type(next_instruction)
+
+    if type_ is GetLocal0 and next_type is PushScope:
+        return PushThisScope(), index + 2
+    register_index, next_register_index = get_local_index(instruction_), get_local_index(next_instruction)
+    if register_index is not None and next_register_index is not None:
+        return GetLocalPair(register_index, next_register_index), index + 2
+    branch_class = fused_branches.get((type_, next_type))
+    if branch_class is not None and branch_class.execute is not Instruction.execute:
+        return make_instruction(branch_class, offset=next_instruction.offset), index + 2
+
+    return instruction_, index + 1
+
+
+def fold_constants(
+    machine: avm2.vm.VirtualMachine,
+    instructions: List[Instruction],
+    index: int,
+    jump_targets: Set[int],
+) -> Optional[Tuple[Any, int]]:
+    """
+    Evaluate the longest run of constants and operators starting at `index` which leaves a single value,
+    and get the value and the index of the first instruction after the run. Get `None` if there's no such run.
+    """
+    environment = avm2.vm.MethodEnvironment([], [])
+    stack = environment.operand_stack
+    folded = None
+    for end_index in range(index, len(instructions)):
+        instruction_ = instructions[end_index]
+        if end_index != index and end_index in jump_targets:
+            break
+        if isinstance(instruction_, UNARY_OPERATORS):
+            if not stack:
+                break
+        elif isinstance(instruction_, BINARY_OPERATORS):
+            if len(stack) < 2:
+                break
+        elif not isinstance(instruction_, CONSTANTS):
+            break
+        try:
+            instruction_.execute(machine, environment)
+        except (NotImplementedError, ArithmeticError, TypeError):
+            break  # left to fail at run time
+        if len(stack) == 1 and end_index != index:
+            folded = stack[0], end_index + 1
+    return folded
+
+
+def find_jump_targets(code: MethodCode, method_body: Optional[ASMethodBody] = None) -> Set[int]:
+    """
+    Get indices of the jump targets and the exception handler boundaries.
+    Invalid jump offsets are ignored, compilers emit them in unreachable code.
+    """
+    targets = set()
+    for index, instruction_ in enumerate(code.instructions):
+        if isinstance(instruction_, LookupSwitch):
+            offsets = (instruction_.default_offset, *instruction_.case_offsets)
+        elif isinstance(instruction_, BRANCHES):
+            offsets = (instruction_.offset,)
+        else:
+            continue
+        for offset in offsets:
+            target = code.offset_to_index.get(code.jump_bases[index] + offset)
+            if target is not None:
+                targets.add(target)
+    if method_body is not None:
+        for exception in method_body.exceptions:
+            for offset in (exception.from_, exception.to, exception.target):
+                target = code.offset_to_index.get(offset)
+                if target is not None:
+                    targets.add(target)
+    return targets
+
+
+def get_local_index(instruction_: Instruction) -> Optional[int]:
+    """
+    Get the register index if the instruction pushes a register.
+    """
+    if isinstance(instruction_, GetLocal):
+        return instruction_.index
+    if isinstance(instruction_, (GetLocal0, GetLocal1, GetLocal2, GetLocal3)):
+        return local_indices[type(instruction_)]
+    return None
+
+
+def make_instruction(class_: Type[Instruction], **values: Any) -> Instruction:
+    """
+    Create an instruction with the operand values instead of reading them.
+    """
+    instruction_ = class_.__new__(class_)
+    for name, value in values.items():
+        setattr(instruction_, name, value)
+    return instruction_
@@ -0,0 +1,118 @@
+"""
+Parallel parsing of many SWF files in worker processes.
+
+Parsed ABC files are sent back to the parent process in a compact form: the ABC file bytes, the offsets recorded
+by lazy arrays and columnar tables, the constant pool and the link tables. Items of lazy arrays are not sent,
+reading them again from the bytes is cheaper than moving their object graphs between processes.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from io import BytesIO
+from os import PathLike
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+import avm2.cache
+from avm2.abc.parser import LazyArray
+from avm2.abc.types import ABCFile, StringPool
+from avm2.io import MemoryViewReader
+from avm2.swf.enums import TagType
+from avm2.swf.parser import open_swf
+from avm2.swf.types import DoABCTag
+from avm2.vm import LinkTables, VirtualMachine
+
+
+@dataclass
+class ParsedABC:
+    """
+    DO_ABC tag parsed in a worker process.
+    """
+
+    path: str
+    name: str
+    data: bytes
+
+    def get_machine(self) -> VirtualMachine:
+        """
+        Create the virtual machine. The ABC file is lazy, its items are read when accessed.
+        """
+        abc_file, link_tables = loads(self.data)
+        return VirtualMachine(abc_file, link_tables)
+
+
+def parse_many(paths: Iterable[Union[str, PathLike]], workers: Optional[int] = None) -> Iterator[ParsedABC]:
+    """
+    Parse SWF files in a pool of worker processes and get an iterator of their DO_ABC tags.
+    Tags are yielded in the order the files complete, tags of the same file are yielded in their order.
+    `workers` defaults to the number of processors.
+    """
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(parse_abc_tags, os.fspath(path)) for path in paths]
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            # Do not parse the rest of the files when the iterator is closed early.
+            for future in futures:
+                future.cancel()
+
+
+def parse_abc_tags(path: str) -> List[ParsedABC]:
+    """
+    Parse DO_ABC tags of the SWF file and link the virtual machines. Runs in a worker process.
+    """
+    parsed_tags = []
+    for tag in open_swf(path):
+        if tag.type_ != TagType.DO_ABC:
+            continue
+        do_abc_tag = DoABCTag(tag.raw)
+        # Copy the ABC file out of the SWF buffer, so that only the ABC file gets sent.
+        abc_file = ABCFile(MemoryViewReader(do_abc_tag.abc_file.tobytes()), lazy=True, columnar=True)
+        machine = VirtualMachine(abc_file)
+        parsed_tags.append(ParsedABC(path, do_abc_tag.name, dumps(abc_file, machine.link_tables)))
+    return parsed_tags
+
+
+def dumps(abc_file: ABCFile, link_tables: LinkTables) -> bytes:
+    """
+    Serialize the lazily parsed ABC file and the link tables in the compact form.
+    The ABC file bytes are stored once, lazy arrays and string pools are stored without their items.
+    """
+    buffer = BytesIO()
+    avm2.cache.create_pickler(buffer, reduce_memory_view, reduce_lazy_array).dump((abc_file, link_tables))
+    return buffer.getvalue()
+
+
+def loads(data: Union[memoryview, bytes]) -> Tuple[ABCFile, LinkTables]:
+    """
+    Deserialize the lazily parsed ABC file and the link tables.
+    """
+    return avm2.cache.loads(data)
+
+
+def reduce_memory_view(value: memoryview) -> Tuple[Any, ...]:
+    if isinstance(value.obj, bytes) and value.nbytes == len(value.obj):
+        # Let pickle memoize the underlying bytes, they're shared by all the lazy arrays.
+        return memoryview, (value.obj,)
+    return avm2.cache.reduce_memory_view(value)
+
+
+def reduce_lazy_array(value: Union[LazyArray, StringPool]) -> Tuple[Any, ...]:
+    state = dict(value.__dict__)
+    if isinstance(value, StringPool):
+        state['strings'] = [None] * len(value)
+    else:
+        state['items'] = [None] * len(value)
+    return restore_lazy_array, (type(value), state)
+
+
+def restore_lazy_array(
+    class_: Type[Union[LazyArray, StringPool]],
+    state: Dict[str, Any],
+) -> Union[LazyArray, StringPool]:
+    value = class_.__new__(class_)
+    value.__dict__.update(state)
+    return value
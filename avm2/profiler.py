@@ -0,0 +1,126 @@
+"""
+Sampling profiler of ActionScript methods.
+
+The profiler keeps the stack of the qualified names of the methods being called by the virtual machine,
+and samples it either on a timer or every N executed instructions. Samples are written as collapsed stacks,
+one `outer;inner count` line per distinct stack, the input format of `flamegraph.pl` and speedscope.
+
+The timer runs in a background thread, so it only samples when the thread gets the GIL, see
+`sys.setswitchinterval`. Instructions are only counted by the interpreter, methods in the other tiers
+are sampled by the timer.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Any, Callable, List, Optional, TextIO, Tuple
+
+import avm2.vm
+from avm2.abc.instructions import Instruction
+from avm2.abc.types import ABCMethodIndex
+
+
+class Profiler:
+    """
+    Samples the ActionScript call stack of the virtual machine while it's used as a context manager.
+    """
+
+    def __init__(self, machine: avm2.vm.VirtualMachine, interval: Optional[float] = 0.005, instructions: int = 0):
+        """
+        Sample every `interval` seconds unless it's `None`, and every `instructions` executed instructions
+        unless it's zero.
+        """
+        self.machine = machine
+        self.interval = interval
+        self.instructions = instructions
+        self.countdown = instructions  # of the instructions until the next sample
+        self.samples: Counter[Tuple[str, ...]] = Counter()
+        self.stack: List[str] = []
+
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.replaced_invoke_method: Optional[Any] = None  # instance attribute replaced by `start`, if any
+        self.replaced_instruction_hook: Optional[Callable[[Instruction], Any]] = None
+
+    def __enter__(self) -> Profiler:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """
+        Install the profiler on the machine and start sampling.
+        """
+        machine = self.machine
+        self.replaced_invoke_method = machine.__dict__.get('invoke_method')
+        self.replaced_instruction_hook = machine.instruction_hook
+        machine.invoke_method = self.wrap_invoke_method(machine.invoke_method)
+        if self.instructions:
+            machine.instruction_hook = self.wrap_instruction_hook(machine.instruction_hook)
+
+        if self.interval is not None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.sample_on_timer, name='avm2-profiler', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and restore the machine.
+        """
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+        if self.replaced_invoke_method is None:
+            self.machine.__dict__.pop('invoke_method', None)
+        else:
+            self.machine.invoke_method = self.replaced_invoke_method
+        self.machine.instruction_hook = self.replaced_instruction_hook
+        self.replaced_invoke_method = self.replaced_instruction_hook = None
+
+    def sample(self):
+        if self.stack:
+            self.samples[tuple(self.stack)] += 1
+
+    def sample_on_timer(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def wrap_invoke_method(self, invoke_method: Any) -> Any:
+        stack = self.stack
+        get_method_name = self.machine.name_index.get_method_name
+
+        def profiled_invoke_method(index: ABCMethodIndex, this: Any, *args) -> Any:
+            stack.append(get_method_name(index) or f'#{index}')
+            try:
+                return invoke_method(index, this, *args)
+            finally:
+                stack.pop()
+        return profiled_invoke_method
+
+    def wrap_instruction_hook(self, hook: Optional[Callable[[Instruction], Any]]) -> Callable[[Instruction], Any]:
+        """
+        Get the instruction hook which samples every N instructions, after calling the existing hook if any.
+        """
+
+        def sampling_hook(instruction_: Instruction):
+            if hook is not None:
+                hook(instruction_)
+            # The countdown is kept across the nested calls.
+            self.countdown -= 1
+            if self.countdown == 0:
+                self.countdown = self.instructions
+                self.sample()
+        return sampling_hook
+
+    def get_collapsed_stacks(self) -> str:
+        """
+        Get the samples as collapsed stacks, the most frequent first.
+        """
+        return ''.join(f'{";".join(stack)} {count}\n' for stack, count in self.samples.most_common())
+
+    def write_collapsed_stacks(self, file: TextIO):
+        file.write(self.get_collapsed_stacks())
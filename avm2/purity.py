@@ -0,0 +1,256 @@
+"""
+Static purity analysis of method bodies, and memoization of pure method calls.
+
+A method is pure when its return value only depends on its arguments, and calling it has no side effects:
+it doesn't read or write properties, slots or the global state, and it only calls pure methods.
+The analysis is conservative: dynamically dispatched calls are assumed to be impure.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from avm2.abc.instructions import (
+    Add,
+    AddInteger,
+    BitAnd,
+    BitNot,
+    BitOr,
+    BitXor,
+    CallStatic,
+    CoerceAny,
+    ConvertToBoolean,
+    ConvertToDouble,
+    ConvertToInteger,
+    ConvertToUnsignedInteger,
+    Debug,
+    DebugFile,
+    DebugLine,
+    DecLocal,
+    DecLocalInteger,
+    Decrement,
+    DecrementInteger,
+    Divide,
+    Dup,
+    EqualsOperation,
+    GetLocal,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GreaterEquals,
+    GreaterThan,
+    IfEq,
+    IfFalse,
+    IfGE,
+    IfGT,
+    IfLE,
+    IfLT,
+    IfNE,
+    IfNGE,
+    IfNGT,
+    IfNLE,
+    IfNLT,
+    IfStrictEq,
+    IfStrictNE,
+    IfTrue,
+    IncLocal,
+    IncLocalInteger,
+    Increment,
+    IncrementInteger,
+    Jump,
+    Kill,
+    Label,
+    LeftShift,
+    LessEquals,
+    LessThan,
+    LookupSwitch,
+    MethodCode,
+    Modulo,
+    Multiply,
+    MultiplyInteger,
+    Negate,
+    NegateInteger,
+    Nop,
+    Not,
+    Pop,
+    PopScope,
+    PushByte,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushNaN,
+    PushNull,
+    PushScope,
+    PushShort,
+    PushString,
+    PushTrue,
+    PushUndefined,
+    PushUnsignedInteger,
+    ReturnValue,
+    ReturnVoid,
+    RightShift,
+    SetLocal,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    StrictEquals,
+    Subtract,
+    SubtractInteger,
+    Swap,
+    UnsignedRightShift,
+)
+from avm2.abc.types import ABCMethodIndex
+
+# Instructions which only operate on constants, the operand stack and the registers except for `this`.
+# `this` (register 0) is excluded, so that a pure method result doesn't depend on it.
+# `pushscope` is pure since the scope stack is only read by impure instructions.
+pure_instructions = frozenset({
+    Add,
+    AddInteger,
+    BitAnd,
+    BitNot,
+    BitOr,
+    BitXor,
+    CoerceAny,
+    ConvertToBoolean,
+    ConvertToDouble,
+    ConvertToInteger,
+    ConvertToUnsignedInteger,
+    Debug,
+    DebugFile,
+    DebugLine,
+    DecLocal,
+    DecLocalInteger,
+    Decrement,
+    DecrementInteger,
+    Divide,
+    Dup,
+    EqualsOperation,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GreaterEquals,
+    GreaterThan,
+    IfEq,
+    IfFalse,
+    IfGE,
+    IfGT,
+    IfLE,
+    IfLT,
+    IfNE,
+    IfNGE,
+    IfNGT,
+    IfNLE,
+    IfNLT,
+    IfStrictEq,
+    IfStrictNE,
+    IfTrue,
+    IncLocal,
+    IncLocalInteger,
+    Increment,
+    IncrementInteger,
+    Jump,
+    Kill,
+    Label,
+    LeftShift,
+    LessEquals,
+    LessThan,
+    LookupSwitch,
+    Modulo,
+    Multiply,
+    MultiplyInteger,
+    Negate,
+    NegateInteger,
+    Nop,
+    Not,
+    Pop,
+    PopScope,
+    PushByte,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushNaN,
+    PushNull,
+    PushScope,
+    PushShort,
+    PushString,
+    PushTrue,
+    PushUndefined,
+    PushUnsignedInteger,
+    ReturnValue,
+    ReturnVoid,
+    RightShift,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    StrictEquals,
+    Subtract,
+    SubtractInteger,
+    Swap,
+    UnsignedRightShift,
+})
+
+# Instructions which access a register by its index operand.
+register_instructions = (DecLocal, DecLocalInteger, GetLocal, IncLocal, IncLocalInteger, Kill, SetLocal)
+
+Missing = object()  # memo cache miss marker, `None` is a valid return value
+
+
+def is_pure_code(code: MethodCode, is_pure_method: Callable[[ABCMethodIndex], bool]) -> bool:
+    """
+    Check if the method code is pure. Static calls are pure if `is_pure_method` is true for the called method.
+    """
+    instructions = code.instructions
+    for index, instruction_ in enumerate(instructions):
+        type_ = type(instruction_)
+        if type_ in pure_instructions:
+            continue
+        if isinstance(instruction_, register_instructions) and instruction_.index != 0:
+            continue
+        if type_ is GetLocal0 and index + 1 < len(instructions) and type(instructions[index + 1]) is PushScope:
+            continue  # `this` is pushed onto the scope stack, which is never read by the pure instructions
+        if type_ is CallStatic and is_pure_method(ABCMethodIndex(instruction_.index)):
+            continue
+        return False
+    return True
+
+
+class MemoCache:
+    """
+    Bounded LRU cache of pure method return values, keyed by the method and the arguments.
+    """
+
+    def __init__(self, max_size: int):
+        self.entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def call(self, key: Hashable, function: Callable[..., Any], *args) -> Any:
+        """
+        Get the cached value of the `key`, or call the function and cache its return value.
+        Unhashable keys are never cached.
+        """
+        try:
+            value = self.entries.get(key, Missing)
+        except TypeError:
+            return function(*args)
+        if value is not Missing:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = self.entries[key] = function(*args)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.entries)}
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from avm2.abc.types import ABCClassIndex
 
 
+class Properties(Dict[Tuple[str, str], 'ASObject']):
+    """
+    Object properties by namespace and name.
+    Adding or removing a property bumps the version of the properties, see `avm2.vm.InlineCache`.
+    """
+
+    version = 0  # until the first change
+
+    def __setitem__(self, key: Tuple[str, str], value: ASObject):
+        if key not in self:
+            self.version += 1
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Tuple[str, str]):
+        super().__delitem__(key)
+        self.version += 1
+
+    def setdefault(self, key: Tuple[str, str], default: Any = None) -> ASObject:
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def pop(self, *args) -> ASObject:
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[Tuple[str, str], ASObject]:
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
 @dataclass
 class ASObject:
     class_index: Optional[ABCClassIndex] = None
-    properties: Dict[Tuple[str, str], ASObject] = field(default_factory=dict)
+    properties: Properties = field(default_factory=Properties)
 
 
 @dataclass
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import lzma
+import mmap
 import zlib
-from typing import Iterable, Union
+from os import PathLike
+from typing import Iterable, Iterator, Optional, Union
 
-from avm2.io import MemoryViewReader
+from avm2.io import ChunkedReader, MemoryViewReader
 from avm2.swf.enums import Signature
 from avm2.swf.types import Tag, TagType
 
@@ -24,6 +26,45 @@ def parse_swf(input_: Union[memoryview, bytes]) -> Iterable[Tag]:
     return read_tags(reader)
 
 
+def stream_swf(
+    input_: Union[memoryview, bytes],
+    stop_after: Optional[TagType] = None,
+    chunk_size: int = 65536,
+) -> Iterator[Tag]:
+    """
+    Parse SWF file and get an iterator of its tags, decompressing it only as far as needed to read the next tag.
+    Stop after the tag of the `stop_after` type, if specified. For example, `stop_after=TagType.DO_ABC`.
+    """
+    reader = MemoryViewReader(input_)
+    signature = Signature(reader.read_u8())
+    assert reader.read_u16() == 0x5357
+    reader.skip(1)  # version
+    reader.skip(4)  # file length
+    if signature != Signature.UNCOMPRESSED:
+        reader = ChunkedReader(decompress_chunks(reader, signature, chunk_size))
+    reader.skip_rect()
+    reader.skip(4)  # frame rate and frame count
+    for tag in read_tags(reader):
+        yield tag
+        if tag.type_ == stop_after:
+            break
+
+
+def open_swf(
+    path: Union[str, PathLike],
+    stop_after: Optional[TagType] = None,
+    chunk_size: int = 65536,
+) -> Iterator[Tag]:
+    """
+    Memory-map SWF file and get an iterator of its tags, see `stream_swf`.
+    The file is not copied into the process memory: compressed files are decompressed straight from the mapping,
+    and tags of uncompressed files are slices of the mapping. The mapping is released once no tag refers to it.
+    """
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return stream_swf(memoryview(mapping), stop_after, chunk_size)
+
+
 def decompress(reader: MemoryViewReader, signature: Signature) -> MemoryViewReader:
     """
     Decompress the rest of an SWF file, depending on its signature.
@@ -39,6 +80,23 @@ def decompress(reader: MemoryViewReader, signature: Signature) -> MemoryViewRead
     assert False, 'unreachable code'
 
 
+def decompress_chunks(reader: MemoryViewReader, signature: Signature, chunk_size: int) -> Iterator[bytes]:
+    """
+    Decompress the rest of an SWF file incrementally, depending on its signature.
+    """
+    if signature == Signature.LZMA:
+        reader.skip(4)  # skip compressed length
+        decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_ALONE)
+        # Properties are followed by the unknown uncompressed length, see `decompress`.
+        yield decompressor.decompress(reader.read(5).tobytes() + b'\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF')
+    elif signature == Signature.ZLIB:
+        decompressor = zlib.decompressobj()
+    else:
+        assert False, 'unreachable code'
+    while not reader.is_eof() and not decompressor.eof:
+        yield decompressor.decompress(reader.read(chunk_size))
+
+
 def read_tags(reader: MemoryViewReader) -> Iterable[Tag]:
     """
     Read tags from the stream and get an iterable of tags.
@@ -0,0 +1,439 @@
+"""
+Direct-threaded code: method body instructions compiled into closures specialized on their operands.
+
+A step is called with the operand stack, the registers and the method environment, and returns the index
+of the next step to call, or `RETURN_INDEX` to return from the method. Jump targets are resolved at compile time.
+Instructions without a specialized step are executed through `Instruction.execute`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Type, TypeVar
+
+import avm2.vm
+from avm2.abc.instructions import (
+    RETURN,
+    Add,
+    AddInteger,
+    ConvertToDouble,
+    ConvertToInteger,
+    Divide,
+    Dup,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GetLocalPair,
+    GetScopeObject,
+    GreaterEquals,
+    IfFalse,
+    IfLT,
+    IfNGT,
+    IfNLT,
+    Instruction,
+    Jump,
+    LookupSwitch,
+    MethodCode,
+    Pop,
+    PushByte,
+    PushConstant,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushTrue,
+    ReturnValue,
+    ReturnVoid,
+    SetLocal0,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    SubtractInteger,
+    local_indices,
+)
+from avm2.runtime import undefined
+
+Step = Callable[[List[Any], List[Any], 'avm2.vm.MethodEnvironment'], int]
+StepCompiler = Callable[[Instruction, 'avm2.vm.VirtualMachine', MethodCode, int], Step]
+
+RETURN_INDEX = -1
+
+
+@dataclass
+class ThreadedCode:
+    """
+    Method code compiled into steps.
+    """
+
+    steps: List[Step]
+
+    def __init__(self, machine: avm2.vm.VirtualMachine, code: MethodCode):
+        self.steps = [compile_step(machine, code, index) for index in range(len(code.instructions))]
+
+
+def compile_step(machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    """
+    Compile the instruction at `index` into a step.
+    """
+    instruction_ = code.instructions[index]
+    compile_ = step_compilers.get(type(instruction_), compile_instruction)
+    try:
+        return compile_(instruction_, machine, code, index)
+    except KeyError:
+        # Jump target is not an instruction, compilers emit such jumps in unreachable code.
+        # Defer the failure until the instruction is actually executed, as the interpreter does.
+        return compile_instruction(instruction_, machine, code, index)
+
+
+T = TypeVar('T', bound=StepCompiler)
+step_compilers: Dict[Type[Instruction], StepCompiler] = {}
+
+
+def step_compiler(*classes: Type[Instruction]) -> Callable[[T], T]:
+    def wrapper(compile_: T) -> T:
+        for class_ in classes:
+            assert class_ not in step_compilers, step_compilers[class_]
+            step_compilers[class_] = compile_
+        return compile_
+    return wrapper
+
+
+def compile_instruction(
+    instruction_: Instruction,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    """
+    Fall back to `Instruction.execute`.
+    """
+    execute = instruction_.execute
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        offset = execute(machine, environment)
+        if offset is None:
+            return next_index
+        if offset == RETURN:
+            return RETURN_INDEX
+        return code.jump(index, offset)
+
+    return step
+
+
+# Steps implementation.
+# ----------------------------------------------------------------------------------------------------------------------
+
+@step_compiler(Add)
+def compile_add(instruction_: Add, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        stack.append(stack.pop() + value_2)
+        return next_index
+
+    return step
+
+
+@step_compiler(AddInteger)
+def compile_add_integer(
+    instruction_: AddInteger,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        stack.append(int(stack.pop()) + int(value_2))
+        return next_index
+
+    return step
+
+
+@step_compiler(ConvertToDouble)
+def compile_convert_to_double(
+    instruction_: ConvertToDouble,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(float(stack.pop()))
+        return next_index
+
+    return step
+
+
+@step_compiler(ConvertToInteger)
+def compile_convert_to_integer(
+    instruction_: ConvertToInteger,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(int(stack.pop()))
+        return next_index
+
+    return step
+
+
+@step_compiler(Divide)
+def compile_divide(instruction_: Divide, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        stack.append(stack.pop() / value_2)
+        return next_index
+
+    return step
+
+
+@step_compiler(Dup)
+def compile_dup(instruction_: Dup, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(stack[-1])
+        return next_index
+
+    return step
+
+
+@step_compiler(GetLocal0, GetLocal1, GetLocal2, GetLocal3)
+def compile_get_local(instruction_: Instruction, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+    register_index = local_indices[type(instruction_)]
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(registers[register_index])
+        return next_index
+
+    return step
+
+
+@step_compiler(GetLocalPair)
+def compile_get_local_pair(
+    instruction_: GetLocalPair,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+    index_1, index_2 = instruction_.index_1, instruction_.index_2
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(registers[index_1])
+        stack.append(registers[index_2])
+        return next_index
+
+    return step
+
+
+@step_compiler(GetScopeObject)
+def compile_get_scope_object(
+    instruction_: GetScopeObject,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+    scope_index = instruction_.index
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(environment.scope_stack[scope_index])
+        return next_index
+
+    return step
+
+
+@step_compiler(GreaterEquals)
+def compile_greater_equals(
+    instruction_: GreaterEquals,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        stack.append(stack.pop() >= value_2)
+        return next_index
+
+    return step
+
+
+@step_compiler(IfFalse)
+def compile_if_false(instruction_: IfFalse, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+    target_index = code.jump(index, instruction_.offset)
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        return next_index if stack.pop() else target_index
+
+    return step
+
+
+@step_compiler(IfLT)
+def compile_if_lt(instruction_: IfLT, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+    target_index = code.jump(index, instruction_.offset)
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        return target_index if stack.pop() < value_2 else next_index
+
+    return step
+
+
+@step_compiler(IfNGT)
+def compile_if_ngt(instruction_: IfNGT, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+    target_index = code.jump(index, instruction_.offset)
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        # FIXME: NaN.
+        return next_index if stack.pop() > value_2 else target_index
+
+    return step
+
+
+@step_compiler(IfNLT)
+def compile_if_nlt(instruction_: IfNLT, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+    target_index = code.jump(index, instruction_.offset)
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        # FIXME: NaN.
+        return next_index if stack.pop() < value_2 else target_index
+
+    return step
+
+
+@step_compiler(Jump)
+def compile_jump(instruction_: Jump, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    target_index = code.jump(index, instruction_.offset)
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        return target_index
+
+    return step
+
+
+@step_compiler(LookupSwitch)
+def compile_lookup_switch(
+    instruction_: LookupSwitch,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    case_indices = [code.jump(index, offset) for offset in instruction_.case_offsets]
+    default_index = code.jump(index, instruction_.default_offset)
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        case_index = stack.pop()
+        if 0 <= case_index < len(case_indices):
+            return case_indices[case_index]
+        return default_index
+
+    return step
+
+
+@step_compiler(Pop)
+def compile_pop(instruction_: Pop, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.pop()
+        return next_index
+
+    return step
+
+
+@step_compiler(PushByte, PushConstant, PushDouble, PushFalse, PushInteger, PushTrue)
+def compile_push_constant(
+    instruction_: Instruction,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+    # The pushed value doesn't depend on the environment, so it's taken from a dry run.
+    dry_run_environment = avm2.vm.MethodEnvironment([], [])
+    instruction_.execute(machine, dry_run_environment)
+    (value,) = dry_run_environment.operand_stack
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        stack.append(value)
+        return next_index
+
+    return step
+
+
+@step_compiler(ReturnValue)
+def compile_return_value(
+    instruction_: ReturnValue,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        # FIXME: coerce to the expected return type.
+        environment.return_value = stack.pop()
+        return RETURN_INDEX
+
+    return step
+
+
+@step_compiler(ReturnVoid)
+def compile_return_void(
+    instruction_: ReturnVoid,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        environment.return_value = undefined
+        return RETURN_INDEX
+
+    return step
+
+
+@step_compiler(SetLocal0, SetLocal1, SetLocal2, SetLocal3)
+def compile_set_local(instruction_: Instruction, machine: avm2.vm.VirtualMachine, code: MethodCode, index: int) -> Step:
+    next_index = index + 1
+    register_index = local_indices[type(instruction_)]
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        registers[register_index] = stack.pop()
+        return next_index
+
+    return step
+
+
+@step_compiler(SubtractInteger)
+def compile_subtract_integer(
+    instruction_: SubtractInteger,
+    machine: avm2.vm.VirtualMachine,
+    code: MethodCode,
+    index: int,
+) -> Step:
+    next_index = index + 1
+
+    def step(stack: List[Any], registers: List[Any], environment: avm2.vm.MethodEnvironment) -> int:
+        value_2 = stack.pop()
+        stack.append(int(stack.pop()) - int(value_2))
+        return next_index
+
+    return step
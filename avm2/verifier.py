@@ -0,0 +1,341 @@
+"""
+Method body verifier.
+
+The code is split into basic blocks, and the operand and scope stack depths are propagated through the control flow
+graph. The depths must agree where the control flow merges, and must stay within the limits declared by the method
+body: `max_stack`, `max_scope_depth - init_scope_depth` and `local_count`. Once a method body is verified,
+the execution tiers may rely on the recorded depths instead of checking them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Type
+
+import avm2.vm
+from avm2.abc.instructions import (
+    AsTypeLate,
+    Call,
+    CallMethod,
+    CallPropLex,
+    CallPropVoid,
+    CallProperty,
+    CallStatic,
+    CallSuper,
+    CallSuperVoid,
+    Debug,
+    DebugFile,
+    DebugLine,
+    DecLocal,
+    DecLocalInteger,
+    DeleteProperty,
+    DXNS,
+    DXNSLate,
+    Dup,
+    FindProperty,
+    FindPropStrict,
+    GetDescendants,
+    GetGlobalScope,
+    GetGlobalSlot,
+    GetLex,
+    GetLocal,
+    GetLocal0,
+    GetLocal1,
+    GetLocal2,
+    GetLocal3,
+    GetLocalPair,
+    GetProperty,
+    GetScopeObject,
+    GetSuper,
+    HasNext,
+    HasNext2,
+    IfEq,
+    IfFalse,
+    IfGE,
+    IfGT,
+    IfLE,
+    IfLT,
+    IfNE,
+    IfNGE,
+    IfNGT,
+    IfNLE,
+    IfNLT,
+    IfStrictEq,
+    IfStrictNE,
+    IfTrue,
+    IncLocal,
+    IncLocalInteger,
+    InitProperty,
+    Instruction,
+    IsTypeLate,
+    Jump,
+    Kill,
+    Label,
+    LookupSwitch,
+    MethodCode,
+    NewActivation,
+    NewArray,
+    NewCatch,
+    NewFunction,
+    NewObject,
+    NextName,
+    NextValue,
+    Nop,
+    Pop,
+    PopScope,
+    PushByte,
+    PushConstant,
+    PushDouble,
+    PushFalse,
+    PushInteger,
+    PushNaN,
+    PushNamespace,
+    PushNull,
+    PushScope,
+    PushShort,
+    PushString,
+    PushThisScope,
+    PushTrue,
+    PushUndefined,
+    PushUnsignedInteger,
+    PushWith,
+    ReturnValue,
+    ReturnVoid,
+    SetGlobalSlot,
+    SetLocal,
+    SetLocal0,
+    SetLocal1,
+    SetLocal2,
+    SetLocal3,
+    SetProperty,
+    SetSlot,
+    SetSuper,
+    Swap,
+    Throw,
+    opcode_to_instruction,
+)
+from avm2.abc.types import ASMethodBody
+from avm2.exceptions import VerifyError
+
+# `constructsuper` is also named `Construct` in `avm2.abc.instructions`, so both are looked up by their opcodes.
+Construct = opcode_to_instruction[0x42]
+ConstructSuper = opcode_to_instruction[0x49]
+ConstructProp = opcode_to_instruction[0x4A]
+
+# Instructions which end a basic block.
+BRANCHES = (
+    IfEq, IfFalse, IfGE, IfGT, IfLE, IfLT, IfNE, IfNGE, IfNGT, IfNLE, IfNLT, IfStrictEq, IfStrictNE, IfTrue, Jump,
+)
+TERMINATORS = (Jump, LookupSwitch, ReturnValue, ReturnVoid, Throw)
+BLOCK_ENDS = (*BRANCHES, *TERMINATORS)
+
+# Operand stack effects: the number of popped and pushed values.
+# Unlisted instructions are unary operators which pop a value and push a result.
+stack_effects: Dict[Type[Instruction], Tuple[int, int]] = {
+    **dict.fromkeys((Debug, DebugFile, DebugLine, DecLocal, DecLocalInteger, DXNS, IncLocal, IncLocalInteger), (0, 0)),
+    **dict.fromkeys((Jump, Kill, Label, Nop, PopScope, ReturnVoid), (0, 0)),
+    **dict.fromkeys((GetGlobalScope, GetGlobalSlot, GetLex, GetLocal, GetLocal0, GetLocal1, GetLocal2), (0, 1)),
+    **dict.fromkeys((GetLocal3, GetScopeObject, HasNext2, NewActivation, NewCatch, NewFunction), (0, 1)),
+    **dict.fromkeys((PushByte, PushDouble, PushFalse, PushInteger, PushNaN, PushNamespace, PushNull), (0, 1)),
+    **dict.fromkeys((PushShort, PushString, PushTrue, PushUndefined, PushUnsignedInteger), (0, 1)),
+    **dict.fromkeys((DXNSLate, IfFalse, IfTrue, LookupSwitch, Pop, PushScope, PushWith, ReturnValue), (1, 0)),
+    **dict.fromkeys((SetGlobalSlot, SetLocal, SetLocal0, SetLocal1, SetLocal2, SetLocal3, Throw), (1, 0)),
+    **dict.fromkeys((IfEq, IfGE, IfGT, IfLE, IfLT, IfNE, IfNGE, IfNGT, IfNLE, IfNLT, IfStrictEq, IfStrictNE), (2, 0)),
+    **dict.fromkeys((AsTypeLate, HasNext, IsTypeLate, NextName, NextValue), (2, 1)),
+    # Binary operators: from `add` to `in` except for `istype`, and from `add_i` to `multiply_i`.
+    **{
+        class_: (2, 1)
+        for opcode, class_ in opcode_to_instruction.items()
+        if 0xA0 <= opcode <= 0xB4 and opcode != 0xB2 or 0xC5 <= opcode <= 0xC7
+    },
+    SetSlot: (2, 0),
+    Dup: (1, 2),
+    # Superinstructions of `avm2.optimizer`.
+    GetLocalPair: (0, 2),
+    PushConstant: (0, 1),
+    PushThisScope: (0, 0),
+    Swap: (2, 2),
+}
+
+# Instructions taking a multiname, with the stack effect before the runtime name and namespace are popped.
+multiname_stack_effects: Dict[Type[Instruction], Tuple[int, int]] = {
+    DeleteProperty: (1, 1),
+    FindProperty: (0, 1),
+    FindPropStrict: (0, 1),
+    GetDescendants: (1, 1),
+    GetProperty: (1, 1),
+    GetSuper: (1, 1),
+    InitProperty: (2, 0),
+    SetProperty: (2, 0),
+    SetSuper: (2, 0),
+}
+# Calls taking a multiname, with the stack effect before the arguments are popped.
+call_multiname_stack_effects: Dict[Type[Instruction], Tuple[int, int]] = {
+    CallProperty: (1, 1),
+    CallPropLex: (1, 1),
+    CallPropVoid: (1, 0),
+    CallSuper: (1, 1),
+    CallSuperVoid: (1, 0),
+    ConstructProp: (1, 1),
+}
+# Calls, with the stack effect before the arguments are popped.
+call_stack_effects: Dict[Type[Instruction], Tuple[int, int]] = {
+    Call: (2, 1),
+    CallMethod: (1, 1),
+    CallStatic: (1, 1),
+    Construct: (1, 1),
+    ConstructSuper: (1, 0),
+    NewArray: (0, 1),
+}
+
+
+@dataclass
+class MethodAnalysis:
+    """
+    Verified method body.
+    """
+
+    blocks: List[int]  # indices of the basic block leaders, in the code order
+    stack_depths: List[Optional[int]]  # operand stack depth before each instruction, `None` if unreachable
+    scope_depths: List[Optional[int]]  # local scope stack depth before each instruction, `None` if unreachable
+    max_stack: int  # actual maximum operand stack depth
+    max_scope_depth: int  # actual maximum local scope stack depth
+
+
+def get_stack_effect(machine: avm2.vm.VirtualMachine, instruction_: Instruction) -> Tuple[int, int]:
+    """
+    Get the number of values the instruction pops from and pushes onto the operand stack.
+    """
+    type_ = type(instruction_)
+    try:
+        return stack_effects[type_]
+    except KeyError:
+        pass
+    if type_ in call_stack_effects:
+        pop_count, push_count = call_stack_effects[type_]
+        return pop_count + instruction_.arg_count, push_count
+    if type_ is NewObject:
+        return 2 * instruction_.arg_count, 1
+    if type_ in multiname_stack_effects:
+        pop_count, push_count = multiname_stack_effects[type_]
+    elif type_ in call_multiname_stack_effects:
+        pop_count, push_count = call_multiname_stack_effects[type_]
+        pop_count += instruction_.arg_count
+    else:
+        return 1, 1
+    multiname = machine.resolved_multinames[instruction_.index]
+    return pop_count + multiname.runtime_name + multiname.runtime_namespace, push_count
+
+
+def get_register_indices(instruction_: Instruction) -> Tuple[int, ...]:
+    """
+    Get the indices of the registers accessed by the instruction.
+    """
+    if isinstance(instruction_, (DecLocal, DecLocalInteger, GetLocal, IncLocal, IncLocalInteger, Kill, SetLocal)):
+        return instruction_.index,
+    if isinstance(instruction_, HasNext2):
+        return instruction_.object_reg, instruction_.index_reg
+    if isinstance(instruction_, GetLocalPair):
+        return instruction_.index_1, instruction_.index_2
+    if isinstance(instruction_, (GetLocal1, SetLocal1)):
+        return 1,
+    if isinstance(instruction_, (GetLocal2, SetLocal2)):
+        return 2,
+    if isinstance(instruction_, (GetLocal3, SetLocal3)):
+        return 3,
+    return ()
+
+
+def get_successors(code: MethodCode, index: int) -> List[int]:
+    """
+    Get indices of the instructions which may be executed after the instruction at `index`.
+    Exception handlers are not included.
+    """
+    instruction_ = code.instructions[index]
+    try:
+        if isinstance(instruction_, LookupSwitch):
+            return [code.jump(index, offset) for offset in (instruction_.default_offset, *instruction_.case_offsets)]
+        if isinstance(instruction_, Jump):
+            return [code.jump(index, instruction_.offset)]
+        if isinstance(instruction_, BRANCHES):
+            return [index + 1, code.jump(index, instruction_.offset)]
+    except KeyError:
+        raise VerifyError(f'invalid jump target at #{index}: {instruction_}')
+    if isinstance(instruction_, TERMINATORS):
+        return []
+    return [index + 1]
+
+
+def analyze(machine: avm2.vm.VirtualMachine, method_body: ASMethodBody, code: MethodCode) -> MethodAnalysis:
+    """
+    Verify the decoded method body and get the analysis. Raise `VerifyError` if the method body is invalid.
+    Unreachable code isn't verified, since compilers emit invalid jumps there.
+    """
+    instructions = code.instructions
+    size = len(instructions)
+    max_local_scope_depth = method_body.max_scope_depth - method_body.init_scope_depth
+    stack_depths: List[Optional[int]] = [None] * size
+    scope_depths: List[Optional[int]] = [None] * size
+
+    # Basic blocks to verify with their entry stack depths, starting with the entry point and the exception handlers.
+    # A handler is entered with the exception on the operand stack and the local scope stack emptied.
+    pending: List[Tuple[int, int, int]] = [(0, 0, 0)]
+    for exception in method_body.exceptions:
+        try:
+            pending.append((code.offset_to_index[exception.target], 1, 0))
+        except KeyError:
+            raise VerifyError(f'invalid exception handler target: {exception.target}')
+    leaders = {index for index, _, _ in pending}
+    max_stack = max_scope_depth = 0
+
+    while pending:
+        index, stack_depth, scope_depth = pending.pop()
+        # Walk the basic block until a branch, a terminator or an already verified instruction.
+        while True:
+            if index >= size:
+                raise VerifyError('execution falls off the end of the code')
+            if stack_depths[index] is not None:
+                if (stack_depths[index], scope_depths[index]) != (stack_depth, scope_depth):
+                    raise VerifyError(
+                        f'stack depths mismatch at #{index}: '
+                        f'{(stack_depths[index], scope_depths[index])} != {(stack_depth, scope_depth)}'
+                    )
+                leaders.add(index)
+                break
+            instruction_ = instructions[index]
+            stack_depths[index] = stack_depth
+            scope_depths[index] = scope_depth
+
+            pop_count, push_count = get_stack_effect(machine, instruction_)
+            if pop_count > stack_depth:
+                raise VerifyError(f'operand stack underflow at #{index}: {instruction_}')
+            stack_depth += push_count - pop_count
+            if stack_depth > method_body.max_stack:
+                raise VerifyError(f'operand stack overflow at #{index}: {stack_depth} > {method_body.max_stack}')
+            max_stack = max(max_stack, stack_depth)
+
+            if isinstance(instruction_, (PushScope, PushThisScope, PushWith)):
+                scope_depth += 1
+                if scope_depth > max_local_scope_depth:
+                    raise VerifyError(f'scope stack overflow at #{index}: {scope_depth} > {max_local_scope_depth}')
+                max_scope_depth = max(max_scope_depth, scope_depth)
+            elif isinstance(instruction_, PopScope):
+                if scope_depth == 0:
+                    raise VerifyError(f'scope stack underflow at #{index}')
+                scope_depth -= 1
+            elif isinstance(instruction_, GetScopeObject) and instruction_.index >= scope_depth:
+                raise VerifyError(f'invalid scope index at #{index}: {instruction_.index} >= {scope_depth}')
+
+            for register_index in get_register_indices(instruction_):
+                if register_index >= method_body.local_count:
+                    raise VerifyError(f'invalid register at #{index}: {register_index} >= {method_body.local_count}')
+
+            if isinstance(instruction_, BLOCK_ENDS):
+                successors = get_successors(code, index)
+                leaders.update(successors)
+                pending.extend((successor, stack_depth, scope_depth) for successor in successors)
+                break
+            index += 1
+
+    blocks = sorted(leader for leader in leaders if leader < size and stack_depths[leader] is not None)
+    return MethodAnalysis(blocks, stack_depths, scope_depths, max_stack, max_scope_depth)
@@ -2,27 +2,85 @@ from __future__ import annotations
 
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Any, DefaultDict, Dict, Iterable, List, Tuple, Union
+from enum import IntEnum
+from typing import Any, Callable, DefaultDict, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 import avm2.abc.instructions
-from avm2.abc.enums import ConstantKind, MethodFlags, TraitKind
+from avm2.abc.enums import ConstantKind, MethodFlags, MultinameKind, TraitKind
 from avm2.abc.types import (
     ABCClassIndex,
     ABCFile,
     ABCMethodBodyIndex,
     ABCMethodIndex,
+    ABCMultinameIndex,
     ABCScriptIndex,
     ASMethodBody,
 )
-from avm2.exceptions import ASJumpException, ASReturnException
-from avm2.io import MemoryViewReader
-from avm2.runtime import ASObject, undefined
+from avm2.exceptions import VerifyError
+from avm2.index import NameIndex
+from avm2.io import MemoryViewReader, numpy
+from avm2.runtime import ASObject, Properties, undefined
 from avm2.swf.types import DoABCTag, Tag, TagType
 
 
+class Tier(IntEnum):
+    """
+    Method execution tiers, from the slowest to start to the fastest to run.
+    """
+
+    INTERPRETED = 0  # reference interpreter
+    THREADED = 1  # direct-threaded code
+    REGISTER = 2  # register-based code, see `avm2.ir`, methods which can't be translated stay threaded
+    COMPILED = 3  # Python function, methods which can't be compiled stay in the tiers below
+
+
+@dataclass
+class TierThresholds:
+    """
+    Method hotness at which a method gets promoted to the tier, `None` disables the promotion.
+    """
+
+    threaded: Optional[int] = 2
+    register: Optional[int] = 100
+    compiled: Optional[int] = 1000
+
+
 class VirtualMachine:
-    def __init__(self, abc_file: ABCFile):
+    def __init__(
+        self,
+        abc_file: ABCFile,
+        link_tables: Optional[LinkTables] = None,
+        tier: Tier = Tier.INTERPRETED,
+        tier_thresholds: Optional[TierThresholds] = None,
+        memo_size: int = 0,
+        verify: bool = False,
+        optimize: bool = False,
+        instrument: bool = False,
+    ):
+        """
+        Create a virtual machine for the ABC file. Link tables are built unless they are provided.
+        Methods start executing in the `tier`. If `tier_thresholds` are provided, methods get promoted
+        to higher tiers as they get hot. If `memo_size` is non-zero, up to `memo_size` return values
+        of pure method calls are memoized. If `verify` is set, method bodies are verified before their first call.
+        If `optimize` is set, method bodies are executed after the peephole optimization, see `avm2.optimizer`.
+        If `instrument` is set, executed instructions and method calls are counted, see `avm2.instrumentation`.
+        """
+        # The tier modules depend on the instruction classes, and `avm2.abc.instructions` imports this module,
+        # so they are only imported once a machine is created.
+        import avm2.batch
+        import avm2.compiler
+        import avm2.instrumentation
+        import avm2.ir
+        import avm2.optimizer
+        import avm2.purity
+        import avm2.threaded
+        import avm2.verifier
+
         self.abc_file = abc_file
+        self.tier = tier
+        self.tier_thresholds = tier_thresholds
+        self.verify = verify
+        self.optimize = optimize
 
         # Quick access.
         self.constant_pool = abc_file.constant_pool
@@ -31,29 +89,78 @@ class VirtualMachine:
         self.integers = self.constant_pool.integers
         self.doubles = self.constant_pool.doubles
         self.namespaces = self.constant_pool.namespaces
+        self.resolved_multinames = ResolvedMultinames(self)
 
         # Linking.
-        self.method_to_body = self.link_methods_to_bodies()
-        self.class_to_script = self.link_classes_to_scripts()
-        self.name_to_class = dict(self.link_names_to_classes())
-        self.name_to_method = dict(self.link_names_to_methods())
+        if link_tables is None:
+            link_tables = self.link()
+        self.method_to_body = link_tables.method_to_body
+        self.class_to_script = link_tables.class_to_script
+        self.name_index = NameIndex(abc_file)  # names are only decoded on lookup, see `avm2.index`
+        self.name_to_class = self.name_index.classes
+        self.name_to_method = self.name_index.methods
+
+        # Decoded method bodies.
+        self.method_codes: Dict[ABCMethodBodyIndex, avm2.abc.instructions.MethodCode] = {}
+        self.optimized_codes: Dict[ABCMethodBodyIndex, avm2.abc.instructions.MethodCode] = {}
+        self.threaded_codes: Dict[ABCMethodBodyIndex, avm2.threaded.ThreadedCode] = {}
+        self.register_codes: Dict[ABCMethodBodyIndex, Optional[avm2.ir.RegisterCode]] = {}
+        self.compiled_codes: Dict[ABCMethodBodyIndex, Optional[avm2.compiler.CompiledCode]] = {}
+        self.method_analyses: Dict[ABCMethodBodyIndex, avm2.verifier.MethodAnalysis] = {}
+
+        # Tiered execution.
+        self.method_tiers: Dict[ABCMethodBodyIndex, Tier] = {}
+        self.call_counts: DefaultDict[ABCMethodBodyIndex, int] = defaultdict(int)
+        self.final_tiers: Set[ABCMethodBodyIndex] = set()  # demoted method bodies, no longer counted
+
+        # Memoization.
+        self.pure_methods: Dict[ABCMethodIndex, bool] = {}
+        self.memo_cache = avm2.purity.MemoCache(memo_size) if memo_size else None
+
+        # Instrumentation.
+        # Called with every instruction before the interpreter executes it, see `execute_code`.
+        self.instruction_hook: Optional[Callable[[avm2.abc.instructions.Instruction], Any]] = None
+        self.instrumentation: Optional[avm2.instrumentation.Instrumentation] = None
+        if instrument:
+            self.instrumentation = avm2.instrumentation.Instrumentation(self.name_index)
+            self.instrumentation.install(self)
 
         # Runtime.
         self.class_objects: DefaultDict[ABCClassIndex, ASObject] = defaultdict(ASObject)  # FIXME: unsure, prototypes?
         self.script_objects: DefaultDict[ABCScriptIndex, ASObject] = defaultdict(ASObject)  # FIXME: unsure, what is it?
-        self.global_object = ASObject(properties={
+        self.global_object = ASObject(properties=Properties({
             ('', 'Object'): ASObject(),
             ('flash.utils', 'Dictionary'): ASObject(),
-        })  # FIXME: unsure, prototypes again?
+        }))  # FIXME: unsure, prototypes again?
+        self.inline_cache_epoch = 0  # bumped to invalidate all inline caches
 
     # Linking.
     # ------------------------------------------------------------------------------------------------------------------
 
+    def link(self) -> LinkTables:
+        """
+        Build all the link tables.
+        """
+        return LinkTables(
+            method_to_body=self.link_methods_to_bodies(),
+            class_to_script=self.link_classes_to_scripts(),
+        )
+
+    @property
+    def link_tables(self) -> LinkTables:
+        return LinkTables(
+            method_to_body=self.method_to_body,
+            class_to_script=self.class_to_script,
+        )
+
     def link_methods_to_bodies(self) -> Dict[ABCMethodIndex, ABCMethodBodyIndex]:
         """
         Link methods and methods bodies.
         """
-        return {method_body.method_index: index for index, method_body in enumerate(self.abc_file.method_bodies)}
+        return {
+            method_index: index
+            for index, method_index in enumerate(self.abc_file.get_method_body_method_indices())
+        }
 
     def link_classes_to_scripts(self) -> Dict[ABCClassIndex, ABCScriptIndex]:
         return {
@@ -63,27 +170,6 @@ class VirtualMachine:
             if trait.kind == TraitKind.CLASS
         }
 
-    def link_names_to_classes(self) -> Iterable[Tuple[str, ABCClassIndex]]:
-        """
-        Link class names and class indices.
-        """
-        # FIXME: this is doubtful.
-        for index, instance in enumerate(self.abc_file.instances):
-            assert instance.name_index
-            yield self.multinames[instance.name_index].qualified_name(self.constant_pool), index
-
-    def link_names_to_methods(self) -> Iterable[Tuple[str, ABCMethodIndex]]:
-        """
-        Link method names and method indices.
-        """
-        # FIXME: this is doubtful.
-        for instance, class_ in zip(self.abc_file.instances, self.abc_file.classes):
-            qualified_class_name = self.multinames[instance.name_index].qualified_name(self.constant_pool)
-            for trait in class_.traits:
-                if trait.kind in (TraitKind.GETTER, TraitKind.SETTER, TraitKind.METHOD):
-                    qualified_trait_name = self.multinames[trait.name_index].qualified_name(self.constant_pool)
-                    yield f'{qualified_class_name}.{qualified_trait_name}', trait.data.method_index
-
     # Resolving.
     # ------------------------------------------------------------------------------------------------------------------
 
@@ -91,11 +177,66 @@ class VirtualMachine:
         for object_ in reversed(stack):
             for namespace in namespaces:
                 try:
-                    return self.resolve_qname(object_, namespace, name), name, namespace
+                    self.resolve_qname(object_, namespace, name)
                 except KeyError:
                     pass
+                else:
+                    return object_, name, namespace
         raise KeyError(name, namespaces)
 
+    def resolve_multiname_cached(
+        self,
+        cache: InlineCache,
+        stack: List[ASObject],
+        name: str,
+        namespaces: Iterable[str],
+    ) -> Tuple[ASObject, str, str]:
+        """
+        Resolve the multiname at a call site. The previous resolution is reused if the scope stack still has
+        the same objects from the resolved one to the top, and none of them had properties added or removed since.
+        """
+        if cache.epoch == self.inline_cache_epoch:
+            depth = len(stack) - len(cache.properties)
+            if depth >= 0:
+                # Objects are only checked by their properties, objects sharing them resolve alike.
+                for properties, version, object_ in zip(cache.properties, cache.versions, stack[depth:]):
+                    if object_.properties is not properties or properties.version != version:
+                        break
+                else:
+                    cache.hits += 1
+                    return stack[depth], cache.name, cache.namespace
+        cache.misses += 1
+        object_, name, namespace = self.resolve_multiname(stack, name, namespaces)
+        depth = len(stack) - 1
+        while stack[depth] is not object_:
+            depth -= 1
+        cache.epoch = self.inline_cache_epoch
+        cache.properties = [scope_object.properties for scope_object in stack[depth:]]
+        cache.versions = [properties.version for properties in cache.properties]
+        cache.name = name
+        cache.namespace = namespace
+        return object_, name, namespace
+
+    def invalidate_inline_caches(self):
+        """
+        Invalidate all inline caches of the machine. Adding or removing a property of an object only invalidates
+        the caches whose resolution depends on the object, see `Properties`.
+        """
+        self.inline_cache_epoch += 1
+
+    def get_inline_cache_stats(self) -> Dict[str, int]:
+        """
+        Get the total inline cache hits and misses over the decoded method bodies.
+        """
+        stats = {'hits': 0, 'misses': 0}
+        for code in self.method_codes.values():
+            for instruction_ in code.instructions:
+                cache = getattr(instruction_, 'cache', None)
+                if cache is not None:
+                    stats['hits'] += cache.hits
+                    stats['misses'] += cache.misses
+        return stats
+
     def resolve_qname(self, object_: ASObject, namespace: str, name: str) -> Any:
         # Typically, the order of the search for resolving multinames is
         # the object’s declared traits, its dynamic properties, and finally the prototype chain.
@@ -104,10 +245,10 @@ class VirtualMachine:
         # TODO: prototype chain.
 
     def lookup_class(self, qualified_name: str) -> ABCClassIndex:
-        return self.name_to_class[qualified_name]
+        return self.name_index.lookup_class(qualified_name)
 
     def lookup_method(self, qualified_name: str) -> ABCMethodIndex:
-        return self.name_to_method[qualified_name]
+        return self.name_index.lookup_method(qualified_name)
 
     # Scripts.
     # ------------------------------------------------------------------------------------------------------------------
@@ -152,33 +293,294 @@ class VirtualMachine:
 
     def call_method(self, index_or_name: Union[ABCMethodIndex, str], this: Any, *args) -> Any:
         """
-        Call the specified method and get a return value.
+        Call the specified method and get a return value. Pure method calls are memoized if enabled.
+        """
+        index = self.get_method_index(index_or_name)
+        if self.memo_cache is not None and self.is_pure_method(index):
+            # Types are a part of the key since `1`, `1.0` and `True` are equal.
+            key = (index, args, tuple(map(type, args)))
+            return self.memo_cache.call(key, self.invoke_method, index, this, *args)
+        return self.invoke_method(index, this, *args)
+
+    def invoke_method(self, index: ABCMethodIndex, this: Any, *args) -> Any:
+        """
+        Execute the method in its tier and get a return value.
         """
-        if isinstance(index_or_name, int):
-            index = ABCMethodIndex(index_or_name)
-        elif isinstance(index_or_name, str):
-            index = self.lookup_method(index_or_name)
-        else:
-            raise ValueError(index_or_name)
-
         # TODO: init script on demand.
-        method_body = self.abc_file.method_bodies[self.method_to_body[index]]
+        method_body_index = self.method_to_body[index]
+        method_body = self.abc_file.method_bodies[method_body_index]
+        if self.verify:
+            self.get_method_analysis(method_body_index)
         environment = self.create_method_environment(method_body, this, *args)
-        return self.execute_code(method_body.code, environment)
+        tier = self.get_tier(method_body_index)
+        if tier == Tier.COMPILED:
+            compiled_code = self.get_compiled_code(method_body_index)
+            if compiled_code is not None:
+                return compiled_code.function(self, environment)
+            # Can't be compiled, stay in the tier below for good.
+            tier = self.method_tiers[method_body_index] = Tier.REGISTER
+            self.final_tiers.add(method_body_index)
+        if tier == Tier.REGISTER:
+            register_code = self.get_register_code(method_body_index)
+            if register_code is not None:
+                return self.execute_register_code(register_code, environment)
+            # Can't be translated, `get_tier` won't promote it again.
+            tier = self.method_tiers[method_body_index] = Tier.THREADED
+        if tier == Tier.THREADED:
+            return self.execute_threaded_code(self.get_threaded_code(method_body_index), environment)
+        return self.execute_code(self.get_executable_code(method_body_index), environment)
+
+    def call_method_batch(self, index_or_name: Union[ABCMethodIndex, str], *args, this: Any = undefined) -> Any:
+        """
+        Call the specified method for each element of the argument arrays and get the array of return values.
+        Numeric methods are executed over the whole arrays at once, see `avm2.batch`.
+        Other methods are called element by element. Without NumPy, a list is returned.
+        """
+        index = self.get_method_index(index_or_name)
+        if numpy is None:
+            return [self.call_method(index, this, *element_args) for element_args in zip(*args)]
+        args = numpy.broadcast_arrays(*(numpy.atleast_1d(arg) for arg in args))
+        method_body_index = self.method_to_body[index]
+        code = self.get_method_code(method_body_index)
+        if avm2.batch.can_execute_batch(code):
+            method_body = self.abc_file.method_bodies[method_body_index]
+            environment = self.create_method_environment(method_body, this, *args)
+            try:
+                return avm2.batch.execute_batch(self, code, environment.registers, len(args[0]))
+            except TypeError:
+                pass  # non-numeric values, such as `undefined` in a register
+        return numpy.array([self.call_method(index, this, *element_args) for element_args in zip(*map(list, args))])
+
+    def get_method_index(self, index_or_name: Union[ABCMethodIndex, str]) -> ABCMethodIndex:
+        if isinstance(index_or_name, int):
+            return ABCMethodIndex(index_or_name)
+        if isinstance(index_or_name, str):
+            return self.lookup_method(index_or_name)
+        raise ValueError(index_or_name)
+
+    def is_pure_method(self, index: ABCMethodIndex) -> bool:
+        """
+        Check if the method is pure, see `avm2.purity`. The result is cached.
+        Methods without a body and recursive methods are considered impure.
+        """
+        try:
+            return self.pure_methods[index]
+        except KeyError:
+            pass
+        self.pure_methods[index] = False  # until proven otherwise, this also stops recursion
+        method_body_index = self.method_to_body.get(index)
+        if method_body_index is None:
+            return False
+        code = self.get_method_code(method_body_index)
+        pure = self.pure_methods[index] = avm2.purity.is_pure_code(code, self.is_pure_method)
+        return pure
+
+    def get_memo_stats(self) -> Dict[str, int]:
+        """
+        Get the memoized pure method calls hits, misses, evictions and the cache size.
+        """
+        if self.memo_cache is None:
+            return {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0}
+        return self.memo_cache.get_stats()
+
+    def get_instrumentation_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the executed instruction counts, and method call counts and times, see `Instrumentation.snapshot`.
+        """
+        if self.instrumentation is None:
+            return {'instructions': {}, 'methods': {}}
+        return self.instrumentation.snapshot()
 
-    def execute_code(self, code: memoryview, environment: MethodEnvironment) -> Any:
+    def get_instrumentation_report(self, limit: int = 20) -> str:
         """
-        Execute the byte-code and get a return value.
+        Get the text report of the most executed instructions and the most time-consuming methods.
         """
-        reader = MemoryViewReader(code)
+        if self.instrumentation is None:
+            return 'instrumentation is disabled'
+        return self.instrumentation.report(limit)
+
+    def get_tier(self, index: ABCMethodBodyIndex) -> Tier:
+        """
+        Count the method body call and get its tier, promoting the method body once it crosses a threshold.
+        Hotness is the number of calls plus the number of backward jumps taken by the interpreter.
+        """
+        tier = self.method_tiers.get(index, self.tier)
+        thresholds = self.tier_thresholds
+        if thresholds is None or tier == Tier.COMPILED or index in self.final_tiers:
+            return tier
+        self.call_counts[index] += 1
+        hotness = self.call_counts[index]
+        code = (self.optimized_codes if self.optimize else self.method_codes).get(index)
+        if code is not None:
+            hotness += code.back_edge_count
+        if thresholds.compiled is not None and hotness >= thresholds.compiled:
+            if index in self.compiled_codes and self.compiled_codes[index] is None:
+                # Known to fail compiling, go to the tier below for good like `invoke_method` does.
+                tier = self.method_tiers[index] = Tier.REGISTER
+                self.final_tiers.add(index)
+            else:
+                tier = self.method_tiers[index] = Tier.COMPILED
+        elif (
+            tier < Tier.REGISTER
+            and thresholds.register is not None
+            and hotness >= thresholds.register
+            and not (index in self.register_codes and self.register_codes[index] is None)
+        ):
+            tier = self.method_tiers[index] = Tier.REGISTER
+        elif tier < Tier.THREADED and thresholds.threaded is not None and hotness >= thresholds.threaded:
+            tier = self.method_tiers[index] = Tier.THREADED
+        return tier
+
+    def get_method_code(self, index: ABCMethodBodyIndex) -> avm2.abc.instructions.MethodCode:
+        """
+        Get the decoded method body code. The method body is only decoded on the first call.
+        """
+        try:
+            return self.method_codes[index]
+        except KeyError:
+            code = self.method_codes[index] = avm2.abc.instructions.MethodCode(self.abc_file.method_bodies[index].code)
+            return code
+
+    def get_executable_code(self, index: ABCMethodBodyIndex) -> avm2.abc.instructions.MethodCode:
+        """
+        Get the method body code to execute: the decoded code, optimized if enabled.
+        The analyses are done on the decoded code, see `get_method_code`.
+        """
+        if not self.optimize:
+            return self.get_method_code(index)
+        try:
+            return self.optimized_codes[index]
+        except KeyError:
+            method_body = self.abc_file.method_bodies[index]
+            code = avm2.optimizer.optimize_code(self, self.get_method_code(index), method_body)
+            self.optimized_codes[index] = code
+            return code
+
+    def get_method_analysis(self, index: ABCMethodBodyIndex) -> avm2.verifier.MethodAnalysis:
+        """
+        Get the verified method body analysis. The method body is only verified on the first call.
+        Raise `VerifyError` if the method body is invalid.
+        """
+        try:
+            return self.method_analyses[index]
+        except KeyError:
+            method_body = self.abc_file.method_bodies[index]
+            analysis = avm2.verifier.analyze(self, method_body, self.get_method_code(index))
+            self.method_analyses[index] = analysis
+            return analysis
+
+    def execute_code(self, code: avm2.abc.instructions.MethodCode, environment: MethodEnvironment) -> Any:
+        """
+        Execute the decoded byte-code and get a return value.
+        """
+        if self.instruction_hook is not None:
+            return self.execute_hooked_code(code, environment)
+        instructions = code.instructions
+        index = 0
         while True:
-            try:
-                # FIXME: cache already read instructions.
-                avm2.abc.instructions.read_instruction(reader).execute(self, environment)
-            except ASReturnException as e:
-                return e.return_value
-            except ASJumpException as e:
-                reader.position += e.offset
+            offset = instructions[index].execute(self, environment)
+            if offset is None:
+                index += 1
+            elif offset == avm2.abc.instructions.RETURN:
+                return environment.return_value
+            else:
+                index = code.take_jump(index, offset)
+
+    def execute_hooked_code(self, code: avm2.abc.instructions.MethodCode, environment: MethodEnvironment) -> Any:
+        """
+        Execute the decoded byte-code like `execute_code` does, calling the instruction hook before every instruction.
+        Both loops share the jumps, see `MethodCode.take_jump`.
+        """
+        instructions = code.instructions
+        hook = self.instruction_hook
+        index = 0
+        while True:
+            instruction_ = instructions[index]
+            hook(instruction_)
+            offset = instruction_.execute(self, environment)
+            if offset is None:
+                index += 1
+            elif offset == avm2.abc.instructions.RETURN:
+                return environment.return_value
+            else:
+                index = code.take_jump(index, offset)
+
+    def get_threaded_code(self, index: ABCMethodBodyIndex) -> avm2.threaded.ThreadedCode:
+        """
+        Get the method body compiled into direct-threaded code. The method body is only compiled on the first call.
+        """
+        try:
+            return self.threaded_codes[index]
+        except KeyError:
+            executable_code = self.get_executable_code(index)
+            code = self.threaded_codes[index] = avm2.threaded.ThreadedCode(self, executable_code)
+            if self.instrumentation is not None:
+                code.steps = self.instrumentation.count_steps(code.steps, executable_code.instructions)
+            return code
+
+    def get_compiled_code(self, index: ABCMethodBodyIndex) -> Optional[avm2.compiler.CompiledCode]:
+        """
+        Get the method body compiled into a Python function, or `None` if it can't be compiled.
+        The method body is only compiled on the first call.
+        """
+        try:
+            return self.compiled_codes[index]
+        except KeyError:
+            code = self.compiled_codes[index] = avm2.compiler.compile_code(
+                self,
+                self.get_executable_code(index),
+                self.abc_file.method_bodies[index].local_count,
+            )
+            return code
+
+    def get_register_code(self, index: ABCMethodBodyIndex) -> Optional[avm2.ir.RegisterCode]:
+        """
+        Get the method body translated into register-based code, or `None` if it can't be translated.
+        The method body is only translated on the first call.
+        """
+        try:
+            return self.register_codes[index]
+        except KeyError:
+            pass
+        method_body = self.abc_file.method_bodies[index]
+        code = self.get_executable_code(index)
+        try:
+            if self.optimize:
+                # The cached analysis is done on the decoded code.
+                analysis = avm2.verifier.analyze(self, method_body, code)
+            else:
+                analysis = self.get_method_analysis(index)
+        except VerifyError:
+            register_code = None
+        else:
+            register_code = avm2.ir.translate_code(self, method_body, code, analysis)
+        self.register_codes[index] = register_code
+        return register_code
+
+    def execute_register_code(self, code: avm2.ir.RegisterCode, environment: MethodEnvironment) -> Any:
+        """
+        Execute the register-based code and get a return value.
+        """
+        frame = environment.registers + code.frame_tail
+        steps = code.steps
+        return_index = avm2.ir.RETURN_INDEX
+        index = 0
+        while index != return_index:
+            index = steps[index](frame, environment)
+        return environment.return_value
+
+    def execute_threaded_code(self, code: avm2.threaded.ThreadedCode, environment: MethodEnvironment) -> Any:
+        """
+        Execute the direct-threaded code and get a return value.
+        """
+        steps = code.steps
+        stack = environment.operand_stack
+        registers = environment.registers
+        return_index = avm2.threaded.RETURN_INDEX
+        index = 0
+        while index != return_index:
+            index = steps[index](stack, registers, environment)
+        return environment.return_value
 
     # Unclassified.
     # ------------------------------------------------------------------------------------------------------------------
@@ -236,11 +638,99 @@ class VirtualMachine:
         raise NotImplementedError(kind)
 
 
+@dataclass
+class LinkTables:
+    method_to_body: Dict[ABCMethodIndex, ABCMethodBodyIndex]
+    class_to_script: Dict[ABCClassIndex, ABCScriptIndex]
+
+
+@dataclass
+class ResolvedMultiname:
+    """
+    Multiname with its name and namespaces looked up in the constant pool.
+    """
+
+    __slots__ = ('name', 'namespaces', 'runtime_name', 'runtime_namespace')
+
+    name: Optional[str]  # `None` for a runtime name
+    namespaces: Tuple[str, ...]  # empty for a runtime namespace
+    runtime_name: bool
+    runtime_namespace: bool
+
+    @property
+    def is_runtime(self) -> bool:
+        return self.runtime_name or self.runtime_namespace
+
+    def pop_runtime(self, operand_stack: List[Any], strings: Sequence[str]) -> Tuple[str, Tuple[str, ...]]:
+        """
+        Complete the runtime multiname with the name and namespace from the operand stack.
+        The namespace is popped as an `ASNamespace` and converted to its name, like the constant namespaces.
+        """
+        name = operand_stack.pop() if self.runtime_name else self.name
+        namespaces = (strings[operand_stack.pop().name_index],) if self.runtime_namespace else self.namespaces
+        return name, namespaces
+
+
+class ResolvedMultinames(Dict[ABCMultinameIndex, ResolvedMultiname]):
+    """
+    Multiname table which resolves a multiname when it is indexed for the first time.
+    """
+
+    def __init__(self, machine: VirtualMachine):
+        super().__init__()
+        self.machine = machine
+
+    def __missing__(self, index: ABCMultinameIndex) -> ResolvedMultiname:
+        machine = self.machine
+        multiname = machine.multinames[index]
+        strings = machine.strings
+        name = strings[multiname.name_index] if multiname.name_index is not None else None
+        if multiname.kind in (MultinameKind.Q_NAME, MultinameKind.Q_NAME_A):
+            resolved = ResolvedMultiname(name, self.get_namespaces([multiname.namespace_index]), False, False)
+        elif multiname.kind in (MultinameKind.MULTINAME, MultinameKind.MULTINAME_A):
+            namespaces = self.get_namespaces(machine.constant_pool.ns_sets[multiname.namespace_set_index].namespaces)
+            resolved = ResolvedMultiname(name, namespaces, False, False)
+        elif multiname.kind in (MultinameKind.MULTINAME_L, MultinameKind.MULTINAME_LA):
+            namespaces = self.get_namespaces(machine.constant_pool.ns_sets[multiname.namespace_set_index].namespaces)
+            resolved = ResolvedMultiname(None, namespaces, True, False)
+        elif multiname.kind in (MultinameKind.RTQ_NAME, MultinameKind.RTQ_NAME_A):
+            resolved = ResolvedMultiname(name, (), False, True)
+        elif multiname.kind in (MultinameKind.RTQ_NAME_L, MultinameKind.RTQ_NAME_LA):
+            resolved = ResolvedMultiname(None, (), True, True)
+        else:
+            raise NotImplementedError(multiname)
+        self[index] = resolved
+        return resolved
+
+    def get_namespaces(self, namespace_indices: Iterable[int]) -> Tuple[str, ...]:
+        return tuple(
+            self.machine.strings[self.machine.namespaces[namespace_index].name_index]
+            for namespace_index in namespace_indices
+        )
+
+
+@dataclass
+class InlineCache:
+    """
+    Multiname resolution cache of a single `getlex` or `findpropstrict` instruction.
+    """
+
+    epoch: int = -1  # of the machine, when the multiname was resolved
+    # Properties of the scope stack objects from the resolved one to the top, and their versions when resolved.
+    properties: List[Properties] = field(default_factory=list)
+    versions: List[int] = field(default_factory=list)
+    name: str = ''
+    namespace: str = ''
+    hits: int = 0
+    misses: int = 0
+
+
 @dataclass
 class MethodEnvironment:
     registers: List[Any]  # FIXME: should be ASObject's too.
     scope_stack: List[ASObject]
     operand_stack: List[Any] = field(default_factory=list)  # FIXME: should be ASObject's too.
+    return_value: Any = None  # set by the return instructions
 
 
 def execute_tag(tag: Tag) -> VirtualMachine:
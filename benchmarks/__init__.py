@@ -0,0 +1,31 @@
+"""
+Benchmarks over the bundled SWF corpus in `data/`.
+"""
+
+from pathlib import Path
+
+from avm2.abc.types import ABCFile
+from avm2.io import MemoryViewReader
+from avm2.swf.enums import TagType
+from avm2.swf.parser import parse_swf
+from avm2.swf.types import DoABCTag
+from avm2.vm import VirtualMachine
+
+data_path = Path(__file__).parent.parent / 'data'
+
+
+def read_do_abc_tag(name: str) -> DoABCTag:
+    """
+    Read the first DO_ABC tag of the SWF file from the data directory.
+    """
+    for tag in parse_swf((data_path / name).read_bytes()):
+        if tag.type_ == TagType.DO_ABC:
+            return DoABCTag(tag.raw)
+    raise ValueError(name)
+
+
+def load_machine(name: str = 'heroes.swf') -> VirtualMachine:
+    """
+    Parse the SWF file from the data directory and create a virtual machine.
+    """
+    return VirtualMachine(ABCFile(MemoryViewReader(read_do_abc_tag(name).abc_file)))
@@ -0,0 +1,209 @@
+"""
+Benchmark suite over the bundled SWF corpus: the parsing pipeline stage by stage, and method calls.
+
+Every case is warmed up, then timed over repetitions. Results are printed with their statistics,
+and can be saved as JSON and compared against a saved baseline: a case is a regression when its median time
+grows by more than the threshold. The exit status is 1 if there are regressions.
+
+Usage:
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --baseline baseline.json [--threshold 0.1] [--filter heroes.swf]
+"""
+
+import argparse
+import json
+import platform
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import mean, median, stdev
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from avm2.abc.instructions import MethodCode
+from avm2.abc.types import ABCFile
+from avm2.io import MemoryViewReader
+from avm2.runtime import undefined
+from avm2.swf.enums import Signature
+from avm2.swf.parser import decompress, read_tags
+from avm2.vm import Tier, VirtualMachine
+from benchmarks import data_path, load_machine, read_do_abc_tag
+from benchmarks.call_method import calls
+
+names = ['heroes.swf', 'Farm_d_13_9_2_2198334.swf', 'EpicGame.swf']
+call_number = 1000  # calls per `call_method` run
+call_tiers = [Tier.INTERPRETED, Tier.THREADED, Tier.REGISTER, Tier.COMPILED]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], Any]]  # prepares the inputs and gets the function to time
+    number: int = 1  # operations per run, for throughput
+
+
+# Cases.
+# ----------------------------------------------------------------------------------------------------------------------
+
+def get_cases() -> Iterable[Case]:
+    for name in names:
+        yield Case(f'decompress[{name}]', lambda name=name: make_decompress(name))
+        yield Case(f'scan_tags[{name}]', lambda name=name: make_scan_tags(name))
+        yield Case(f'parse_abc[{name}]', lambda name=name: make_parse_abc(name))
+        yield Case(f'link[{name}]', lambda name=name: make_link(name))
+        yield Case(f'decode[{name}]', lambda name=name: make_decode(name))
+    for tier in call_tiers:
+        for method_name, args in calls:
+            yield Case(
+                f'call_method[{tier.name.lower()}:{method_name}{args}]',
+                lambda tier=tier, method_name=method_name, args=args: make_call_method(tier, method_name, args),
+                call_number,
+            )
+
+
+def make_decompress(name: str) -> Callable[[], Any]:
+    data = (data_path / name).read_bytes()
+
+    def run():
+        reader = MemoryViewReader(data)
+        signature = Signature(reader.read_u8())
+        reader.skip(7)  # magic, version and file length
+        return decompress(reader, signature)
+    return run
+
+
+def make_scan_tags(name: str) -> Callable[[], Any]:
+    reader = MemoryViewReader((data_path / name).read_bytes())
+    signature = Signature(reader.read_u8())
+    reader.skip(7)  # magic, version and file length
+    body = decompress(reader, signature).read_all()
+
+    def run():
+        body_reader = MemoryViewReader(body)
+        body_reader.skip_rect()
+        body_reader.skip(4)  # frame rate and frame count
+        return sum(1 for _ in read_tags(body_reader))
+    return run
+
+
+def make_parse_abc(name: str) -> Callable[[], Any]:
+    abc_file = read_do_abc_tag(name).abc_file
+    return lambda: ABCFile(MemoryViewReader(abc_file))
+
+
+def make_link(name: str) -> Callable[[], Any]:
+    abc_file = ABCFile(MemoryViewReader(read_do_abc_tag(name).abc_file))
+    return lambda: VirtualMachine(abc_file)
+
+
+def make_decode(name: str) -> Callable[[], Any]:
+    abc_file = ABCFile(MemoryViewReader(read_do_abc_tag(name).abc_file))
+
+    def run():
+        for method_body in abc_file.method_bodies:
+            try:
+                MethodCode(method_body.code)
+            except KeyError:
+                pass  # unknown opcode
+    return run
+
+
+def make_call_method(tier: Tier, method_name: str, args: tuple) -> Callable[[], Any]:
+    heroes_machine = load_heroes_machine()
+    machine = VirtualMachine(heroes_machine.abc_file, heroes_machine.link_tables, tier=tier)
+
+    def run():
+        for _ in range(call_number):
+            machine.call_method(method_name, undefined, *args)
+    return run
+
+
+@lru_cache(maxsize=None)
+def load_heroes_machine() -> VirtualMachine:
+    """
+    Parse `heroes.swf` once for all the `call_method` cases.
+    """
+    return load_machine('heroes.swf')
+
+
+# Runner.
+# ----------------------------------------------------------------------------------------------------------------------
+
+def measure(case: Case, warmup: int, repeat: int) -> Dict[str, Any]:
+    """
+    Time the case and get the statistics of the run times in seconds.
+    """
+    run = case.setup()
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeat):
+        start_time = perf_counter()
+        run()
+        times.append(perf_counter() - start_time)
+    return {
+        'number': case.number,
+        'times': times,
+        'min': min(times),
+        'median': median(times),
+        'mean': mean(times),
+        'stdev': stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Optional[Dict[str, Any]], threshold: float) -> str:
+    """
+    Get the change against the baseline result, flagged if it's a regression.
+    """
+    if baseline is None:
+        return 'new'
+    change = result['median'] / baseline['median'] - 1.0
+    return f'{change:+.1%}' + (' REGRESSION' if change > threshold else '')
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per case')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    parser.add_argument('--filter', default='', help='only run cases containing the substring')
+    parser.add_argument('--output', help='save the results as JSON')
+    parser.add_argument('--baseline', help='compare against the saved results')
+    parser.add_argument('--threshold', type=float, default=0.1, help='median slowdown flagged as a regression')
+    args = parser.parse_args(argv)
+
+    baseline_results = {}
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline_results = json.load(file)['results']
+
+    results = {}
+    regressions = []
+    for case in get_cases():
+        if args.filter not in case.name:
+            continue
+        result = results[case.name] = measure(case, args.warmup, args.repeat)
+        line = (
+            f'{case.name}: median {result["median"] * 1000:.2f}ms ± {result["stdev"] * 1000:.2f}ms, '
+            f'min {result["min"] * 1000:.2f}ms'
+        )
+        if case.number != 1:
+            line += f', {case.number / result["median"]:,.0f} ops/s'
+        if args.baseline is not None:
+            comparison = compare(result, baseline_results.get(case.name), args.threshold)
+            line += f', {comparison}'
+            if comparison.endswith('REGRESSION'):
+                regressions.append(case.name)
+        print(line, flush=True)
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump({'python': platform.python_version(), 'results': results}, file, indent=2)
+    if regressions:
+        print(f'{len(regressions)} regressions: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
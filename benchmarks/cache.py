@@ -0,0 +1,32 @@
+"""
+Compare creating a virtual machine by parsing and by loading from the on-disk ABC cache.
+
+Usage: `python -m benchmarks.cache`.
+"""
+
+from tempfile import TemporaryDirectory
+from timeit import repeat
+
+from avm2.abc.types import ABCFile
+from avm2.cache import ABCCache
+from avm2.io import MemoryViewReader
+from avm2.vm import VirtualMachine
+from benchmarks import read_do_abc_tag
+
+names = ['heroes.swf', 'Farm_d_13_9_2_2198334.swf', 'EpicGame.swf']
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        cache = ABCCache(directory)
+        for name in names:
+            abc_file = read_do_abc_tag(name).abc_file
+            cache.get_machine(abc_file)
+            parse = min(repeat(lambda: VirtualMachine(ABCFile(MemoryViewReader(abc_file))), number=1, repeat=3))
+            load = min(repeat(lambda: cache.load(abc_file), number=1, repeat=3))
+            size = cache.get_path(abc_file).stat().st_size
+            print(f'{name}: parse {parse:.3f}s, cached {load:.3f}s, entry size {size / 1024 / 1024:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
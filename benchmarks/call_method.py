@@ -0,0 +1,42 @@
+"""
+Measure `VirtualMachine.call_method` throughput on `heroes.swf`.
+
+Usage: `python -m benchmarks.call_method [number]`.
+"""
+
+import sys
+from timeit import repeat
+
+from avm2.runtime import undefined
+from avm2.vm import Tier, TierThresholds, VirtualMachine
+from benchmarks import load_machine
+
+calls = [
+    ('battle.BattleCore.hitrateIntensity', (4, 8)),
+    ('battle.BattleCore.hitrateIntensity', (-100, 0)),
+    ('battle.BattleCore.getElementalPenetration', (2, 300000)),
+]
+
+
+def main(number: int = 20000):
+    machine = load_machine()
+    abc_file, link_tables = machine.abc_file, machine.link_tables
+    machines = [
+        ('interpreter', machine),
+        ('optimized', VirtualMachine(abc_file, link_tables, optimize=True)),
+        ('threaded', VirtualMachine(abc_file, link_tables, tier=Tier.THREADED)),
+        ('optimized threaded', VirtualMachine(abc_file, link_tables, tier=Tier.THREADED, optimize=True)),
+        ('register', VirtualMachine(abc_file, link_tables, tier=Tier.REGISTER)),
+        ('compiled', VirtualMachine(abc_file, link_tables, tier=Tier.COMPILED)),
+        ('tiered', VirtualMachine(abc_file, link_tables, tier_thresholds=TierThresholds())),
+        ('memoized', VirtualMachine(abc_file, link_tables, memo_size=1024)),
+        ('instrumented', VirtualMachine(abc_file, link_tables, instrument=True)),
+    ]
+    for machine_name, machine in machines:
+        for name, args in calls:
+            best = min(repeat(lambda: machine.call_method(name, undefined, *args), number=number, repeat=5))
+            print(f'{machine_name}: {name}{args}: {number / best:,.0f} calls/s')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,37 @@
+"""
+Compare `VirtualMachine.call_method_batch` with calling `VirtualMachine.call_method` in a loop.
+
+Usage: `python -m benchmarks.call_method_batch [size]`.
+"""
+
+import sys
+from time import perf_counter
+
+import numpy
+
+from avm2.runtime import undefined
+from benchmarks import load_machine
+
+names = ['battle.BattleCore.hitrateIntensity', 'battle.BattleCore.getElementalPenetration']
+loop_size = 20000
+
+
+def main(size: int = 1000000):
+    machine = load_machine()
+    random = numpy.random.default_rng(42)
+    args = random.integers(-1000, 1000, size), random.integers(-1000, 1000, size)
+    for name in names:
+        start_time = perf_counter()
+        machine.call_method_batch(name, *args)
+        batch_time = perf_counter() - start_time
+
+        start_time = perf_counter()
+        for element_args in zip(*(arg[:loop_size].tolist() for arg in args)):
+            machine.call_method(name, undefined, *element_args)
+        loop_time = (perf_counter() - start_time) * size / loop_size
+
+        print(f'{name}: {size} calls, batch {batch_time:.3f}s, loop {loop_time:.3f}s, x{loop_time / batch_time:.0f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,27 @@
+"""
+Profile `VirtualMachine.call_method` on `BattleCore` methods and print the collapsed stacks.
+
+Usage: `python -m benchmarks.flamegraph [seconds] > battle.folded`, then `flamegraph.pl battle.folded > battle.svg`.
+"""
+
+import sys
+from time import perf_counter
+
+from avm2.profiler import Profiler
+from avm2.runtime import undefined
+from benchmarks import load_machine
+from benchmarks.call_method import calls
+
+
+def main(seconds: float = 2.0):
+    machine = load_machine()
+    with Profiler(machine, interval=0.001) as profiler:
+        finish = perf_counter() + seconds
+        while perf_counter() < finish:
+            for name, args in calls:
+                machine.call_method(name, undefined, *args)
+    profiler.write_collapsed_stacks(sys.stdout)
+
+
+if __name__ == '__main__':
+    main(*map(float, sys.argv[1:]))
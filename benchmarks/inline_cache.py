@@ -0,0 +1,107 @@
+"""
+Measure `getlex` on a synthetic method which looks up `Object` on every iteration of a loop:
+
+    var i = 0;
+    while (i < n) { Object; i = i + 1; }
+    return i;
+
+`Object` is resolved in the global object at the bottom of a scope stack with a few objects above it.
+
+Then replay the `getlex` and `findpropstrict` call sites of `heroes.swf` which resolve in this runtime,
+while new objects get their properties set in between like constructors do, and report the inline cache hit rate.
+
+Usage: `python -m benchmarks.inline_cache [iterations] [rounds]`.
+"""
+
+import sys
+from timeit import repeat
+
+from typing import List, Tuple
+
+from avm2.abc.instructions import FindPropStrict, GetLex, Instruction, MethodCode
+from avm2.abc.types import ABCMethodBodyIndex
+from avm2.runtime import ASObject, undefined
+from avm2.vm import MethodEnvironment, VirtualMachine
+from benchmarks import load_machine
+
+object_multiname_index = 65  # in `heroes.swf`
+
+code_bytes = bytes.fromhex(
+    '2400'      # 0: pushbyte 0
+    'D5'        # 2: setlocal1
+    '10080000'  # 3: jump +8 (to 15)
+    '6041'      # 7: getlex Object
+    '29'        # 9: pop
+    'D1'        # 10: getlocal1
+    '2401'      # 11: pushbyte 1
+    'A0'        # 13: add
+    'D5'        # 14: setlocal1
+    'D1'        # 15: getlocal1
+    'D2'        # 16: getlocal2
+    '15F2FFFF'  # 17: iflt -14 (to 7)
+    'D1'        # 21: getlocal1
+    '48'        # 22: returnvalue
+)
+
+
+def main(iterations: int = 100000, rounds: int = 10):
+    machine = load_machine()
+    assert machine.strings[machine.multinames[object_multiname_index].name_index] == 'Object'
+    scope_stack = [machine.global_object, ASObject(), ASObject(), ASObject()]
+    code = MethodCode(memoryview(code_bytes))
+    run = lambda: machine.execute_code(code, MethodEnvironment([undefined, undefined, iterations], scope_stack))
+    assert run() == iterations
+    best = min(repeat(run, number=1, repeat=5))
+    print(f'{iterations} iterations in {best:.3f}s, {iterations / best:,.0f} iterations/s')
+    cache = code.instructions[3].cache
+    print(f'{cache.hits} hits, {cache.misses} misses')
+
+    call_sites = get_call_sites(machine)
+    for _ in range(rounds):
+        for instruction_, scope_stack in call_sites:
+            instruction_.execute(machine, MethodEnvironment([undefined], scope_stack))
+        # A constructor run in between.
+        instance = ASObject()
+        for index in range(3):
+            instance.properties['', f'field{index}'] = undefined
+    hits = sum(instruction_.cache.hits for instruction_, _ in call_sites)
+    misses = sum(instruction_.cache.misses for instruction_, _ in call_sites)
+    print(
+        f'{len(call_sites)} call sites over {rounds} rounds: {hits} hits, {misses} misses, '
+        f'{hits / (hits + misses):.1%} hit rate',
+    )
+
+
+def get_call_sites(machine: VirtualMachine) -> List[Tuple[Instruction, List[ASObject]]]:
+    """
+    Get the resolvable `getlex` and `findpropstrict` instructions of all the method bodies.
+    Every method body gets its own object on top of the global object, like `this` pushed by the method.
+    """
+    call_sites = []
+    for index in range(len(machine.abc_file.method_bodies)):
+        try:
+            code = machine.get_method_code(ABCMethodBodyIndex(index))
+        except KeyError:
+            continue  # unknown opcode
+        scope_stack = [machine.global_object, ASObject()]
+        for instruction_ in code.instructions:
+            if is_resolvable(machine, instruction_, scope_stack):
+                call_sites.append((instruction_, scope_stack))
+    return call_sites
+
+
+def is_resolvable(machine: VirtualMachine, instruction_: Instruction, scope_stack: List[ASObject]) -> bool:
+    if not isinstance(instruction_, (GetLex, FindPropStrict)):
+        return False
+    multiname = machine.resolved_multinames[instruction_.index]
+    if multiname.is_runtime:
+        return False
+    try:
+        machine.resolve_multiname(scope_stack, multiname.name, multiname.namespaces)
+    except KeyError:
+        return False
+    return True
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Report memory taken by parsed ABC files.
+
+Usage: `python -m benchmarks.memory`.
+"""
+
+import gc
+import tracemalloc
+from collections import Counter
+
+from avm2.abc.types import ABCFile
+from avm2.io import MemoryViewReader
+from benchmarks import read_do_abc_tag
+
+names = ['heroes.swf', 'Farm_d_13_9_2_2198334.swf', 'EpicGame.swf']
+
+
+def main():
+    for name in names:
+        abc_file = read_do_abc_tag(name).abc_file
+        gc.collect()
+        tracemalloc.start()
+        parsed_file = ABCFile(MemoryViewReader(abc_file))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        counter = Counter(
+            type(object_).__name__
+            for object_ in gc.get_objects()
+            if type(object_).__module__ == 'avm2.abc.types'
+        )
+        print(f'{name}: {size / 1024 / 1024:.1f} MiB traced, {sum(counter.values()):,} objects')
+        for type_name, count in counter.most_common(5):
+            print(f'  {type_name}: {count:,}')
+        del parsed_file
+
+
+if __name__ == '__main__':
+    main()
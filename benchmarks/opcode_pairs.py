@@ -0,0 +1,38 @@
+"""
+Static histogram of the most frequent pairs of adjacent instructions over the SWF corpus in `data/`.
+Pairs are only counted within basic blocks, that is the second instruction isn't a jump target.
+
+Usage: `python -m benchmarks.opcode_pairs [top]`.
+"""
+
+import sys
+from collections import Counter
+
+from avm2.abc.instructions import MethodCode
+from avm2.abc.types import ABCFile
+from avm2.io import MemoryViewReader
+from avm2.optimizer import find_jump_targets
+from benchmarks import data_path, read_do_abc_tag
+
+
+def main(top: int = 40):
+    pairs = Counter()
+    instruction_count = 0
+    for path in sorted(data_path.glob('*.swf')):
+        abc_file = ABCFile(MemoryViewReader(read_do_abc_tag(path.name).abc_file))
+        for method_body in abc_file.method_bodies:
+            try:
+                code = MethodCode(method_body.code)
+            except KeyError:
+                continue  # unknown opcode
+            instruction_count += len(code.instructions)
+            jump_targets = find_jump_targets(code, method_body)
+            names = [type(instruction_).__name__ for instruction_ in code.instructions]
+            pairs.update(pair for index, pair in enumerate(zip(names, names[1:]), 1) if index not in jump_targets)
+    print(f'{instruction_count} instructions')
+    for (first, second), count in pairs.most_common(top):
+        print(f'{count:8} {count / instruction_count:6.2%}  {first} {second}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
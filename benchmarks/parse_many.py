@@ -0,0 +1,29 @@
+"""
+Measure parsing of the SWF corpus replicated many times with a different number of worker processes.
+
+Usage: `python -m benchmarks.parse_many [copies]`.
+"""
+
+import os
+import sys
+from time import perf_counter
+
+from avm2.parallel import parse_many
+from benchmarks import data_path
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    paths = sorted(data_path.glob('*.swf')) * copies
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start_time = perf_counter()
+        for parsed_tag in parse_many(paths, workers):
+            parsed_tag.get_machine()
+        elapsed = perf_counter() - start_time
+        print(f'{workers} workers: {len(paths)} files in {elapsed:.2f}s, {len(paths) / elapsed:.2f} files/s')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
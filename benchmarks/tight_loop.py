@@ -0,0 +1,76 @@
+"""
+Measure the interpreter loop on a synthetic method which counts up to its argument:
+
+    var i = 0;
+    while (i < n) i = i + 1;
+    return i;
+
+Every iteration takes a branch, so the benchmark mostly measures instruction dispatch and jumps.
+
+Usage: `python -m benchmarks.tight_loop [iterations]`.
+"""
+
+import sys
+from timeit import repeat
+
+from avm2.abc.instructions import MethodCode
+from avm2.abc.types import ASMethodBody
+from avm2.compiler import compile_code
+from avm2.io import MemoryViewReader
+from avm2.ir import translate_code
+from avm2.optimizer import optimize_code
+from avm2.runtime import undefined
+from avm2.threaded import ThreadedCode
+from avm2.verifier import analyze
+from avm2.vm import MethodEnvironment
+from benchmarks import load_machine
+
+method_body = ASMethodBody(MemoryViewReader(bytes.fromhex(
+    '000203000014'  # method 0, max_stack 2, 3 registers, no scopes, 20 bytes of code
+    '2400'      # 0: pushbyte 0
+    'D5'        # 2: setlocal1
+    '10050000'  # 3: jump +5 (to 12)
+    'D1'        # 7: getlocal1
+    '2401'      # 8: pushbyte 1
+    'A0'        # 10: add
+    'D5'        # 11: setlocal1
+    'D1'        # 12: getlocal1
+    'D2'        # 13: getlocal2
+    '15F5FFFF'  # 14: iflt -11 (to 7)
+    'D1'        # 18: getlocal1
+    '48'        # 19: returnvalue
+    '0000'  # no exceptions and traits
+)))
+code = MethodCode(method_body.code)
+
+
+def main(iterations: int = 100000):
+    machine = load_machine()
+    threaded_code = ThreadedCode(machine, code)
+    register_code = translate_code(machine, method_body, code, analyze(machine, method_body, code))
+    compiled_code = compile_code(machine, code, 3)
+    optimized_code = optimize_code(machine, code)
+    optimized_threaded_code = ThreadedCode(machine, optimized_code)
+    runs = [
+        ('interpreter', lambda: machine.execute_code(code, create_environment(iterations))),
+        ('optimized interpreter', lambda: machine.execute_code(optimized_code, create_environment(iterations))),
+        ('threaded', lambda: machine.execute_threaded_code(threaded_code, create_environment(iterations))),
+        (
+            'optimized threaded',
+            lambda: machine.execute_threaded_code(optimized_threaded_code, create_environment(iterations)),
+        ),
+        ('register', lambda: machine.execute_register_code(register_code, create_environment(iterations))),
+        ('compiled', lambda: compiled_code.function(machine, create_environment(iterations))),
+    ]
+    for name, run in runs:
+        assert run() == iterations
+        best = min(repeat(run, number=1, repeat=5))
+        print(f'{name}: {iterations} iterations in {best:.3f}s, {iterations / best:,.0f} iterations/s')
+
+
+def create_environment(n: int) -> MethodEnvironment:
+    return MethodEnvironment([undefined, undefined, n], [])
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
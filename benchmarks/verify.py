@@ -0,0 +1,45 @@
+"""
+Measure the method body verifier throughput over every method body of `heroes.swf`.
+
+Method bodies are decoded beforehand, so only the analysis is measured.
+Method bodies with instructions which can't be decoded are skipped.
+
+Usage: `python -m benchmarks.verify`.
+"""
+
+from collections import Counter
+from time import perf_counter
+
+from avm2.exceptions import VerifyError
+from avm2.verifier import analyze
+from benchmarks import load_machine
+
+
+def main():
+    machine = load_machine()
+    codes = []
+    skipped = 0
+    for index, method_body in enumerate(machine.abc_file.method_bodies):
+        try:
+            codes.append((method_body, machine.get_method_code(index)))
+        except KeyError:
+            skipped += 1  # unknown opcode
+    instruction_count = sum(len(code.instructions) for _, code in codes)
+
+    errors = Counter()
+    start = perf_counter()
+    for method_body, code in codes:
+        try:
+            analyze(machine, method_body, code)
+        except VerifyError as e:
+            errors[str(e).split(' at ')[0]] += 1
+    elapsed = perf_counter() - start
+
+    print(f'{len(codes)} method bodies ({skipped} skipped), {instruction_count} instructions in {elapsed:.3f}s')
+    print(f'{len(codes) / elapsed:,.0f} method bodies/s, {instruction_count / elapsed:,.0f} instructions/s')
+    for error, count in errors.most_common():
+        print(f'{count}: {error}')
+
+
+if __name__ == '__main__':
+    main()
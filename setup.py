@@ -1,18 +1,20 @@
+import re
+
 import setuptools
 
 setuptools.setup(
     name='avm2',
-    version='0.1',
+    version=re.search(r"__version__ = '(.+)'", open('avm2/__init__.py', 'rt').read()).group(1),
     author='Pavel Perestoronin',
     author_email='eigenein@gmail.com',
     description='Adobe Flash SWF file parser and AVM2 virtual machine implementation in pure Python',
     long_description=open('README.md', 'rt').read(),
     long_description_content_type='text/markdown',
     url='https://github.com/eigenein/python-avm2',
-    packages=setuptools.find_packages(exclude=['tests']),
+    packages=setuptools.find_packages(exclude=['tests', 'benchmarks']),
     python_requires='>=3.7',
     install_requires=[],
-    extras_require={},
+    extras_require={'numpy': ['numpy']},
     classifiers=[
         'Development Status :: 1 - Planning',
         'Intended Audience :: Developers',
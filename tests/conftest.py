@@ -54,6 +54,16 @@ def abc_file(do_abc_tag: DoABCTag) -> ABCFile:
     return ABCFile(MemoryViewReader(do_abc_tag.abc_file))
 
 
+@fixture(scope='session')
+def lazy_abc_file(do_abc_tag: DoABCTag) -> ABCFile:
+    return ABCFile(MemoryViewReader(do_abc_tag.abc_file), lazy=True)
+
+
+@fixture(scope='session')
+def columnar_abc_file(do_abc_tag: DoABCTag) -> ABCFile:
+    return ABCFile(MemoryViewReader(do_abc_tag.abc_file), columnar=True)
+
+
 @fixture(scope='session')
 def machine(abc_file: ABCFile) -> VirtualMachine:
     return VirtualMachine(abc_file)
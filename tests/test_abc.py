@@ -1,7 +1,10 @@
 from typing import Iterable, List
 
-from avm2.abc.instructions import Instruction, read_instruction
-from avm2.abc.types import ABCFile, ASMethodBody
+from avm2.abc.instructions import Instruction, Jump, MethodCode, read_instruction
+from avm2.abc.enums import MethodFlags
+from avm2.abc.parser import LazyArray
+from avm2.abc.tables import MethodBodyTable, MethodTable
+from avm2.abc.types import ABCFile, ASMethodBody, StringPool
 from avm2.io import MemoryViewReader
 
 
@@ -34,3 +37,76 @@ def read_method_body(method_body: ASMethodBody) -> List[Instruction]:
 def read_instructions(reader: MemoryViewReader) -> Iterable[Instruction]:
     while not reader.is_eof():
         yield read_instruction(reader)
+
+
+def test_method_code(abc_file: ABCFile):
+    method_body = abc_file.method_bodies[0]
+    code = MethodCode(method_body.code)
+    assert code.instructions == read_method_body(method_body)
+    assert code.offsets[0] == 0
+    assert code.offset_to_index[len(method_body.code)] == len(code.instructions)
+    for index, offset in enumerate(code.offsets):
+        assert code.offset_to_index[offset] == index
+
+
+def test_method_code_jump():
+    # jump +1; nop; returnvoid
+    code = MethodCode(memoryview(bytes.fromhex('10010000') + b'\x02\x47'))
+    assert isinstance(code.instructions[0], Jump)
+    assert code.jump(0, 1) == 2
+
+
+def test_lazy_abc_file(abc_file: ABCFile, lazy_abc_file: ABCFile):
+    assert isinstance(lazy_abc_file.method_bodies, LazyArray)
+    assert len(lazy_abc_file.instances) == len(abc_file.instances)
+    assert len(lazy_abc_file.classes) == len(abc_file.classes)
+    assert len(lazy_abc_file.scripts) == len(abc_file.scripts)
+    assert len(lazy_abc_file.method_bodies) == len(abc_file.method_bodies)
+    assert lazy_abc_file.method_bodies[42] == abc_file.method_bodies[42]
+    assert lazy_abc_file.method_bodies[-1] == abc_file.method_bodies[-1]
+    assert lazy_abc_file.instances[2241] == abc_file.instances[2241]
+    assert lazy_abc_file.classes[2241] == abc_file.classes[2241]
+    assert lazy_abc_file.scripts[-1] == abc_file.scripts[-1]
+
+
+def test_lazy_abc_file_indices(abc_file: ABCFile, lazy_abc_file: ABCFile):
+    assert list(lazy_abc_file.get_method_body_method_indices()) == list(abc_file.get_method_body_method_indices())
+    assert list(lazy_abc_file.get_instance_name_indices()) == list(abc_file.get_instance_name_indices())
+    assert lazy_abc_file.method_bodies.count_materialized() <= 2
+
+
+def test_string_pool():
+    # Two strings, one of them is empty.
+    strings = StringPool(MemoryViewReader(b'\x03\x03abc\x00'))
+    assert len(strings) == 3
+    assert strings.strings == [None, None, None]
+    assert strings[1] == 'abc'
+    assert strings[1] is strings[1]
+    assert strings.strings == [None, 'abc', None]
+    strings.intern_all()
+    assert strings.strings == [None, 'abc', '']
+    assert strings == [None, 'abc', '']
+
+
+def test_qualified_name(abc_file: ABCFile):
+    name_index = abc_file.instances[2241].name_index
+    assert abc_file.constant_pool.get_qualified_name(name_index) == 'battle.BattleCore'
+    assert abc_file.constant_pool.qualified_names[name_index] == 'battle.BattleCore'
+
+
+def test_columnar_abc_file(abc_file: ABCFile, columnar_abc_file: ABCFile):
+    methods = columnar_abc_file.methods
+    assert isinstance(methods, MethodTable)
+    assert len(methods) == len(abc_file.methods)
+    assert list(methods.param_counts) == [method.param_count for method in abc_file.methods]
+    assert list(methods.name_indices) == [method.name_index for method in abc_file.methods]
+    assert methods[24360] == abc_file.methods[24360]
+    assert methods.get_indices_with_flags(MethodFlags.NEED_REST) == [
+        index for index, method in enumerate(abc_file.methods) if MethodFlags.NEED_REST in method.flags
+    ]
+
+    method_bodies = columnar_abc_file.method_bodies
+    assert isinstance(method_bodies, MethodBodyTable)
+    assert list(method_bodies.local_counts) == [method_body.local_count for method_body in abc_file.method_bodies]
+    assert method_bodies.get_code(42) == abc_file.method_bodies[42].code
+    assert method_bodies[42] == abc_file.method_bodies[42]
@@ -0,0 +1,56 @@
+import os
+from pathlib import Path
+
+from pytest import raises
+
+from avm2.cache import MAGIC, ABCCache
+from avm2.runtime import undefined
+from avm2.swf.types import DoABCTag
+from avm2.vm import VirtualMachine
+
+
+def test_cache(do_abc_tag: DoABCTag, machine: VirtualMachine, tmp_path: Path):
+    cache = ABCCache(tmp_path)
+    assert cache.load(do_abc_tag.abc_file) is None
+    cache.store(do_abc_tag.abc_file, machine)
+    cached_machine = cache.load(do_abc_tag.abc_file)
+    assert cached_machine.name_to_method == machine.name_to_method
+    assert cached_machine.method_to_body == machine.method_to_body
+    assert cached_machine.abc_file.method_bodies[42] == machine.abc_file.method_bodies[42]
+    assert cached_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+
+
+def test_cache_version(do_abc_tag: DoABCTag, tmp_path: Path):
+    cache = ABCCache(tmp_path)
+    path = cache.get_path(do_abc_tag.abc_file)
+    path.write_bytes(MAGIC + b'0:0.0\n' + b'whatever')
+    assert cache.load(do_abc_tag.abc_file) is None
+    assert not path.exists()
+
+
+def test_cache_corrupt(do_abc_tag: DoABCTag, machine: VirtualMachine, tmp_path: Path):
+    cache = ABCCache(tmp_path)
+    cache.store(do_abc_tag.abc_file, machine)
+    path = cache.get_path(do_abc_tag.abc_file)
+    path.write_bytes(path.read_bytes()[:1000])
+    assert cache.load(do_abc_tag.abc_file) is None
+    assert not path.exists()
+
+
+def test_cache_store_failure(do_abc_tag: DoABCTag, machine: VirtualMachine, tmp_path: Path):
+    cache = ABCCache(tmp_path)
+    broken_machine = VirtualMachine(machine.abc_file, machine.link_tables)
+    broken_machine.abc_file = (_ for _ in ())  # can't be pickled
+    with raises(TypeError):
+        cache.store(do_abc_tag.abc_file, broken_machine)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_evict(tmp_path: Path):
+    cache = ABCCache(tmp_path, max_size=10)
+    for i in range(4):
+        path = tmp_path / f'{i}.abc'
+        path.write_bytes(b'x' * 4)
+        os.utime(path, (i, i))
+    cache.evict()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['2.abc', '3.abc']
@@ -0,0 +1,35 @@
+from pytest import raises
+
+from avm2.index import NameIndex
+from avm2.vm import VirtualMachine
+
+
+def test_lookup(machine: VirtualMachine):
+    index = NameIndex(machine.abc_file)
+    method_index = index.lookup_method('battle.BattleCore.hitrateIntensity')
+    assert method_index == machine.lookup_method('battle.BattleCore.hitrateIntensity')
+    assert index.get_method_name(method_index) == 'battle.BattleCore.hitrateIntensity'
+    assert index.lookup_class('battle.BattleCore') == machine.lookup_class('battle.BattleCore')
+    assert sorted(index.package_classes) == ['', 'battle']  # `battle` is tried as a top level class first
+    with raises(KeyError):
+        index.lookup_method('battle.BattleCore.missing')
+    with raises(KeyError):
+        index.lookup_class('missing.BattleCore')
+
+
+def test_iter_methods(machine: VirtualMachine):
+    index = NameIndex(machine.abc_file)
+    names = dict(index.iter_methods('battle.BattleCore.*'))
+    assert 'battle.BattleCore.hitrateIntensity' in names
+    assert all(name.startswith('battle.BattleCore.') for name in names)
+    assert 'battle.BattleCore' in dict(index.iter_classes('battle.*'))
+    assert len(index.package_classes) < len(index.get_packages())
+
+
+def test_mappings(machine: VirtualMachine):
+    index = NameIndex(machine.abc_file)
+    assert len(index.methods) == 1074
+    name = 'battle.BattleCore.hitrateIntensity'
+    assert index.methods[name] == machine.name_to_method[name]
+    assert 'battle.BattleCore' in index.classes
+    assert 'battle.Missing' not in index.classes
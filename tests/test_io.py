@@ -1,6 +1,6 @@
 import pytest
 
-from avm2.io import MemoryViewReader
+from avm2.io import ChunkedReader, MemoryViewReader
 
 
 def test_memory_view_reader_read():
@@ -59,6 +59,7 @@ def test_memory_view_reader_read_string():
     (b'\xFF\xFF\xFF\x7F', True, 0xFFFFFFF),
     (b'\xFF\xFF\xFF\xFF\x0F', True, 0xFFFFFFFF),
     (b'\xFF\xFF\xFF\xFF\x7F', False, -1),
+    (b'\xFF\xFF\xFF\xFF\x0F', False, -1),
     (b'\x7F', False, -1),
     (b'\x0F', False, 15),
 ])
@@ -66,6 +67,15 @@ def test_memory_view_reader_read_int(bytes_: bytes, unsigned: bool, value: int):
     assert MemoryViewReader(bytes_).read_int(unsigned) == value
 
 
+@pytest.mark.parametrize('bytes_, position', [
+    (b'\x7F\x01', 1),
+    (b'\xFF\x7F\x01', 2),
+    (b'\xFF\xFF\xFF\xFF\x0F\x01', 5),
+])
+def test_memory_view_reader_skip_int(bytes_: bytes, position: int):
+    assert MemoryViewReader(bytes_).skip_int() == position
+
+
 def test_is_eof():
     reader = MemoryViewReader(b'ABCDE')
     assert not reader.is_eof()
@@ -75,3 +85,34 @@ def test_is_eof():
     assert reader.is_eof()
     reader.skip(42)
     assert reader.is_eof()
+
+
+@pytest.mark.parametrize('n_groups', [1, 20])  # small arrays are read without NumPy
+@pytest.mark.parametrize('unsigned', [True, False])
+def test_memory_view_reader_read_ints(n_groups: int, unsigned: bool):
+    # Eight integers of different lengths per group, the last one is above 2 ** 32 and gets truncated.
+    bytes_ = (
+        b'\x7F\x0F\xFF\x7F\xFF\xFF\x7F\xFF\xFF\xFF\x7F\xFF\xFF\xFF\xFF\x0F\x00\xFF\xFF\xFF\xFF\x1F' * n_groups
+        + b'\x2A'
+    )
+    reader = MemoryViewReader(bytes_)
+    expected = [reader.read_int(unsigned) for _ in range(8 * n_groups)]
+    assert expected[7] == (0xFFFFFFFF if unsigned else -1)
+    reader = MemoryViewReader(bytes_)
+    assert list(reader.read_ints(8 * n_groups, unsigned)) == expected
+    assert reader.read_u8() == 0x2A
+
+
+def test_memory_view_reader_read_d64s():
+    assert list(MemoryViewReader(b'\x00' * 6 + b'\xF0\x3F' + b'\x00' * 8).read_d64s(2)) == [1.0, 0.0]
+
+
+def test_chunked_reader():
+    reader = ChunkedReader([b'\x0A', b'WS\x0D\x0C', b'\x0B\x0A', b'abc'])
+    assert reader.read_u8() == 0x0A
+    assert reader.read_u16() == 0x5357
+    assert reader.read_u32() == 0x0A0B0C0D
+    assert not reader.is_eof()
+    assert reader.read(2) == b'ab'
+    reader.skip(1)
+    assert reader.is_eof()
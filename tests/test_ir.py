@@ -0,0 +1,62 @@
+from avm2.abc.instructions import MethodCode
+from avm2.abc.types import ASMethodBody
+from avm2.io import MemoryViewReader
+from avm2.ir import RegisterCode, translate_code
+from avm2.runtime import undefined
+from avm2.verifier import analyze
+from avm2.vm import MethodEnvironment, Tier, VirtualMachine
+
+
+def translate(machine: VirtualMachine, max_stack: int, local_count: int, code: str) -> RegisterCode:
+    code_bytes = bytes.fromhex(code)
+    header = bytes([0, max_stack, local_count, 0, 0, len(code_bytes)])
+    method_body = ASMethodBody(MemoryViewReader(header + code_bytes + bytes([0, 0])))
+    method_code = MethodCode(method_body.code)
+    return translate_code(machine, method_body, method_code, analyze(machine, method_body, method_code))
+
+
+def test_translate_loop(machine: VirtualMachine):
+    code = translate(machine, 2, 3, (
+        '2400'      # 0: pushbyte 0
+        'D5'        # 2: setlocal1
+        '10050000'  # 3: jump +5 (to 12)
+        'D1'        # 7: getlocal1
+        '2401'      # 8: pushbyte 1
+        'A0'        # 10: add
+        'D5'        # 11: setlocal1
+        'D1'        # 12: getlocal1
+        'D2'        # 13: getlocal2
+        '15F5FFFF'  # 14: iflt -11 (to 7)
+        'D1'        # 18: getlocal1
+        '48'        # 19: returnvalue
+    ))
+    assert str(code) == '\n'.join([
+        '0: r1 = 0',
+        '1: goto 3',
+        '2: r1 = r1 + 1',
+        '3: if r1 < r2 goto 2',
+        '4: return r1',
+    ])
+    assert machine.execute_register_code(code, MethodEnvironment([undefined, undefined, 10], [])) == 10
+
+
+def test_translate_overwritten_register(machine: VirtualMachine):
+    # getlocal1, pushbyte 5, setlocal1, returnvalue
+    code = translate(machine, 2, 2, 'D12405D548')
+    assert str(code) == '0: s0 = r1\n1: r1 = 5\n2: return s0'
+    assert machine.execute_register_code(code, MethodEnvironment([undefined, 3], [])) == 3
+
+
+def test_translate_unsupported(machine: VirtualMachine):
+    # pushnull, returnvalue
+    assert translate(machine, 1, 1, '2048') is None
+
+
+def test_register_machine(machine: VirtualMachine):
+    register_machine = VirtualMachine(machine.abc_file, machine.link_tables, tier=Tier.REGISTER)
+    for args in ((4, 8), (-100, 0), (1, 0)):
+        assert register_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args) == \
+            machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args)
+    index = machine.method_to_body[machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    assert register_machine.register_codes[index] is not None
+    assert register_machine.method_tiers.get(index, Tier.REGISTER) == Tier.REGISTER
@@ -0,0 +1,71 @@
+from avm2.abc.instructions import (
+    GetLocal1,
+    GetLocalPair,
+    IfTrue,
+    MethodCode,
+    PushConstant,
+    PushThisScope,
+    ReturnValue,
+)
+from avm2.optimizer import optimize_code
+from avm2.runtime import undefined
+from avm2.vm import MethodEnvironment, Tier, VirtualMachine
+
+
+def test_fold_constants(machine: VirtualMachine):
+    # pushbyte 2, pushbyte 3, add, pushbyte 4, add, returnvalue
+    code = optimize_code(machine, MethodCode(memoryview(bytes.fromhex('24022403A02404A048'))))
+    assert code.instructions[0] == PushConstant(9)
+    assert [type(instruction_) for instruction_ in code.instructions] == [PushConstant, ReturnValue]
+    assert machine.execute_code(code, MethodEnvironment([undefined], [])) == 9
+
+
+def test_remove_label(machine: VirtualMachine):
+    code_bytes = bytes.fromhex(
+        '2400'      # 0: pushbyte 0
+        'D5'        # 2: setlocal1
+        '10060000'  # 3: jump +6 (to 13)
+        '09'        # 7: label
+        'D1'        # 8: getlocal1
+        '2401'      # 9: pushbyte 1
+        'A0'        # 11: add
+        'D5'        # 12: setlocal1
+        'D1'        # 13: getlocal1
+        'D2'        # 14: getlocal2
+        '15F4FFFF'  # 15: iflt -12 (to 7)
+        'D1'        # 19: getlocal1
+        '48'        # 20: returnvalue
+    )
+    code = optimize_code(machine, MethodCode(memoryview(code_bytes)))
+    assert len(code.instructions) == 11
+    assert type(code.instructions[3]) is GetLocal1
+    assert code.instructions[7] == GetLocalPair(1, 2)
+    assert code.jump(8, code.instructions[8].offset) == 3
+    assert machine.execute_code(code, MethodEnvironment([undefined, undefined, 10], [])) == 10
+
+
+def test_fuse_branch(machine: VirtualMachine):
+    # getlocal1, not, iffalse +3, pushbyte 1, returnvalue, pushbyte 2, returnvalue
+    code = optimize_code(machine, MethodCode(memoryview(bytes.fromhex('D19612030000240148240248'))))
+    assert type(code.instructions[1]) is IfTrue
+    assert machine.execute_code(code, MethodEnvironment([undefined, True], [])) == 2
+    assert machine.execute_code(code, MethodEnvironment([undefined, False], [])) == 1
+
+
+def test_optimize_optimized(machine: VirtualMachine):
+    # getlocal0, pushscope, pushbyte 1, pushbyte 2, add, returnvalue
+    code = optimize_code(machine, MethodCode(memoryview(bytes.fromhex('D03024012402A048'))))
+    assert [type(instruction_) for instruction_ in code.instructions] == [PushThisScope, PushConstant, ReturnValue]
+    code = optimize_code(machine, code)
+    assert [type(instruction_) for instruction_ in code.instructions] == [PushThisScope, PushConstant, ReturnValue]
+
+
+def test_optimized_machine(machine: VirtualMachine):
+    for tier in Tier:
+        optimized_machine = VirtualMachine(machine.abc_file, machine.link_tables, tier=tier, optimize=True)
+        for args in ((4, 8), (-100, 0), (1, 0)):
+            assert optimized_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args) == \
+                machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args)
+        index = machine.method_to_body[machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+        code = optimized_machine.optimized_codes[index]
+        assert any(isinstance(instruction_, GetLocalPair) for instruction_ in code.instructions)
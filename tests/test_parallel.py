@@ -0,0 +1,14 @@
+from avm2.parallel import parse_many
+from avm2.runtime import undefined
+from avm2.vm import VirtualMachine
+from tests.conftest import base_path
+
+
+def test_parse_many(machine: VirtualMachine):
+    paths = [base_path / 'heroes.swf', base_path / 'EpicGame.swf']
+    parsed_tags = sorted(parse_many(paths, workers=2), key=lambda parsed_tag: parsed_tag.path)
+    assert [parsed_tag.path for parsed_tag in parsed_tags] == sorted(map(str, paths))
+    parsed_machine = parsed_tags[1].get_machine()
+    assert parsed_machine.name_to_method == machine.name_to_method
+    assert parsed_machine.abc_file.method_bodies[42] == machine.abc_file.method_bodies[42]
+    assert parsed_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
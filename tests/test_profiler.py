@@ -0,0 +1,37 @@
+from avm2.profiler import Profiler
+from avm2.runtime import undefined
+from avm2.vm import VirtualMachine
+
+
+def test_sample_instructions(machine: VirtualMachine):
+    profiled_machine = VirtualMachine(machine.abc_file, machine.link_tables)
+    with Profiler(profiled_machine, interval=None, instructions=7) as profiler:
+        for _ in range(10):
+            profiled_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8)  # 20 instructions
+    assert profiler.get_collapsed_stacks() == 'battle.BattleCore.hitrateIntensity 28\n'
+    assert 'invoke_method' not in profiled_machine.__dict__
+    assert profiled_machine.instruction_hook is None
+
+
+def test_instrumented_machine(machine: VirtualMachine):
+    instrumented_machine = VirtualMachine(machine.abc_file, machine.link_tables, instrument=True)
+    instrumented_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8)  # 20 instructions
+    with Profiler(instrumented_machine, interval=None, instructions=5) as profiler:
+        instrumented_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8)
+    instrumented_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8)
+    assert profiler.get_collapsed_stacks() == 'battle.BattleCore.hitrateIntensity 4\n'
+    snapshot = instrumented_machine.get_instrumentation_snapshot()
+    assert sum(snapshot['instructions'].values()) == 60
+    assert snapshot['methods']['battle.BattleCore.hitrateIntensity']['calls'] == 3
+
+
+def test_nested_stacks(machine: VirtualMachine):
+    profiler = Profiler(machine, interval=None)
+    inner = profiler.wrap_invoke_method(lambda index, this: profiler.sample())
+    outer = profiler.wrap_invoke_method(
+        lambda index, this: inner(machine.lookup_method('battle.BattleCore.getElementalPenetration'), this),
+    )
+    outer(machine.lookup_method('battle.BattleCore.hitrateIntensity'), undefined)
+    outer(machine.lookup_method('battle.BattleCore.hitrateIntensity'), undefined)
+    assert profiler.get_collapsed_stacks() == \
+        'battle.BattleCore.hitrateIntensity;battle.BattleCore.getElementalPenetration 2\n'
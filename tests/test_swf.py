@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from avm2.swf.parser import parse_swf
+import mmap
+from pathlib import Path
+
+import pytest
+
+import tests
+from avm2.swf.enums import TagType
+from avm2.swf.parser import open_swf, parse_swf, stream_swf
 from avm2.swf.types import DoABCTag, DoABCTagFlags
 
 
@@ -24,3 +31,30 @@ def test_do_abc_tag_2(do_abc_tag: DoABCTag):
     assert do_abc_tag.flags == DoABCTagFlags.LAZY_INITIALIZE
     assert do_abc_tag.name == 'merged'
     assert do_abc_tag.abc_file
+
+
+@pytest.mark.parametrize('swf', ['swf_1', 'swf_2', 'swf_3'])
+def test_stream_swf(swf: str, request):
+    input_ = request.getfixturevalue(swf)
+    expected = [(tag.type_, tag.raw.tobytes()) for tag in parse_swf(input_)]
+    assert [(tag.type_, tag.raw.tobytes()) for tag in stream_swf(input_, chunk_size=4096)] == expected
+
+
+def test_stream_swf_stop_after(swf_3: memoryview):
+    tags = list(stream_swf(swf_3, stop_after=TagType.DO_ABC))
+    assert tags[-1].type_ == TagType.DO_ABC
+    assert len(tags) < 1995
+
+
+def test_open_swf(swf_1: bytes, tmp_path: Path):
+    path = tmp_path / 'test.swf'
+    path.write_bytes(swf_1)
+    tags = list(open_swf(path))
+    assert [tag.raw.tobytes() for tag in tags] == [tag.raw.tobytes() for tag in parse_swf(swf_1)]
+    # Uncompressed tags are not copied.
+    assert all(isinstance(tag.raw.obj, mmap.mmap) for tag in tags)
+
+
+def test_open_swf_do_abc_tag(do_abc_tag: DoABCTag):
+    *_, tag = open_swf(Path(tests.__file__).parent.parent / 'data' / 'heroes.swf', stop_after=TagType.DO_ABC)
+    assert DoABCTag(tag.raw).abc_file == do_abc_tag.abc_file
@@ -0,0 +1,55 @@
+from pytest import mark, raises
+
+from avm2.abc.instructions import MethodCode
+from avm2.abc.types import ASMethodBody
+from avm2.exceptions import VerifyError
+from avm2.io import MemoryViewReader
+from avm2.runtime import undefined
+from avm2.verifier import analyze
+from avm2.vm import VirtualMachine
+
+
+def make_method_body(max_stack: int, local_count: int, max_scope_depth: int, code: str) -> ASMethodBody:
+    code_bytes = bytes.fromhex(code)
+    header = bytes([0, max_stack, local_count, 0, max_scope_depth, len(code_bytes)])
+    return ASMethodBody(MemoryViewReader(header + code_bytes + bytes([0, 0])))
+
+
+def test_analyze(machine: VirtualMachine):
+    index = machine.method_to_body[machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    analysis = machine.get_method_analysis(index)
+    assert analysis.blocks == [0, 4, 8, 9, 12, 15, 24]
+    assert analysis.stack_depths[:5] == [0, 1, 2, 3, 1]
+    assert analysis.stack_depths[11] is None  # unreachable
+    assert analysis.max_stack == machine.abc_file.method_bodies[index].max_stack
+    assert machine.get_method_analysis(index) is analysis
+
+
+def test_verified_machine(machine: VirtualMachine):
+    verified_machine = VirtualMachine(machine.abc_file, machine.link_tables, verify=True)
+    assert verified_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+    assert len(verified_machine.method_analyses) == 1
+
+
+def test_analyze_valid(machine: VirtualMachine):
+    # getlocal0, pushscope, pushtrue, iffalse +1, nop, pushbyte 1, returnvalue
+    method_body = make_method_body(1, 1, 1, 'D030261201000002240148')
+    analysis = analyze(machine, method_body, MethodCode(method_body.code))
+    assert analysis.blocks == [0, 4, 5]
+    assert analysis.stack_depths == [0, 1, 0, 1, 0, 0, 1]
+    assert analysis.scope_depths == [0, 0, 1, 1, 1, 1, 1]
+
+
+@mark.parametrize('max_stack, local_count, max_scope_depth, code', [
+    (1, 1, 0, '48'),  # returnvalue
+    (1, 1, 0, '2401242048'),  # pushbyte 1, pushbyte 32, returnvalue
+    (1, 1, 0, 'D148'),  # getlocal1, returnvalue
+    (1, 1, 0, 'D03047'),  # getlocal0, pushscope, returnvoid
+    (1, 1, 1, '1D47'),  # popscope, returnvoid
+    (1, 1, 0, '2401'),  # pushbyte 1
+    (2, 1, 0, '240126120100002948'),  # pushbyte 1, pushtrue, iffalse +1, pop, returnvalue
+])
+def test_analyze_invalid(machine: VirtualMachine, max_stack: int, local_count: int, max_scope_depth: int, code: str):
+    method_body = make_method_body(max_stack, local_count, max_scope_depth, code)
+    with raises(VerifyError):
+        analyze(machine, method_body, MethodCode(method_body.code))
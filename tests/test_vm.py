@@ -1,6 +1,21 @@
-from avm2.runtime import undefined
+from avm2.abc.instructions import MethodCode
+from avm2.abc.types import ABCFile
+from avm2.batch import can_execute_batch
+from avm2.compiler import compile_code
+from avm2.instrumentation import Instrumentation
+from avm2.purity import is_pure_code
+from avm2.runtime import ASObject, undefined
+from avm2.threaded import ThreadedCode
 from avm2.swf.types import DoABCTag, Tag
-from avm2.vm import VirtualMachine, execute_do_abc_tag, execute_tag
+from avm2.vm import (
+    MethodEnvironment,
+    ResolvedMultiname,
+    Tier,
+    TierThresholds,
+    VirtualMachine,
+    execute_do_abc_tag,
+    execute_tag,
+)
 
 
 def test_execute_tag(raw_do_abc_tag: Tag):
@@ -36,3 +51,204 @@ def test_call_hitrate_intensity(machine: VirtualMachine):
 
 def test_new_battle_enemy_reward(machine: VirtualMachine):
     machine.new_instance('game.battle.controller.BattleEnemyReward')
+
+
+def test_method_code_cache(machine: VirtualMachine):
+    index = machine.method_to_body[machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    assert machine.get_method_code(index) is machine.get_method_code(index)
+
+
+def test_columnar_machine(columnar_abc_file: ABCFile):
+    machine = VirtualMachine(columnar_abc_file)
+    assert machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+
+
+def test_execute_loop(machine: VirtualMachine):
+    # var i = 0; while (i < n) i = i + 1; return i;
+    code = MethodCode(memoryview(bytes.fromhex('2400D510050000D12401A0D5D1D215F5FFFFD148')))
+    assert machine.execute_code(code, MethodEnvironment([undefined, undefined, 10], [])) == 10
+    assert machine.execute_code(code, MethodEnvironment([undefined, undefined, -1], [])) == 0
+    assert code.back_edge_count == 10
+    threaded_code = ThreadedCode(machine, code)
+    assert machine.execute_threaded_code(threaded_code, MethodEnvironment([undefined, undefined, 10], [])) == 10
+    compiled_code = compile_code(machine, code, 3)
+    assert compiled_code.function(machine, MethodEnvironment([undefined, undefined, 10], [])) == 10
+
+
+def test_threaded_machine(machine: VirtualMachine):
+    threaded_machine = VirtualMachine(machine.abc_file, machine.link_tables, tier=Tier.THREADED)
+    assert threaded_machine.call_method('battle.BattleCore.getElementalPenetration', undefined, 2, 300000) == 1
+    assert threaded_machine.call_method('battle.BattleCore.getElementalPenetration', undefined, 42, -100500) == 42
+    assert threaded_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, -100, 0) == 1
+    assert threaded_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 0, 100) == 0
+    assert threaded_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+
+
+def test_compiled_machine(machine: VirtualMachine):
+    compiled_machine = VirtualMachine(machine.abc_file, machine.link_tables, tier=Tier.COMPILED)
+    assert compiled_machine.call_method('battle.BattleCore.getElementalPenetration', undefined, 2, 300000) == 1
+    assert compiled_machine.call_method('battle.BattleCore.getElementalPenetration', undefined, 42, -100500) == 42
+    assert compiled_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, -100, 0) == 1
+    assert compiled_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 0, 100) == 0
+    assert compiled_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+    assert compiled_machine.get_compiled_code(
+        compiled_machine.method_to_body[compiled_machine.lookup_method('battle.BattleCore.hitrateIntensity')],
+    ) is not None
+
+
+def test_compile_unsupported(machine: VirtualMachine):
+    # getlex, returnvalue
+    code = MethodCode(memoryview(bytes.fromhex('600148')))
+    assert compile_code(machine, code, 1) is None
+
+
+def test_tiered_machine(machine: VirtualMachine):
+    tiered_machine = VirtualMachine(
+        machine.abc_file,
+        machine.link_tables,
+        tier_thresholds=TierThresholds(threaded=2, compiled=3),
+    )
+    index = tiered_machine.method_to_body[tiered_machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    expected_tiers = [Tier.INTERPRETED, Tier.THREADED, Tier.COMPILED, Tier.COMPILED]
+    for expected_tier in expected_tiers:
+        assert tiered_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+        assert tiered_machine.method_tiers.get(index, Tier.INTERPRETED) == expected_tier
+    assert tiered_machine.call_counts[index] == 3
+
+
+def test_tiered_machine_compile_failure(machine: VirtualMachine):
+    tiered_machine = VirtualMachine(
+        machine.abc_file,
+        machine.link_tables,
+        tier_thresholds=TierThresholds(threaded=1, register=None, compiled=3),
+    )
+    index = tiered_machine.method_to_body[tiered_machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    tiered_machine.compiled_codes[index] = None  # pretend it can't be compiled
+    for _ in range(10):
+        assert tiered_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8) == 0.5
+    assert tiered_machine.method_tiers[index] == Tier.REGISTER
+    assert tiered_machine.call_counts[index] == 3
+
+
+def test_tiered_machine_translate_failure(machine: VirtualMachine):
+    tiered_machine = VirtualMachine(
+        machine.abc_file,
+        machine.link_tables,
+        tier_thresholds=TierThresholds(threaded=1, register=2, compiled=5),
+    )
+    index = tiered_machine.method_to_body[tiered_machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    # getlex Object, returnvalue: can be neither translated nor compiled.
+    tiered_machine.method_codes[index] = MethodCode(memoryview(bytes.fromhex('604148')))
+    for _ in range(10):
+        tiered_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, 4, 8)
+        assert tiered_machine.method_tiers[index] == Tier.THREADED
+    assert tiered_machine.register_codes[index] is None
+    assert tiered_machine.compiled_codes[index] is None
+    assert tiered_machine.get_tier(index) == Tier.THREADED
+    assert tiered_machine.call_counts[index] == 5
+
+
+def test_inline_cache(machine: VirtualMachine):
+    # findpropstrict Object, returnvalue
+    code = MethodCode(memoryview(bytes.fromhex('5D4148')))
+    scope_stack = [machine.global_object, ASObject()]
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is machine.global_object
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is machine.global_object
+    cache = code.instructions[0].cache
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Another object on top of the scope stack.
+    assert machine.execute_code(code, MethodEnvironment([undefined], [machine.global_object])) is machine.global_object
+    assert (cache.hits, cache.misses) == (1, 2)
+    machine.invalidate_inline_caches()
+    assert machine.execute_code(code, MethodEnvironment([undefined], [machine.global_object])) is machine.global_object
+    assert (cache.hits, cache.misses) == (1, 3)
+    # A shadowing property added to the object on top of the scope stack after a hit.
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is machine.global_object
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is machine.global_object
+    assert (cache.hits, cache.misses) == (2, 4)
+    scope_stack[-1].properties['', 'Object'] = ASObject()
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is scope_stack[-1]
+    assert (cache.hits, cache.misses) == (2, 5)
+    # Removed again.
+    del scope_stack[-1].properties['', 'Object']
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is machine.global_object
+    assert (cache.hits, cache.misses) == (2, 6)
+    # A property added to an object outside of the scope stack.
+    ASObject().properties['', 'Object'] = ASObject()
+    assert machine.execute_code(code, MethodEnvironment([undefined], scope_stack)) is machine.global_object
+    assert (cache.hits, cache.misses) == (3, 6)
+
+
+def test_resolved_multinames(machine: VirtualMachine):
+    assert machine.resolved_multinames[65] == ResolvedMultiname('Object', ('',), False, False)
+    multiname = machine.resolved_multinames[21]  # MULTINAME
+    assert multiname.name == 'rule'
+    assert multiname.namespaces[3] == 'flash.display:Sprite'
+    multiname = machine.resolved_multinames[66]  # MULTINAME_L
+    assert multiname.is_runtime and multiname.name is None
+    assert multiname.pop_runtime(['Object'], machine.strings) == ('Object', multiname.namespaces)
+    multiname = ResolvedMultiname(None, (), True, True)  # RTQ_NAME_L
+    namespace = machine.namespaces[machine.multinames[65].namespace_index]
+    assert multiname.pop_runtime([namespace, 'Object'], machine.strings) == ('Object', ('',))
+    assert machine.resolved_multinames[65] is machine.resolved_multinames[65]
+
+
+def test_call_method_batch(machine: VirtualMachine):
+    for name in ('battle.BattleCore.hitrateIntensity', 'battle.BattleCore.getElementalPenetration'):
+        args = [-100, -1, 0, 1, 4, 42, 100], [0, 8, 100, -100500, 8, 300000, 0]
+        expected = [machine.call_method(name, undefined, *element_args) for element_args in zip(*args)]
+        assert list(machine.call_method_batch(name, *args)) == expected
+
+
+def test_can_execute_batch(machine: VirtualMachine):
+    index = machine.method_to_body[machine.lookup_method('battle.BattleCore.hitrateIntensity')]
+    assert can_execute_batch(machine.get_method_code(index))
+    # getlex, returnvalue
+    assert not can_execute_batch(MethodCode(memoryview(bytes.fromhex('604148'))))
+
+
+def test_is_pure_method(machine: VirtualMachine):
+    assert machine.is_pure_method(machine.lookup_method('battle.BattleCore.hitrateIntensity'))
+    assert machine.is_pure_method(machine.lookup_method('battle.BattleCore.getElementalPenetration'))
+    assert not machine.is_pure_method(machine.lookup_method('battle.BattleCore.random'))
+    assert not machine.is_pure_method(machine.lookup_method('battle.BattleCore.rollCrit'))
+    # getlocal0, pushscope, getlocal1, returnvalue
+    assert is_pure_code(MethodCode(memoryview(bytes.fromhex('D030D148'))), lambda index: False)
+    # getlocal0, returnvalue
+    assert not is_pure_code(MethodCode(memoryview(bytes.fromhex('D048'))), lambda index: False)
+
+
+def test_memoized_machine(machine: VirtualMachine):
+    memoized_machine = VirtualMachine(machine.abc_file, machine.link_tables, memo_size=2)
+    for args in ((4, 8), (4, 8), (1, 0), (4, 8), (1.0, 0), (4, 8)):
+        assert memoized_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args) == \
+            machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args)
+    assert memoized_machine.get_memo_stats() == {'hits': 3, 'misses': 3, 'evictions': 1, 'size': 2}
+
+
+def test_instrumented_machine(machine: VirtualMachine):
+    instrumented_machine = VirtualMachine(machine.abc_file, machine.link_tables, instrument=True)
+    for args in ((4, 8), (-100, 0)):
+        instrumented_machine.call_method('battle.BattleCore.hitrateIntensity', undefined, *args)
+    snapshot = instrumented_machine.get_instrumentation_snapshot()
+    assert snapshot['instructions']['GetLocal1'] == 5
+    assert sum(snapshot['instructions'].values()) == 27
+    assert snapshot['methods']['battle.BattleCore.hitrateIntensity']['calls'] == 2
+    assert 'battle.BattleCore.hitrateIntensity' in instrumented_machine.get_instrumentation_report()
+    assert machine.get_instrumentation_snapshot() == {'instructions': {}, 'methods': {}}
+
+
+def test_instrumentation_getter_setter(machine: VirtualMachine):
+    instrumentation = Instrumentation(machine.name_index)
+    class_index = machine.lookup_class('starling.core.Starling')
+    getter_index, setter_index = (
+        trait.data.method_index
+        for trait in machine.abc_file.classes[class_index].traits
+        if machine.constant_pool.get_qualified_name(trait.name_index) == 'multitouchEnabled'
+    )
+    instrumentation.call_counts.update({getter_index: 5, setter_index: 7})
+    instrumentation.call_times.update({getter_index: 1.0, setter_index: 2.0})
+    assert instrumentation.snapshot()['methods'] == {
+        'starling.core.Starling.multitouchEnabled': {'calls': 12, 'time': 3.0},
+    }
+    assert '          12   3.000000s  starling.core.Starling.multitouchEnabled' in instrumentation.report()